@@ -6,9 +6,13 @@ Criado para: Ubirajara e Vanessa testarem
 """
 
 import streamlit as st
-import google.generativeai as genai
 from datetime import datetime
 
+from comprimoveis.agente import BOAS_VINDAS, gerar_resposta, mensagem_erro, montar_prompt
+from comprimoveis.leads import captura_padrao
+from comprimoveis.perfil import admin_ativo, finalizar_perfil, iniciar_perfil, resumo_perfis
+from comprimoveis.sessoes import gerenciador_padrao
+
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
 # ============================================================================
@@ -20,6 +24,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Perfil opcional do rerun (COMPRIMOVEIS_PERFIL); sem custo quando desligado
+perfil = iniciar_perfil("agente", st.query_params, st.session_state)
+
 # CSS Customizado para deixar bonito
 st.markdown("""
 <style>
@@ -84,6 +91,9 @@ st.markdown("""
 # CONFIGURAÇÃO DA API (SIDEBAR)
 # ============================================================================
 
+sessoes = gerenciador_padrao()
+captura = captura_padrao()
+
 with st.sidebar:
     st.title("⚙️ Configuração")
     st.markdown("---")
@@ -116,71 +126,51 @@ with st.sidebar:
     """)
     
     if st.button("🔄 Limpar Conversa"):
-        st.session_state.messages = []
+        sessoes.descartar(st.session_state.sessao_chat)
+        st.session_state.sessao_chat = sessoes.nova()
         st.rerun()
 
-# ============================================================================
-# CONTEXTO DO AGENTE
-# ============================================================================
-
-CONTEXTO = """Você é o assistente inteligente da Comprimóveis - Consultoria & Administração.
-CRECI: 37215
-Slogan: "A chave do seu sonho está aqui"
-
-Localização: Estrada dos Três Rios, 1200 Sala 620, Freguesia - RJ
-Telefones: (21) 3933-4137, (21) 2421-3375
-WhatsApp: (21) 99372-1324
-
-Você atua em: Freguesia (Jacarepaguá), Pechincha, Tanque, Tijuca e todo Rio de Janeiro.
-
-Serviços principais:
-- Compra e venda de imóveis
-- Locação de imóveis
-- Administração de condomínios (relatórios financeiros, RH, assessoria jurídica, contábil)
-- Gestão de facilities
-
-Equipe:
-- Ubirajara: Dono e especialista em compra e vendas
-- Vanessa: Dona, administradora e marketing
-- Erick: Corretor
-- Mais 2 corretores
-
-Diferenciais:
-- Transparência total (envio mensal de relatórios)
-- Assessoria completa (trabalhista, jurídica, contábil)
-- Sistema de gestão inovador
-- Acompanhamento em assembleias
-
-Seja profissional, prestativo e objetivo. Use emojis moderadamente para deixar a conversa agradável."""
+    # Números do processo inteiro: só para admin (?admin=<COMPRIMOVEIS_ADMIN>)
+    if admin_ativo(st.query_params):
+        with st.expander("🧠 Memória do servidor"):
+            estatisticas = sessoes.estatisticas()
+            st.caption(
+                f"{estatisticas['sessoes_vivas']} sessões em memória"
+                f" | {estatisticas['bytes_retidos'] / 1024:.1f} KB retidos"
+                f" | {estatisticas['sessoes_despejadas']} despejadas por ociosidade"
+            )
+            fila = captura.estatisticas()
+            st.caption(
+                f"🎯 Leads: fila {fila['profundidade']}/{fila['capacidade']} (máx. {fila['profundidade_max']})"
+                f" | {fila['processadas']} conversas analisadas | {fila['leads_gravados']} gravações"
+                f" | {fila['descartadas']} descartadas"
+            )
 
 # ============================================================================
 # INICIALIZAÇÃO DO CHAT
 # ============================================================================
 
-# Inicializa histórico de mensagens
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+# O histórico fica no gerenciador de sessões (comprimoveis.sessoes): só a
+# cauda recente em memória, o resto em disco; a sessão guarda apenas o id
+if "sessao_chat" not in st.session_state:
     # Mensagem de boas-vindas
-    st.session_state.messages.append({
+    st.session_state.sessao_chat = sessoes.nova({
         "role": "assistant",
-        "content": """Olá! 👋 Bem-vindo à Comprimóveis!
-
-Sou o assistente virtual da empresa. Como posso ajudá-lo(a) hoje?
-
-💡 **Posso auxiliar com:**
-- Informações sobre imóveis para venda ou locação
-- Gestão de condomínios
-- Assessoria imobiliária
-- Dúvidas sobre nossos serviços
-
-Fique à vontade para perguntar! 😊"""
+        "content": BOAS_VINDAS
     })
+id_sessao = st.session_state.sessao_chat
 
 # ============================================================================
 # EXIBIR HISTÓRICO DO CHAT
 # ============================================================================
 
-for message in st.session_state.messages:
+arquivadas = sessoes.arquivadas(id_sessao)
+if arquivadas and st.checkbox(f"📜 Mostrar {arquivadas} mensagens anteriores"):
+    for message in sessoes.anteriores(id_sessao):
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+for message in sessoes.mensagens(id_sessao):
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
@@ -196,7 +186,7 @@ if prompt := st.chat_input("Digite sua mensagem aqui..."):
         st.stop()
     
     # Adiciona mensagem do usuário ao histórico
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    sessoes.acrescentar(id_sessao, {"role": "user", "content": prompt})
     
     # Exibe mensagem do usuário
     with st.chat_message("user"):
@@ -207,56 +197,34 @@ if prompt := st.chat_input("Digite sua mensagem aqui..."):
         message_placeholder = st.empty()
         
         try:
-            # Configura Gemini
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            
-            # Monta histórico para contexto
-            historico_texto = "\n\n".join([
-                f"{'Usuário' if msg['role'] == 'user' else 'Você'}: {msg['content']}"
-                for msg in st.session_state.messages[-6:]  # Últimas 3 interações
-            ])
-            
-            # Monta prompt completo
-            prompt_completo = f"""{CONTEXTO}
-
-Histórico recente da conversa:
-{historico_texto}
-
-Usuário pergunta agora: {prompt}
-
-Responda de forma profissional, prestativa e objetiva:"""
+            # Contexto + últimas 3 interações (comprimoveis.agente)
+            prompt_completo = montar_prompt(sessoes.mensagens(id_sessao), prompt)
             
-            # Gera resposta
+            # Gera resposta (o cliente Gemini só é importado aqui)
             with st.spinner("Pensando..."):
-                response = model.generate_content(prompt_completo)
-                resposta_texto = response.text
+                resposta_texto = gerar_resposta(api_key, prompt_completo)
             
             # Exibe resposta
             message_placeholder.markdown(resposta_texto)
             
             # Adiciona resposta ao histórico
-            st.session_state.messages.append({
+            sessoes.acrescentar(id_sessao, {
                 "role": "assistant",
                 "content": resposta_texto
             })
             
         except Exception as e:
-            erro_msg = f"❌ **Erro:** {str(e)}\n\n"
-            
-            if "API_KEY_INVALID" in str(e) or "not valid" in str(e):
-                erro_msg += "💡 Sua API Key parece estar incorreta. Verifique no menu lateral."
-            elif "quota" in str(e).lower() or "limit" in str(e).lower():
-                erro_msg += "⚠️ Limite de uso da API atingido. Aguarde alguns minutos ou tente amanhã."
-            else:
-                erro_msg += "💡 Tente reformular sua pergunta ou verifique sua conexão."
+            erro_msg = mensagem_erro(e)
             
             message_placeholder.markdown(erro_msg)
-            st.session_state.messages.append({
+            sessoes.acrescentar(id_sessao, {
                 "role": "assistant",
                 "content": erro_msg
             })
 
+    # Extração de leads em segundo plano: só enfileira, não atrasa a resposta
+    captura.enviar(id_sessao, sessoes.mensagens(id_sessao))
+
 # ============================================================================
 # RODAPÉ
 # ============================================================================
@@ -268,3 +236,21 @@ st.markdown("""
     <p>Desenvolvido com ❤️ por Lucas | Agente IA em fase de testes</p>
 </div>
 """, unsafe_allow_html=True)
+
+# ============================================================================
+# PERFIL DO RERUN (ADMIN)
+# ============================================================================
+
+if perfil is not None and admin_ativo(st.query_params):
+    with st.sidebar.expander("🩺 Perfil de Execução"):
+        duracoes, funcoes = resumo_perfis("agente")
+        if duracoes:
+            st.caption(
+                f"Últimos {len(duracoes)} reruns: mediana {sorted(duracoes)[len(duracoes) // 2]:.0f} ms"
+                f" | máx {max(duracoes):.0f} ms"
+            )
+            st.dataframe(funcoes, use_container_width=True, hide_index=True)
+        else:
+            st.caption("Nenhum perfil gravado ainda.")
+
+finalizar_perfil(perfil, st.session_state)
@@ -0,0 +1,186 @@
+"""
+⏱️ Benchmark de reruns do Calendário BPO
+
+Roda ``calendario_bpo_comprimoveis.py`` com ``streamlit.testing`` (AppTest)
+sobre catálogos sintéticos de vários tamanhos e mede:
+
+- rerun completo (primeira execução da sessão)
+- rerun ao marcar uma tarefa
+- rerun ao trocar o filtro de condomínio
+- pico de memória Python (tracemalloc) de uma execução completa
+
+O resultado é gravado em JSON (por padrão em ``benchmarks/resultados/``,
+fora do controle de versão) para comparar execuções antes/depois:
+
+    python -m benchmarks.bench_calendario --escalas 11x6,100x6,300x6 --saida benchmarks/resultados/antes.json
+    python -m benchmarks.bench_calendario --comparar benchmarks/resultados/antes.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ_REPO))
+
+from comprimoveis import auditoria, historico  # noqa: E402
+from comprimoveis.catalogo import VARIAVEL_CATALOGO, salvar_catalogo  # noqa: E402
+from comprimoveis.sintetico import gerar_catalogo  # noqa: E402
+
+SCRIPT = RAIZ_REPO / "calendario_bpo_comprimoveis.py"
+PASTA_RESULTADOS = RAIZ_REPO / "benchmarks" / "resultados"
+ESCALAS_PADRAO = "11x6,50x6,200x6,200x12"
+METRICAS = ("rerun_completo_s", "rerun_marcar_s", "rerun_filtro_s", "pico_memoria_mb")
+
+
+def _app(pasta_auditoria):
+    from streamlit.testing.v1 import AppTest
+    # Trilha de auditoria nova a cada app: cada repetição parte do mês vazio
+    os.environ[auditoria.VARIAVEL_PASTA] = pasta_auditoria
+    auditoria.log_padrao.cache_clear()
+    return AppTest.from_file(str(SCRIPT), default_timeout=600)
+
+
+def _cronometrar(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def _verificar(at):
+    if at.exception:
+        raise RuntimeError(f"Erro no app durante o benchmark: {at.exception[0].message}")
+
+
+def medir_escala(n_condominios, tarefas_por_condominio, repeticoes, semente):
+    catalogo = gerar_catalogo(n_condominios, tarefas_por_condominio, semente)
+    total_tarefas = sum(len(tarefas) for tarefas in catalogo.values())
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "catalogo.json")
+        salvar_catalogo(catalogo, caminho)
+        os.environ[VARIAVEL_CATALOGO] = caminho
+        # O app fecha meses no histórico: nada do catálogo sintético pode ir para o .historico real
+        os.environ[historico.VARIAVEL_PASTA] = os.path.join(pasta, "historico")
+        try:
+            completo, marcar, filtro = [], [], []
+            for repeticao in range(repeticoes):
+                at = _app(os.path.join(pasta, f"auditoria-{repeticao}"))
+                completo.append(_cronometrar(at.run))
+                _verificar(at)
+
+                caixa = next(c for c in at.checkbox if c.key.startswith("dia"))
+                caixa.check()
+                marcar.append(_cronometrar(at.run))
+                _verificar(at)
+
+                filtro_cond = at.sidebar.multiselect[0]
+                filtro_cond.set_value([filtro_cond.options[1]])
+                filtro.append(_cronometrar(at.run))
+                _verificar(at)
+
+            # Memória medida à parte: tracemalloc distorce os tempos
+            tracemalloc.start()
+            try:
+                at = _app(os.path.join(pasta, "auditoria-memoria"))
+                at.run()
+                _verificar(at)
+                _, pico = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        finally:
+            os.environ.pop(VARIAVEL_CATALOGO, None)
+            os.environ.pop(historico.VARIAVEL_PASTA, None)
+            os.environ.pop(auditoria.VARIAVEL_PASTA, None)
+            auditoria.log_padrao.cache_clear()
+
+    def resumo(tempos):
+        return {"min": min(tempos), "mediana": statistics.median(tempos)}
+
+    return {
+        "escala": f"{n_condominios}x{tarefas_por_condominio}",
+        "condominios": n_condominios,
+        "tarefas_por_condominio": tarefas_por_condominio,
+        "tarefas": total_tarefas,
+        "rerun_completo_s": resumo(completo),
+        "rerun_marcar_s": resumo(marcar),
+        "rerun_filtro_s": resumo(filtro),
+        "pico_memoria_mb": pico / 2**20,
+    }
+
+
+def _valor(resultado, metrica):
+    valor = resultado[metrica]
+    return valor["mediana"] if isinstance(valor, dict) else valor
+
+
+def comparar(atual, anterior):
+    """Imprime a razão atual/anterior de cada métrica, por escala."""
+    anteriores = {r["escala"]: r for r in anterior["resultados"]}
+    for resultado in atual["resultados"]:
+        base = anteriores.get(resultado["escala"])
+        if base is None:
+            continue
+        partes = []
+        for metrica in METRICAS:
+            antes, depois = _valor(base, metrica), _valor(resultado, metrica)
+            partes.append(f"{metrica}={depois / antes:.2f}x" if antes else f"{metrica}=n/a")
+        print(f"  {resultado['escala']:>8}: " + "  ".join(partes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de reruns do Calendário BPO.")
+    parser.add_argument("--escalas", default=ESCALAS_PADRAO,
+                        help="lista NxM (condomínios x tarefas por condomínio), separada por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default=str(PASTA_RESULTADOS / "bench_calendario.json"))
+    parser.add_argument("--comparar", help="relatório JSON anterior para comparação")
+    args = parser.parse_args(argv)
+
+    import streamlit
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "plataforma": platform.platform(),
+        "repeticoes": args.repeticoes,
+        "semente": args.semente,
+        "resultados": [],
+    }
+
+    for escala in args.escalas.split(","):
+        n, m = (int(parte) for parte in escala.lower().split("x"))
+        resultado = medir_escala(n, m, args.repeticoes, args.semente)
+        relatorio["resultados"].append(resultado)
+        print(
+            f"{resultado['escala']:>8} ({resultado['tarefas']} tarefas): "
+            f"completo {resultado['rerun_completo_s']['mediana']:.3f}s | "
+            f"marcar {resultado['rerun_marcar_s']['mediana']:.3f}s | "
+            f"filtro {resultado['rerun_filtro_s']['mediana']:.3f}s | "
+            f"pico {resultado['pico_memoria_mb']:.1f} MB"
+        )
+
+    Path(args.saida).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"📄 Relatório gravado em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+        print(f"📊 Comparação com {args.comparar} (atual/anterior, mediana):")
+        comparar(relatorio, anterior)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+⏱️ Teste de carga do gateway assíncrono (offline)
+
+Sobe ``comprimoveis.gateway`` no mesmo processo com o modelo simulado
+(``BackendSimulado``: latência log-normal, sem rede) e dispara
+``--conversas`` conversas simultâneas, cada uma com ``--mensagens``
+mensagens em sequência, como visitantes reais. Mede vazão, latência
+(p50/p95/p99), pico de chamadas em andamento e respostas fora do tempo.
+
+    python -m benchmarks.bench_gateway --conversas 500 --mensagens 4 --latencia 0.8
+    python -m benchmarks.bench_gateway --url http://127.0.0.1:8788   # gateway já rodando
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ_REPO))
+
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError  # noqa: E402
+
+from comprimoveis.gateway import BackendSimulado, Gateway, escutar  # noqa: E402
+
+PASTA_RESULTADOS = RAIZ_REPO / "benchmarks" / "resultados"
+
+
+def _porta_livre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _conversa(cliente, url, numero, mensagens, latencias, status):
+    for i in range(mensagens):
+        corpo = json.dumps({"remetente": f"carga-{numero}", "texto": f"Mensagem {i} da conversa {numero}"})
+        inicio = time.perf_counter()
+        try:
+            resposta = await cliente.fetch(f"{url}/mensagens", method="POST", body=corpo, request_timeout=120)
+            codigo = resposta.code
+        except HTTPClientError as e:
+            codigo = e.code
+        except OSError:
+            codigo = "conexao"
+        latencias.append(time.perf_counter() - inicio)
+        status[codigo] = status.get(codigo, 0) + 1
+
+
+async def medir(conversas, mensagens, latencia, tempo_limite, url=None):
+    servidor = gateway = None
+    if url is None:
+        gateway = Gateway(BackendSimulado(latencia, semente=42), tempo_limite=tempo_limite)
+        porta = _porta_livre()
+        servidor = escutar(gateway, porta)
+        url = f"http://127.0.0.1:{porta}"
+
+    AsyncHTTPClient.configure(None, max_clients=conversas)
+    cliente = AsyncHTTPClient()
+    latencias, status = [], {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_conversa(cliente, url, n, mensagens, latencias, status) for n in range(conversas)))
+    duracao = time.perf_counter() - inicio
+
+    if servidor is not None:
+        servidor.stop()
+    quantis = statistics.quantiles(latencias, n=100)
+    return {
+        "conversas": conversas,
+        "mensagens_por_conversa": mensagens,
+        "latencia_modelo_s": latencia if gateway else None,
+        "duracao_s": duracao,
+        "vazao_msg_s": len(latencias) / duracao,
+        "latencia_p50_ms": 1000 * quantis[49],
+        "latencia_p95_ms": 1000 * quantis[94],
+        "latencia_p99_ms": 1000 * quantis[98],
+        "status": {str(codigo): total for codigo, total in sorted(status.items(), key=lambda item: str(item[0]))},
+        "gateway": gateway.estatisticas() if gateway else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do gateway assíncrono do agente.")
+    parser.add_argument("--conversas", type=int, default=500)
+    parser.add_argument("--mensagens", type=int, default=4)
+    parser.add_argument("--latencia", type=float, default=0.8, help="latência média do modelo simulado (s)")
+    parser.add_argument("--tempo-limite", type=float, default=30.0)
+    parser.add_argument("--url", help="gateway já em execução (senão sobe um com o modelo simulado)")
+    parser.add_argument("--saida", default=str(PASTA_RESULTADOS / "bench_gateway.json"))
+    args = parser.parse_args(argv)
+
+    resultado = asyncio.run(medir(args.conversas, args.mensagens, args.latencia, args.tempo_limite, args.url))
+    print(
+        f"{resultado['conversas']} conversas x {resultado['mensagens_por_conversa']} mensagens: "
+        f"{resultado['vazao_msg_s']:.0f} msg/s | p50 {resultado['latencia_p50_ms']:.0f} ms | "
+        f"p95 {resultado['latencia_p95_ms']:.0f} ms | p99 {resultado['latencia_p99_ms']:.0f} ms | "
+        f"status {resultado['status']}"
+    )
+    if resultado["gateway"]:
+        print(f"   pico em andamento: {resultado['gateway']['pico_em_andamento']}")
+
+    Path(args.saida).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump({"gerado_em": datetime.now().isoformat(timespec="seconds"),
+                   "python": platform.python_version(), **resultado}, arquivo, ensure_ascii=False, indent=2)
+    print(f"📄 Relatório gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
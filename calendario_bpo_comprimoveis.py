@@ -9,8 +9,24 @@ Versão 2.0 - PREMIUM EDITION
 
 import streamlit as st
 from datetime import datetime, date
+import altair as alt
 import pandas as pd
 import json
+import os
+import time
+
+from comprimoveis.agregados import MESES, AgregadosBPO, separar_chave_tarefa, totais_padrao
+from comprimoveis.auditoria import log_padrao
+from comprimoveis.balanceamento import balancear, resumo_cargas
+from comprimoveis.busca import IndiceBusca
+from comprimoveis.catalogo import TIPOS, catalogo_padrao, condominios_do_catalogo, filtrar_tarefas, icone_tipo
+from comprimoveis.conciliacao import conciliar, ler_extrato
+from comprimoveis.estaticos import estilo_html, logo_data_uri
+from comprimoveis.exportacao import FORMATOS, exportar_bytes, nome_arquivo
+from comprimoveis.fluxo_caixa import horizonte, projetar, tabela_tarefas, tarefas_sem_valor
+from comprimoveis.formatacao import formatar_brl
+from comprimoveis.historico import consultar, fechar_mes, fechar_pendentes, pasta_padrao, recuar_meses, variacoes
+from comprimoveis.perfil import admin_ativo, finalizar_perfil, iniciar_perfil, resumo_perfis
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -23,505 +39,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Perfil opcional do rerun (COMPRIMOVEIS_PERFIL); sem custo quando desligado
+perfil = iniciar_perfil("calendario", st.query_params, st.session_state)
+
 # ============================================================================
 # CSS PREMIUM
 # ============================================================================
 
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800&family=Space+Mono:wght@400;700&display=swap');
-    
-    /* ========== VARIÁVEIS ========== */
-    :root {
-        --azul-comprimoveis: #1a2942;
-        --laranja-comprimoveis: #ff6b35;
-        --azul-claro: #3d5a80;
-    }
-    
-    /* ========== GLOBAL ========== */
-    * {
-        font-family: 'Poppins', sans-serif !important;
-    }
-    
-    /* Background Premium */
-    .stApp {
-        background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-    }
-    
-    /* ========== HEADER PREMIUM ========== */
-    .main-header {
-        background: linear-gradient(135deg, rgba(26, 41, 66, 0.95) 0%, rgba(61, 90, 128, 0.95) 100%);
-        backdrop-filter: blur(20px);
-        -webkit-backdrop-filter: blur(20px);
-        padding: 2.5rem 2rem;
-        border-radius: 24px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2.5rem;
-        box-shadow: 0 20px 60px rgba(0,0,0,0.2);
-        border: 1px solid rgba(255, 255, 255, 0.1);
-        animation: slideDown 0.8s cubic-bezier(0.16, 1, 0.3, 1);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    @keyframes slideDown {
-        from {
-            opacity: 0;
-            transform: translateY(-30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    .main-header::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 3px;
-        background: linear-gradient(90deg, transparent 0%, #ff6b35 50%, transparent 100%);
-        animation: shimmer 3s ease-in-out infinite;
-    }
-    
-    @keyframes shimmer {
-        0%, 100% { opacity: 0.5; }
-        50% { opacity: 1; }
-    }
-    
-    .main-header::after {
-        content: '';
-        position: absolute;
-        top: -50%;
-        right: -50%;
-        width: 200%;
-        height: 200%;
-        background: radial-gradient(circle, rgba(255, 107, 53, 0.1) 0%, transparent 70%);
-        animation: pulse 8s ease-in-out infinite;
-    }
-    
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); opacity: 0.4; }
-        50% { transform: scale(1.05); opacity: 0.6; }
-    }
-    
-    .main-header h1 {
-        margin: 0;
-        font-size: 2.8rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, #ffffff 0%, #e2e8f0 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        position: relative;
-        z-index: 2;
-        letter-spacing: -0.02em;
-    }
-    
-    .main-header p {
-        margin: 0.6rem 0 0 0;
-        font-size: 1.15rem;
-        opacity: 0.95;
-        position: relative;
-        z-index: 2;
-    }
-    
-    .main-header img {
-        background: white;
-        padding: 0.6rem 1.2rem;
-        border-radius: 16px;
-        box-shadow: 0 8px 24px rgba(0,0,0,0.25);
-        max-width: 260px;
-        margin-bottom: 1.5rem;
-        animation: float 6s ease-in-out infinite;
-        position: relative;
-        z-index: 2;
-    }
-    
-    @keyframes float {
-        0%, 100% { transform: translateY(0px); }
-        50% { transform: translateY(-12px); }
-    }
-    
-    /* ========== STATS CARDS PREMIUM ========== */
-    .stat-card {
-        background: rgba(255, 255, 255, 0.85);
-        backdrop-filter: blur(10px);
-        -webkit-backdrop-filter: blur(10px);
-        padding: 2rem 1.5rem;
-        border-radius: 20px;
-        text-align: center;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.08);
-        border: 1px solid rgba(255, 255, 255, 0.5);
-        transition: all 0.4s cubic-bezier(0.16, 1, 0.3, 1);
-        animation: scaleIn 0.6s cubic-bezier(0.16, 1, 0.3, 1) both;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    @keyframes scaleIn {
-        from {
-            opacity: 0;
-            transform: scale(0.9) translateY(20px);
-        }
-        to {
-            opacity: 1;
-            transform: scale(1) translateY(0);
-        }
-    }
-    
-    .stat-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 4px;
-        background: linear-gradient(90deg, var(--azul-comprimoveis), var(--laranja-comprimoveis));
-        transform: scaleX(0);
-        transform-origin: left;
-        transition: transform 0.6s cubic-bezier(0.16, 1, 0.3, 1);
-    }
-    
-    .stat-card:hover {
-        transform: translateY(-10px) scale(1.03);
-        box-shadow: 0 20px 50px rgba(255, 107, 53, 0.25);
-    }
-    
-    .stat-card:hover::before {
-        transform: scaleX(1);
-    }
-    
-    .stat-number {
-        font-size: 3.5rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, var(--azul-comprimoveis) 0%, var(--laranja-comprimoveis) 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin: 0.5rem 0;
-        font-family: 'Space Mono', monospace !important;
-        line-height: 1;
-    }
-    
-    .stat-label {
-        color: #64748b;
-        font-size: 0.95rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.08em;
-        margin-top: 0.5rem;
-    }
-    
-    /* ========== TASK CARDS PREMIUM ========== */
-    .tarefa-card {
-        background: white;
-        border-left: 5px solid var(--laranja-comprimoveis);
-        padding: 1.5rem;
-        margin: 1rem 0;
-        border-radius: 16px;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.06);
-        color: #1a2942 !important;
-        transition: all 0.3s cubic-bezier(0.16, 1, 0.3, 1);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .tarefa-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 5px;
-        height: 100%;
-        background: linear-gradient(180deg, var(--laranja-comprimoveis), #ff8c61);
-        transition: width 0.3s ease;
-    }
-    
-    .tarefa-card:hover {
-        transform: translateX(8px);
-        box-shadow: 0 8px 30px rgba(0,0,0,0.12);
-    }
-    
-    .tarefa-card:hover::before {
-        width: 8px;
-    }
-    
-    .tarefa-card strong {
-        color: #1a2942 !important;
-        font-weight: 600;
-    }
-    
-    .tarefa-card small {
-        color: #666 !important;
-    }
-    
-    .tarefa-concluida {
-        background: linear-gradient(135deg, #ecfdf5 0%, #d1fae5 100%);
-        border-left-color: #10b981;
-        opacity: 0.9;
-        color: #065f46 !important;
-    }
-    
-    .tarefa-concluida::before {
-        background: linear-gradient(180deg, #10b981, #34d399);
-    }
-    
-    .tarefa-urgente {
-        background: linear-gradient(135deg, #fef2f2 0%, #fee2e2 100%);
-        border-left-color: #ef4444;
-        color: #991b1b !important;
-        animation: urgentPulse 2.5s ease-in-out infinite;
-    }
-    
-    @keyframes urgentPulse {
-        0%, 100% {
-            box-shadow: 0 4px 15px rgba(0,0,0,0.06);
-        }
-        50% {
-            box-shadow: 0 4px 15px rgba(239, 68, 68, 0.3), 0 0 0 4px rgba(239, 68, 68, 0.1);
-        }
-    }
-    
-    .tarefa-urgente::before {
-        background: linear-gradient(180deg, #ef4444, #f87171);
-    }
-    
-    /* ========== BADGES ========== */
-    .cond-badge {
-        display: inline-block;
-        background: linear-gradient(135deg, #1a2942 0%, #3d5a80 100%);
-        color: white;
-        padding: 0.4rem 1rem;
-        border-radius: 20px;
-        font-size: 0.85rem;
-        margin: 0 0.3rem 0.5rem 0;
-        font-weight: 600;
-        box-shadow: 0 4px 12px rgba(26, 41, 66, 0.25);
-        transition: transform 0.2s ease;
-    }
-    
-    .cond-badge:hover {
-        transform: scale(1.05);
-    }
-    
-    /* ========== BUTTONS PREMIUM ========== */
-    .stButton>button {
-        background: linear-gradient(135deg, #ff6b35 0%, #ff8c61 100%) !important;
-        color: white !important;
-        border: none !important;
-        padding: 0.75rem 2rem !important;
-        border-radius: 12px !important;
-        font-weight: 600 !important;
-        font-size: 1rem !important;
-        transition: all 0.3s cubic-bezier(0.16, 1, 0.3, 1) !important;
-        box-shadow: 0 6px 20px rgba(255, 107, 53, 0.3) !important;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-3px) scale(1.02) !important;
-        box-shadow: 0 10px 30px rgba(255, 107, 53, 0.4) !important;
-    }
-    
-    .stButton>button:active {
-        transform: translateY(-1px) scale(0.98) !important;
-    }
-    
-    /* ========== PROGRESS BAR ========== */
-    .stProgress > div > div {
-        background: linear-gradient(90deg, #ff6b35 0%, #ff8c61 100%) !important;
-        border-radius: 10px !important;
-        height: 14px !important;
-    }
-    
-    /* ========== TABS PREMIUM ========== */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 0.5rem;
-        background: rgba(255, 255, 255, 0.7);
-        backdrop-filter: blur(10px);
-        padding: 0.5rem;
-        border-radius: 16px;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.05);
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 10px;
-        padding: 0.75rem 1.5rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #1a2942 0%, #3d5a80 100%) !important;
-        color: white !important;
-        box-shadow: 0 6px 20px rgba(26, 41, 66, 0.3);
-    }
-    
-    /* ========== SIDEBAR ========== */
-    .css-1d391kg, [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, rgba(248, 250, 252, 0.98) 0%, rgba(226, 232, 240, 0.98) 100%);
-        backdrop-filter: blur(10px);
-    }
-    
-    /* ========== SCROLLBAR ========== */
-    ::-webkit-scrollbar {
-        width: 12px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: rgba(0, 0, 0, 0.03);
-        border-radius: 10px;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(180deg, #1a2942 0%, #ff6b35 100%);
-        border-radius: 10px;
-        border: 2px solid rgba(255, 255, 255, 0.5);
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(180deg, #0d1829 0%, #e64d1f 100%);
-    }
-    
-    /* ========== RESPONSIVO ========== */
-    @media (max-width: 768px) {
-        .main-header h1 {
-            font-size: 2rem;
-        }
-        
-        .stat-number {
-            font-size: 2.5rem;
-        }
-        
-        .main-header img {
-            max-width: 200px;
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
+# CSS e fontes servidos localmente (comprimoveis/css, static/fonts),
+# minificados uma única vez por processo
+st.markdown(estilo_html("calendario"), unsafe_allow_html=True)
 
 # ============================================================================
 # DADOS DO CALENDÁRIO BPO
 # ============================================================================
 
-# Estrutura de tarefas por dia
-TAREFAS_POR_DIA = {
-    1: [
-        {
-            "condominio": "Village Mananciais", 
-            "tipo": "Transferência", 
-            "descricao": "Transfer CX Presidente Fátima - Recarga Interfones",
-            "destinatario": "Fátima (Presidente)",
-            "valor": 100.00
-        },
-        {
-            "condominio": "Colina Verde", 
-            "tipo": "Boleto", 
-            "descricao": "Iguá - Débito em conta automático",
-            "destinatario": "Conta Santander Ag. 3894",
-            "valor": None
-        }
-    ],
-    5: [
-        {"condominio": "Village Tucanos", "tipo": "Pagamento", "descricao": "Salários dos Funcionários (Bruno e Gustavo)", "valor": 3850.00},
-        {"condominio": "Itaipu", "tipo": "Boleto", "descricao": "Bem mais gestora", "valor": None},
-        {"condominio": "Itaipu", "tipo": "PIX", "descricao": "Salários Funcionários (Antônio e José)", "valor": None},
-        {"condominio": "Samira", "tipo": "PIX", "descricao": "Allan Diego (Síndico Profissional)", "valor": None},
-        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Bem mais gestora", "valor": None},
-        {"condominio": "Nascente Rio Grande", "tipo": "Boleto", "descricao": "WN Tecnologia + Bem mais + Iguá", "valor": None},
-        {"condominio": "Nascente Rio Grande", "tipo": "PIX", "descricao": "Salários 6 Funcionários", "valor": None}
-    ],
-    8: [
-        {"condominio": "Anchieta", "tipo": "Boleto", "descricao": "Iguá - Matrícula 537256-9", "valor": None},
-        {"condominio": "Village Ipadu", "tipo": "Transferência", "descricao": "CX Presidente Washington", "valor": None}
-    ],
-    10: [
-        {"condominio": "Anchieta", "tipo": "Boleto", "descricao": "Light - Matrícula 011606195", "valor": None},
-        {"condominio": "Anchieta", "tipo": "Pagamento", "descricao": "Prestador Interfone (Marcos Vieira)", "valor": None},
-        {"condominio": "Anchieta", "tipo": "Boleto", "descricao": "Taquara Net", "valor": None},
-        {"condominio": "Sylvania", "tipo": "PIX", "descricao": "Funcionários/Prestadores (Jorge e Mário)", "valor": 1450.00},
-        {"condominio": "Village Pedras", "tipo": "PIX", "descricao": "Gota D'Água Piscinas + Suelena", "valor": 5360.00},
-        {"condominio": "Samira", "tipo": "Boleto", "descricao": "Light", "valor": None},
-        {"condominio": "Samira", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 985,98)", "valor": 985.98},
-        {"condominio": "Village Tucanos", "tipo": "PIX", "descricao": "Prestadores (Magno, Elias, José)", "valor": 2200.00},
-        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Alpha Manutenção", "valor": None}
-    ],
-    15: [
-        {"condominio": "Anchieta", "tipo": "PIX", "descricao": "Letícia (Faxineira) R$ 550", "valor": 550.00},
-        {"condominio": "Anchieta", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 563)", "valor": 563.00},
-        {"condominio": "Primavera", "tipo": "PIX", "descricao": "Cláudio de Oliveira R$ 150", "valor": 150.00},
-        {"condominio": "Primavera", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 642,80)", "valor": 642.80},
-        {"condominio": "Sylvania", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 582,50)", "valor": 582.50},
-        {"condominio": "Sylvania", "tipo": "Boleto", "descricao": "Águas do Rio", "valor": None},
-        {"condominio": "Village Ipadu", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 1.111,46)", "valor": 1111.46},
-        {"condominio": "Village Ipadu", "tipo": "Boleto", "descricao": "Olá Fibra Internet", "valor": None},
-        {"condominio": "Village Mananciais", "tipo": "Boleto", "descricao": "SISGU Segurança", "valor": 488.00},
-        {"condominio": "Village Mananciais", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 859,38)", "valor": 859.38},
-        {"condominio": "Village Pedras", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 1.250)", "valor": 1250.00},
-        {"condominio": "Village Pedras", "tipo": "PIX", "descricao": "Adiantamento Salários (8 funcionários)", "valor": None},
-        {"condominio": "Itaipu", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 1.746,33)", "valor": 1746.33},
-        {"condominio": "Samira", "tipo": "Boleto", "descricao": "Naturgy", "valor": None},
-        {"condominio": "Village Tucanos", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 902,42)", "valor": 902.42},
-        {"condominio": "Village Tucanos", "tipo": "PIX", "descricao": "Suzana (Ajuda custo) R$ 350", "valor": 350.00},
-        {"condominio": "Colina Verde", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 977)", "valor": 977.00},
-        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Claro + Naturgy", "valor": None},
-        {"condominio": "Colina Verde", "tipo": "PIX", "descricao": "Adiantamento Salários (2 funcionários)", "valor": None},
-        {"condominio": "Nascente Rio Grande", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 977)", "valor": 977.00},
-        {"condominio": "Nascente Rio Grande", "tipo": "Boleto", "descricao": "Semear Internet + Claro", "valor": None},
-        {"condominio": "Nascente Rio Grande", "tipo": "PIX", "descricao": "Adiantamento Salários (6 funcionários)", "valor": None}
-    ],
-    19: [
-        {"condominio": "Village Pedras", "tipo": "Impostos", "descricao": "FGTS + INSS", "valor": None},
-        {"condominio": "Village Pedras", "tipo": "Boleto", "descricao": "Iguá + Claro", "valor": None},
-        {"condominio": "Samira", "tipo": "Impostos", "descricao": "FGTS + INSS", "valor": None},
-        {"condominio": "Samira", "tipo": "Boleto", "descricao": "Iguá + Claro", "valor": None},
-        {"condominio": "Colina Verde", "tipo": "Impostos", "descricao": "FGTS + INSS", "valor": None},
-        {"condominio": "Nascente Rio Grande", "tipo": "Impostos", "descricao": "FGTS + INSS", "valor": None},
-        {"condominio": "Nascente Rio Grande", "tipo": "Boleto", "descricao": "Jurídico R$ 1.860,56", "valor": 1860.56}
-    ],
-    20: [
-        {"condominio": "Primavera", "tipo": "Boleto", "descricao": "Iguá + Light", "valor": None},
-        {"condominio": "Sylvania", "tipo": "Boleto", "descricao": "Light - Matrícula 0411681294", "valor": None},
-        {"condominio": "Village Mananciais", "tipo": "Boleto", "descricao": "NIO Fibra", "valor": None},
-        {"condominio": "Village Pedras", "tipo": "Boleto", "descricao": "Hidroluz + Light (3 endereços)", "valor": None},
-        {"condominio": "Itaipu", "tipo": "Boleto", "descricao": "Seguro Predial R$ 727,90", "valor": 727.90}
-    ],
-    25: [
-        {"condominio": "Primavera", "tipo": "Transferência", "descricao": "CX Síndico Agapito", "valor": None},
-        {"condominio": "Village Mananciais", "tipo": "Boleto", "descricao": "Light - Matrícula 430139742", "valor": None},
-        {"condominio": "Samira", "tipo": "Boleto", "descricao": "Elevadores Atlas", "valor": None}
-    ],
-    26: [
-        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Light - Débito em conta", "valor": None},
-        {"condominio": "Nascente Rio Grande", "tipo": "Boleto", "descricao": "Light - Débito + Sulamérica", "valor": None}
-    ],
-    28: [
-        {"condominio": "Village Pedras", "tipo": "Vale", "descricao": "VR Refeição + Vale Transporte", "valor": None},
-        {"condominio": "Village Pedras", "tipo": "Pagamento", "descricao": "Salários 8 Funcionários", "valor": None}
-    ],
-    30: [
-        {"condominio": "Colina Verde", "tipo": "PIX", "descricao": "Salários Funcionários (Almir e Severino)", "valor": None},
-        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Triangular Elevadores", "valor": None}
-    ]
-}
-
-# Lista de todos os condomínios
-CONDOMINIOS = [
-    "Village Mananciais", "Colina Verde", "Village Tucanos", "Itaipu",
-    "Samira", "Nascente Rio Grande", "Anchieta", "Village Ipadu",
-    "Sylvania", "Village Pedras", "Primavera"
-]
+# Catálogo em comprimoveis.catalogo; COMPRIMOVEIS_CATALOGO aponta para um
+# JSON alternativo (ex.: sintético para benchmarks)
+TAREFAS_POR_DIA = catalogo_padrao()
+CONDOMINIOS = condominios_do_catalogo(TAREFAS_POR_DIA)
 
 # ============================================================================
 # HEADER PRINCIPAL COM LOGO
 # ============================================================================
 
-logo_url = "https://raw.githubusercontent.com/lucasroma11/agente-comprimoveis/main/logo-comprimoveis-1.png"
+# Logo versionado no repositório, redimensionado e em cache (sem rede)
+logo_url = logo_data_uri()
 
 st.markdown(f"""
 <div class="main-header">
@@ -539,8 +82,78 @@ st.markdown(f"""
 # INICIALIZAÇÃO DO ESTADO
 # ============================================================================
 
+# Toda marcação vai para a trilha de auditoria, que também é o estado
+# compartilhado entre as sessões abertas: a sessão guarda a versão (seq do
+# último evento) que já incorporou e, a cada rerun, aplica só o que veio depois
+log_auditoria = log_padrao()
+
+
+def carregar_estado_compartilhado():
+    versao, st.session_state.tarefas_concluidas = log_auditoria.concluidas()
+    st.session_state.versao_vista = versao
+    # Totais do catálogo montados uma vez por processo; a sessão só soma as conclusões
+    st.session_state.agregados = AgregadosBPO.de_sessao(
+        totais_padrao(), st.session_state.tarefas_concluidas
+    )
+
+
 if 'tarefas_concluidas' not in st.session_state:
-    st.session_state.tarefas_concluidas = {}
+    carregar_estado_compartilhado()
+
+mudancas = log_auditoria.mudancas_desde(st.session_state.versao_vista)
+if mudancas is None:
+    # Sessão ficou para trás da janela de eventos recentes: recarrega tudo
+    carregar_estado_compartilhado()
+for evento in mudancas or []:
+    mes_evento, ano_evento, dia_evento, idx_evento = separar_chave_tarefa(evento['chave'])
+    concluidas_evento = st.session_state.tarefas_concluidas.setdefault(evento['mes'], [])
+    if evento['concluida'] and evento['chave'] not in concluidas_evento:
+        concluidas_evento.append(evento['chave'])
+    elif not evento['concluida'] and evento['chave'] in concluidas_evento:
+        concluidas_evento.remove(evento['chave'])
+    st.session_state.agregados.marcar(ano_evento, mes_evento, dia_evento, idx_evento, evento['concluida'])
+    st.session_state.versao_vista = evento['seq']
+
+
+def _requisicao_sessao():
+    """(id da sessão, requisição HTTP do websocket) pela API interna do Streamlit; None fora do servidor."""
+    try:
+        from streamlit import runtime
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        from streamlit.web.server.browser_websocket_handler import BrowserWebSocketHandler
+
+        contexto = get_script_run_ctx()
+        cliente = runtime.get_instance().get_client(contexto.session_id)
+    except Exception:
+        return None, None
+    return contexto.session_id, cliente.request if isinstance(cliente, BrowserWebSocketHandler) else None
+
+
+def identificar_sessao():
+    """(usuário, origem) gravados na auditoria; nada disso é digitado na tela.
+
+    O usuário vem do cabeçalho que o proxy de autenticação injeta (nome em
+    COMPRIMOVEIS_CABECALHO_USUARIO; só ligar atrás de um proxy que descarte
+    o cabeçalho vindo do cliente) ou, numa instalação de um só operador, de
+    COMPRIMOVEIS_USUARIO. A origem (sessão e IP) vai junto em todo evento.
+
+    O IP é o da conexão. Só atrás do proxy (a mesma variável ligada) vale o
+    X-Forwarded-For, e apenas o último salto, o que o próprio proxy
+    acrescentou: os anteriores o cliente escreve como quiser.
+    """
+    id_sessao, requisicao = _requisicao_sessao()
+    cabecalhos = requisicao.headers if requisicao is not None else {}
+    ip = requisicao.remote_ip if requisicao is not None else ""
+    usuario = None
+    if os.environ.get("COMPRIMOVEIS_CABECALHO_USUARIO"):
+        usuario = cabecalhos.get(os.environ["COMPRIMOVEIS_CABECALHO_USUARIO"])
+        ip = cabecalhos.get("X-Forwarded-For", "").split(",")[-1].strip() or ip
+    usuario = usuario or os.environ.get("COMPRIMOVEIS_USUARIO") or "não identificado"
+    return usuario, f"sessão {(id_sessao or 'local')[:8]}" + (f" | IP {ip}" if ip else "")
+
+
+if 'usuario' not in st.session_state:
+    st.session_state.usuario, st.session_state.origem = identificar_sessao()
 
 if 'mes_atual' not in st.session_state:
     st.session_state.mes_atual = datetime.now().month
@@ -556,17 +169,16 @@ with st.sidebar:
     st.markdown("### ⚙️ Configurações")
     st.markdown("---")
     
+    st.caption(f"👤 {st.session_state.usuario} ({st.session_state.origem})")
+    st.caption("Registrado na trilha de auditoria a cada marcação")
+    
     col1, col2 = st.columns(2)
     with col1:
-        mes_selecionado = st.selectbox(
+        mes_selecionado = MESES.index(st.selectbox(
             "Mês",
-            range(1, 13),
-            index=datetime.now().month - 1,
-            format_func=lambda x: [
-                "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
-                "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"
-            ][x-1]
-        )
+            MESES,
+            index=datetime.now().month - 1
+        )) + 1
     
     with col2:
         ano_selecionado = st.selectbox(
@@ -592,7 +204,7 @@ with st.sidebar:
     st.markdown("### 📋 Filtrar por Tipo")
     tipo_filtro = st.multiselect(
         "Selecione:",
-        ["Todos", "Boleto", "PIX", "Transferência", "Pagamento", "Impostos", "Vale"],
+        ["Todos"] + TIPOS,
         default=["Todos"]
     )
     
@@ -600,11 +212,19 @@ with st.sidebar:
     
     if st.button("🔄 Resetar Tarefas do Mês"):
         chave_mes = f"{st.session_state.mes_atual}/{st.session_state.ano_atual}"
-        if chave_mes in st.session_state.tarefas_concluidas:
-            del st.session_state.tarefas_concluidas[chave_mes]
+        # A sessão se atualiza pelo feed no próximo rerun, como as demais
+        st.session_state.conflitos = log_auditoria.registrar(
+            st.session_state.usuario, list(st.session_state.tarefas_concluidas.get(chave_mes, [])), False,
+            chave_mes, versao_base=st.session_state.versao_vista, origem=st.session_state.origem
+        ).conflitos
         st.success("✅ Tarefas resetadas!")
         st.rerun()
     
+    sincronizar = st.toggle(
+        "🔄 Sincronização automática",
+        help="Mantém a página aberta acompanhando as marcações de outros usuários"
+    )
+    
     st.markdown("---")
     st.markdown("### 📞 Contatos")
     st.markdown("""
@@ -624,13 +244,50 @@ with st.sidebar:
 # ESTATÍSTICAS PRINCIPAIS
 # ============================================================================
 
-total_tarefas = sum(len(tarefas) for tarefas in TAREFAS_POR_DIA.values())
+agregados = st.session_state.agregados
+total_tarefas = agregados.comprometido.total.quantidade
 chave_mes = f"{st.session_state.mes_atual}/{st.session_state.ano_atual}"
 tarefas_concluidas_mes = st.session_state.tarefas_concluidas.get(chave_mes, [])
-total_concluidas = len(tarefas_concluidas_mes)
+total_concluidas = agregados.concluidas_mes(st.session_state.ano_atual, st.session_state.mes_atual)
 total_pendentes = total_tarefas - total_concluidas
 progresso = (total_concluidas / total_tarefas * 100) if total_tarefas > 0 else 0
 
+
+def registrar_marcacao(chaves, marcada, mes_chave, valores=None):
+    """Grava no estado compartilhado a partir da versão que a sessão exibiu.
+
+    A sessão não se altera aqui: o próprio evento volta pelo feed no início
+    do rerun. Tarefas mudadas por outra pessoa nesse meio tempo ficam como
+    conflito e não são sobrescritas.
+    """
+    st.session_state.conflitos = log_auditoria.registrar(
+        st.session_state.usuario, chaves, marcada, mes_chave,
+        versao_base=st.session_state.versao_vista, valores=valores, origem=st.session_state.origem
+    ).conflitos
+
+
+def alternar_tarefa(chave_tarefa, chave_widget):
+    """Callback do checkbox (roda antes do rerun)."""
+    mes, ano, _, _ = separar_chave_tarefa(chave_tarefa)
+    registrar_marcacao([chave_tarefa], st.session_state[chave_widget], f"{mes}/{ano}")
+
+
+def checkbox_tarefa(prefixo, chave_tarefa, concluida):
+    # A versão da tarefa na chave recria o checkbox quando outra pessoa a
+    # altera, descartando um clique feito sobre o estado antigo
+    chave_widget = f"{prefixo}_{log_auditoria.versao_tarefa(chave_tarefa)}"
+    st.checkbox("✓", value=concluida, key=chave_widget,
+                on_change=alternar_tarefa, args=(chave_tarefa, chave_widget))
+
+
+def concluir_em_lote(tarefas):
+    """Callback: marca vários (dia, idx, valor pago) do mês selecionado antes do próximo rerun."""
+    mes, ano = st.session_state.mes_atual, st.session_state.ano_atual
+    valores = {f"{mes}/{ano}-{dia}-{idx}": valor for dia, idx, valor in tarefas}
+    registrar_marcacao(list(valores), True, f"{mes}/{ano}", valores=valores)
+    st.session_state.conciliacao = None
+
+
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
@@ -667,6 +324,19 @@ with col4:
 
 st.progress(progresso / 100)
 
+for conflito in st.session_state.pop('conflitos', None) or []:
+    if conflito is None:
+        st.warning("⚠️ Uma tarefa foi alterada por outro usuário antes da sua marcação; confira e marque de novo.")
+        continue
+    _, _, dia_conflito, idx_conflito = separar_chave_tarefa(conflito['chave'])
+    tarefa_conflito = TAREFAS_POR_DIA.get(dia_conflito, [])[idx_conflito:idx_conflito + 1]
+    st.warning(
+        f"⚠️ Dia {dia_conflito}"
+        + (f" - {tarefa_conflito[0]['descricao']}" if tarefa_conflito else "")
+        + f" foi {'concluída' if conflito['concluida'] else 'desmarcada'} por {conflito['usuario']}"
+        f" às {datetime.fromisoformat(conflito['quando']):%H:%M}; sua marcação não foi aplicada."
+    )
+
 st.markdown("---")
 
 # ============================================================================
@@ -694,17 +364,9 @@ if (mes_hoje == st.session_state.mes_atual and
         with col1:
             classe = "tarefa-concluida" if concluida else "tarefa-urgente"
             
-            icones = {
-                "Boleto": "📄",
-                "PIX": "💸",
-                "Transferência": "💰",
-                "Pagamento": "💵",
-                "Impostos": "🏛️",
-                "Vale": "🎫"
-            }
-            icone = icones.get(tarefa['tipo'], "📋")
+            icone = icone_tipo(tarefa['tipo'])
             
-            valor_str = f"<br><small style='color: #2e7d32; font-weight: bold;'>💰 R$ {tarefa['valor']:,.2f}</small>".replace(",", "X").replace(".", ",").replace("X", ".") if tarefa.get('valor') else ""
+            valor_str = f"<br><small style='color: #2e7d32; font-weight: bold;'>💰 {formatar_brl(tarefa['valor'])}</small>" if tarefa.get('valor') else ""
             
             destinatario_str = f"<br><small style='color: #666;'>👤 {tarefa.get('destinatario', '')}</small>" if tarefa.get('destinatario') else ""
             
@@ -719,14 +381,7 @@ if (mes_hoje == st.session_state.mes_atual and
             """, unsafe_allow_html=True)
         
         with col2:
-            if st.checkbox("✓", value=concluida, key=f"hoje_{chave_tarefa}"):
-                if chave_tarefa not in tarefas_concluidas_mes:
-                    tarefas_concluidas_mes.append(chave_tarefa)
-                    st.session_state.tarefas_concluidas[chave_mes] = tarefas_concluidas_mes
-            else:
-                if chave_tarefa in tarefas_concluidas_mes:
-                    tarefas_concluidas_mes.remove(chave_tarefa)
-                    st.session_state.tarefas_concluidas[chave_mes] = tarefas_concluidas_mes
+            checkbox_tarefa(f"hoje_{chave_tarefa}", chave_tarefa, concluida)
     
     st.markdown("---")
 
@@ -736,31 +391,55 @@ if (mes_hoje == st.session_state.mes_atual and
 
 st.markdown("### 📅 Todas as Tarefas do Mês")
 
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "📅 Dias 1-7", "📅 Dias 8-15", "📅 Dias 16-22", "📅 Dias 23-31", "📊 Resumo"
-])
+ABAS_DIAS = [(range(1, 8), "📅 Dias 1-7"), (range(8, 16), "📅 Dias 8-15"),
+             (range(16, 23), "📅 Dias 16-22"), (range(23, 32), "📅 Dias 23-31")]
+
+busca = st.text_input(
+    "🔍 Buscar tarefa",
+    placeholder="Ex.: agua, boleto light anchieta, 011606...",
+    help="Busca em descrição, destinatário, condomínio e tipo, sem diferenciar acentos"
+)
+
+if busca:
+    # Índice montado na primeira busca da sessão
+    if 'indice_busca' not in st.session_state:
+        st.session_state.indice_busca = IndiceBusca(TAREFAS_POR_DIA)
+    resultados = st.session_state.indice_busca.buscar(busca)
+    if not resultados:
+        st.info("Nenhuma tarefa encontrada.")
+    for _, dia, idx, tarefa in resultados:
+        aba = next(nome for dias, nome in ABAS_DIAS if dia in dias)
+        status = "✅" if f"{chave_mes}-{dia}-{idx}" in tarefas_concluidas_mes else "⏳"
+        valor_str = f" · {formatar_brl(tarefa['valor'])}" if tarefa.get('valor') else ""
+        st.markdown(
+            f"{status} [**Dia {dia}**](#dia-{dia}) ({aba}) · `{tarefa['condominio']}` · "
+            f"{tarefa['tipo']}: {tarefa['descricao']}{valor_str}"
+        )
+    st.markdown("---")
+
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11 = st.tabs(
+    [nome for _, nome in ABAS_DIAS]
+    + ["📊 Resumo", "📈 Painel Anual", "🏦 Conciliação", "💸 Fluxo de Caixa", "🧾 Auditoria", "📚 Histórico",
+       "⚖️ Balanceamento"]
+)
 
 def exibir_tarefas_periodo(dias, tab):
     with tab:
         for dia in sorted(dias):
             if dia in TAREFAS_POR_DIA:
-                st.markdown(f"#### 📆 Dia {dia}")
+                st.markdown(f"<div id='dia-{dia}'></div>\n\n#### 📆 Dia {dia}", unsafe_allow_html=True)
                 
                 tarefas = TAREFAS_POR_DIA[dia]
                 
-                tarefas_filtradas = tarefas
-                
-                if "Todos" not in condominio_filtro:
-                    tarefas_filtradas = [t for t in tarefas_filtradas if t['condominio'] in condominio_filtro]
-                
-                if "Todos" not in tipo_filtro:
-                    tarefas_filtradas = [t for t in tarefas_filtradas if t['tipo'] in tipo_filtro]
+                # Pares (índice original, tarefa): a chave de conclusão não
+                # pode mudar quando um filtro esconde outras tarefas do dia
+                tarefas_filtradas = filtrar_tarefas(tarefas, condominio_filtro, tipo_filtro)
                 
                 if not tarefas_filtradas:
                     st.info("Nenhuma tarefa para este dia com os filtros aplicados.")
                     continue
                 
-                for idx, tarefa in enumerate(tarefas_filtradas):
+                for idx, tarefa in tarefas_filtradas:
                     chave_tarefa = f"{chave_mes}-{dia}-{idx}"
                     concluida = chave_tarefa in tarefas_concluidas_mes
                     
@@ -769,17 +448,9 @@ def exibir_tarefas_periodo(dias, tab):
                     with col1:
                         classe = "tarefa-concluida" if concluida else "tarefa-card"
                         
-                        icones = {
-                            "Boleto": "📄",
-                            "PIX": "💸",
-                            "Transferência": "💰",
-                            "Pagamento": "💵",
-                            "Impostos": "🏛️",
-                            "Vale": "🎫"
-                        }
-                        icone = icones.get(tarefa['tipo'], "📋")
+                        icone = icone_tipo(tarefa['tipo'])
                         
-                        valor_str = f"<br><small style='color: #2e7d32; font-weight: bold;'>💰 R$ {tarefa['valor']:,.2f}</small>".replace(",", "X").replace(".", ",").replace("X", ".") if tarefa.get('valor') else ""
+                        valor_str = f"<br><small style='color: #2e7d32; font-weight: bold;'>💰 {formatar_brl(tarefa['valor'])}</small>" if tarefa.get('valor') else ""
                         
                         destinatario_str = f"<br><small style='color: #666;'>👤 {tarefa.get('destinatario', '')}</small>" if tarefa.get('destinatario') else ""
                         
@@ -794,14 +465,7 @@ def exibir_tarefas_periodo(dias, tab):
                         """, unsafe_allow_html=True)
                     
                     with col2:
-                        if st.checkbox("✓", value=concluida, key=f"dia{dia}_{idx}"):
-                            if chave_tarefa not in tarefas_concluidas_mes:
-                                tarefas_concluidas_mes.append(chave_tarefa)
-                                st.session_state.tarefas_concluidas[chave_mes] = tarefas_concluidas_mes
-                        else:
-                            if chave_tarefa in tarefas_concluidas_mes:
-                                tarefas_concluidas_mes.remove(chave_tarefa)
-                                st.session_state.tarefas_concluidas[chave_mes] = tarefas_concluidas_mes
+                        checkbox_tarefa(f"dia{dia}_{idx}", chave_tarefa, concluida)
                 
                 st.markdown("---")
 
@@ -813,26 +477,402 @@ exibir_tarefas_periodo(range(23, 32), tab4)
 with tab5:
     st.markdown("### 📊 Resumo por Condomínio")
     
-    resumo_cond = {}
-    for tarefas in TAREFAS_POR_DIA.values():
-        for tarefa in tarefas:
-            cond = tarefa['condominio']
-            if cond not in resumo_cond:
-                resumo_cond[cond] = {'total': 0, 'valor': 0}
-            resumo_cond[cond]['total'] += 1
-            if tarefa.get('valor'):
-                resumo_cond[cond]['valor'] += tarefa['valor']
-    
     df_resumo = pd.DataFrame([
         {
             'Condomínio': cond,
-            'Total Tarefas': dados['total'],
-            'Valor Total': f"R$ {dados['valor']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if dados['valor'] > 0 else "-"
+            'Total Tarefas': total,
+            'Valor Total': formatar_brl(valor)
         }
-        for cond, dados in sorted(resumo_cond.items(), key=lambda x: x[1]['total'], reverse=True)
+        for cond, total, valor in sorted(agregados.resumo_condominios(), key=lambda x: x[1], reverse=True)
     ])
     
     st.dataframe(df_resumo, use_container_width=True, hide_index=True)
+    
+    st.markdown("### 📤 Exportar Relatório")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        periodo_export = st.radio("Período", ["Mês selecionado", "Ano inteiro"], horizontal=True)
+    with col2:
+        cond_export = st.selectbox("Condomínio", ["Consolidado"] + CONDOMINIOS, key="cond_export")
+    with col3:
+        formato_export = st.selectbox("Formato", [f.upper() for f in FORMATOS], key="formato_export").lower()
+    
+    meses_export = [st.session_state.mes_atual] if periodo_export == "Mês selecionado" else list(range(1, 13))
+    cond_export = None if cond_export == "Consolidado" else cond_export
+    
+    if st.button("📄 Gerar Relatório"):
+        st.session_state.relatorio_export = (
+            nome_arquivo(st.session_state.ano_atual, meses_export, formato_export, cond_export),
+            exportar_bytes(TAREFAS_POR_DIA, st.session_state.tarefas_concluidas,
+                           st.session_state.ano_atual, meses_export, formato_export, cond_export),
+            FORMATOS[formato_export]
+        )
+    
+    if st.session_state.get('relatorio_export'):
+        nome, dados, mime = st.session_state.relatorio_export
+        st.download_button(f"⬇️ Baixar {nome}", dados, file_name=nome, mime=mime)
+
+with tab6:
+    st.markdown(f"### 📈 Painel Anual - {st.session_state.ano_atual}")
+    
+    def taxa(linha):
+        return f"{linha['concluidas'] / linha['total'] * 100:.0f}%" if linha['total'] else "-"
+    
+    linhas_mes = agregados.resumo_ano_por_mes(st.session_state.ano_atual)
+    
+    st.markdown("#### 📅 Por Mês")
+    st.bar_chart(
+        pd.DataFrame(
+            {'Concluídas': [l['concluidas'] for l in linhas_mes],
+             'Pendentes': [l['total'] - l['concluidas'] for l in linhas_mes]},
+            index=pd.Index([m[:3] for m in MESES], name='Mês')
+        ),
+        color=["#10b981", "#ff6b35"]
+    )
+    st.dataframe(pd.DataFrame([
+        {
+            'Mês': MESES[l['mes'] - 1],
+            'Concluídas': f"{l['concluidas']}/{l['total']}",
+            'Conclusão': taxa(l),
+            'Valor Comprometido': formatar_brl(l['valor_comprometido']),
+            'Valor Concluído': formatar_brl(l['valor_concluido'])
+        }
+        for l in linhas_mes
+    ]), use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    
+    for coluna, grupo, rotulo, icone in ((col1, "condominio", "Condomínio", "🏢"), (col2, "tipo", "Tipo", "📋")):
+        with coluna:
+            st.markdown(f"#### {icone} Por {rotulo}")
+            linhas = sorted(
+                agregados.resumo_ano_por_grupo(st.session_state.ano_atual, grupo),
+                key=lambda l: l['valor_comprometido'], reverse=True
+            )
+            st.dataframe(pd.DataFrame([
+                {
+                    rotulo: l['nome'],
+                    'Concluídas': f"{l['concluidas']}/{l['total']}",
+                    'Conclusão': taxa(l),
+                    'Valor Comprometido': formatar_brl(l['valor_comprometido']),
+                    'Valor Concluído': formatar_brl(l['valor_concluido'])
+                }
+                for l in linhas
+            ]), use_container_width=True, hide_index=True)
+
+with tab7:
+    st.markdown("### 🏦 Conciliação Bancária")
+    st.caption("Importe o extrato (OFX ou CSV) para marcar automaticamente os pagamentos já debitados.")
+    
+    col1, col2, col3, col4 = st.columns([2, 1.5, 1, 1])
+    with col1:
+        extratos = st.file_uploader("Extratos", type=["ofx", "qfx", "csv"], accept_multiple_files=True)
+    with col2:
+        cond_conta = st.selectbox("Condomínio da conta", ["Não informado"] + CONDOMINIOS, key="cond_conta")
+    with col3:
+        tolerancia = st.number_input("Tolerância (%)", 0.0, 10.0, 1.0, 0.5)
+    with col4:
+        janela = st.number_input("Janela (dias)", 0, 15, 5)
+    
+    if extratos and st.button("🔍 Conciliar"):
+        lancamentos = []
+        for extrato in extratos:
+            try:
+                lancamentos += ler_extrato(extrato.name, extrato.getvalue())
+            except ValueError as e:
+                st.error(f"❌ {extrato.name}: {e}")
+        contas = {}
+        if cond_conta != "Não informado":
+            contas = {l.conta: cond_conta for l in lancamentos if l.conta}
+            # CSV sem coluna de conta: todas as linhas são da conta escolhida
+            lancamentos = [l if l.conta else l._replace(conta=cond_conta) for l in lancamentos]
+            contas[cond_conta] = cond_conta
+        st.session_state.conciliacao = conciliar(
+            lancamentos, TAREFAS_POR_DIA, st.session_state.ano_atual, st.session_state.mes_atual,
+            contas=contas,
+            ja_concluidas=[separar_chave_tarefa(c)[2:] for c in tarefas_concluidas_mes],
+            tolerancia=tolerancia / 100, dias_antes=janela, dias_depois=janela
+        )
+    
+    resultado = st.session_state.get('conciliacao')
+    if resultado:
+        def valor_lancamento(lancamento):
+            return formatar_brl(-lancamento.valor)
+        
+        def linha_tarefa(lancamento, candidato):
+            return {
+                'Data Extrato': lancamento.data.strftime("%d/%m"),
+                'Lançamento': lancamento.descricao,
+                'Valor': valor_lancamento(lancamento),
+                'Tarefa': f"Dia {candidato.dia} - {candidato.tarefa['condominio']} - {candidato.tarefa['descricao']}",
+                'Confiança': f"{candidato.pontuacao:.0%}"
+            }
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("✅ Confirmadas", len(resultado.confirmadas))
+        col2.metric("🔎 Para revisar", len(resultado.revisar))
+        col3.metric("❔ Sem correspondência", len(resultado.sem_correspondencia))
+        
+        if resultado.confirmadas:
+            st.markdown("#### ✅ Correspondências confirmadas")
+            st.dataframe(pd.DataFrame([linha_tarefa(l, c) for l, c in resultado.confirmadas]),
+                         use_container_width=True, hide_index=True)
+            st.button(
+                f"✅ Marcar {len(resultado.confirmadas)} tarefas como concluídas",
+                on_click=concluir_em_lote,
+                args=([(c.dia, c.idx, -l.valor) for l, c in resultado.confirmadas],)
+            )
+        
+        if resultado.revisar:
+            st.markdown("#### 🔎 Revisar")
+            escolhidas = []
+            for n, (lancamento, candidatos) in enumerate(resultado.revisar[:50]):
+                opcoes = ["Ignorar"] + [linha_tarefa(lancamento, c)['Tarefa'] + f" ({c.pontuacao:.0%})" for c in candidatos]
+                escolha = st.selectbox(
+                    f"{lancamento.data:%d/%m} · {lancamento.descricao} · {valor_lancamento(lancamento)}",
+                    opcoes, key=f"revisar_{n}"
+                )
+                if escolha != "Ignorar":
+                    candidato = candidatos[opcoes.index(escolha) - 1]
+                    escolhidas.append((candidato.dia, candidato.idx, -lancamento.valor))
+            if len(resultado.revisar) > 50:
+                st.caption(f"Mostrando 50 de {len(resultado.revisar)} lançamentos para revisão.")
+            st.button(
+                f"✅ Marcar {len(escolhidas)} escolhidas como concluídas",
+                on_click=concluir_em_lote, args=(escolhidas,), disabled=not escolhidas
+            )
+        
+        if resultado.sem_correspondencia:
+            with st.expander(f"❔ {len(resultado.sem_correspondencia)} débitos sem tarefa correspondente"):
+                st.dataframe(pd.DataFrame([
+                    {'Data': l.data.strftime("%d/%m/%Y"), 'Descrição': l.descricao, 'Valor': -l.valor}
+                    for l in resultado.sem_correspondencia
+                ]), use_container_width=True, hide_index=True)
+
+with tab8:
+    st.markdown("### 💸 Fluxo de Caixa Projetado")
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        periodo_fluxo = st.radio("Horizonte", ["Mês", "Trimestre", "Ano", "Personalizado"], horizontal=True)
+    with col2:
+        conds_fluxo = st.multiselect("Condomínios (vazio = todos)", CONDOMINIOS, key="conds_fluxo")
+    
+    inicio_fluxo, fim_fluxo = horizonte(st.session_state.ano_atual, st.session_state.mes_atual,
+                                        "Mês" if periodo_fluxo == "Personalizado" else periodo_fluxo)
+    if periodo_fluxo == "Personalizado":
+        intervalo = st.date_input("Período", (inicio_fluxo, fim_fluxo), format="DD/MM/YYYY")
+        if len(intervalo) == 2:
+            inicio_fluxo, fim_fluxo = intervalo
+    
+    # Tabela colunar montada uma vez por sessão
+    if 'tabela_fluxo' not in st.session_state:
+        st.session_state.tabela_fluxo = tabela_tarefas(TAREFAS_POR_DIA)
+    projecao = projetar(st.session_state.tabela_fluxo, inicio_fluxo, fim_fluxo, conds_fluxo or None)
+    
+    total_saida = projecao['diario'].to_numpy().sum()
+    total_sem_valor = int(projecao['sem_valor'].to_numpy().sum())
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Saída projetada", formatar_brl(total_saida, vazio="R$ 0,00"))
+    col2.metric("Período", f"{inicio_fluxo:%d/%m/%Y} - {fim_fluxo:%d/%m/%Y}")
+    col3.metric("⚠️ Tarefas sem valor", total_sem_valor,
+                help="Não entram na soma: o valor só é conhecido no boleto/débito")
+    
+    # Com muitos condomínios o gráfico por linha fica ilegível: mostra o total
+    acumulado = projecao['acumulado']
+    if 0 < len(acumulado.columns) <= 10:
+        st.line_chart(acumulado)
+    else:
+        st.line_chart(acumulado.sum(axis=1).rename("Total"))
+    st.bar_chart(projecao['diario'].sum(axis=1).rename("Saída do dia"), color="#ff6b35")
+    
+    totais_cond = projecao['diario'].sum().sort_values(ascending=False)
+    faltantes_cond = projecao['sem_valor'].sum()
+    st.dataframe(pd.DataFrame({
+        'Condomínio': totais_cond.index,
+        'Saída Projetada': [
+            formatar_brl(v) for v in totais_cond.to_numpy()
+        ],
+        'Sem Valor': faltantes_cond[totais_cond.index].to_numpy()
+    }), use_container_width=True, hide_index=True)
+    
+    if total_sem_valor:
+        with st.expander(f"⚠️ {total_sem_valor} tarefas sem valor conhecido no período"):
+            st.dataframe(
+                tarefas_sem_valor(st.session_state.tabela_fluxo, inicio_fluxo, fim_fluxo, conds_fluxo or None),
+                use_container_width=True, hide_index=True,
+                column_config={"data": st.column_config.DateColumn("Data", format="DD/MM/YYYY")}
+            )
+
+with tab9:
+    st.markdown(f"### 🧾 Auditoria - {MESES[st.session_state.mes_atual - 1]}/{st.session_state.ano_atual}")
+    
+    def descrever_tarefa(chave):
+        _, _, dia, idx = separar_chave_tarefa(chave)
+        tarefas_dia = TAREFAS_POR_DIA.get(dia, [])
+        if idx >= len(tarefas_dia):
+            return f"Dia {dia} - tarefa {idx + 1} (fora do catálogo atual)"
+        return f"Dia {dia} - {tarefas_dia[idx]['condominio']} - {tarefas_dia[idx]['descricao']}"
+    
+    eventos_mes = list(log_auditoria.historico(mes=chave_mes))
+    
+    st.markdown("#### 🕓 Estado em um instante passado")
+    col1, col2 = st.columns(2)
+    with col1:
+        data_consulta = st.date_input("Data", date.today(), format="DD/MM/YYYY", key="auditoria_data")
+    with col2:
+        hora_consulta = st.time_input("Hora", None, key="auditoria_hora",
+                                      help="Vazio: agora (hoje) ou o fim do dia escolhido")
+    if hora_consulta is None and data_consulta == date.today():
+        # Padrão: o estado atual, que a sessão já tem em memória
+        instante = datetime.now()
+        concluidas_instante = set(tarefas_concluidas_mes)
+    else:
+        instante = datetime.combine(data_consulta, hora_consulta or datetime.max.time()).replace(second=59)
+        # Reconstruir o passado lê snapshot + log: só quando o instante ou o log mudam
+        consulta_auditoria = (instante, chave_mes, log_auditoria.seq)
+        if st.session_state.get('consulta_auditoria', (None,))[0] != consulta_auditoria:
+            st.session_state.consulta_auditoria = (consulta_auditoria,
+                                                   log_auditoria.estado_em(instante, chave_mes))
+        concluidas_instante = st.session_state.consulta_auditoria[1]
+    st.metric(f"✅ Concluídas em {instante:%d/%m/%Y %H:%M}", f"{len(concluidas_instante)} de {total_tarefas}")
+    if concluidas_instante:
+        st.dataframe(pd.DataFrame({'Tarefa': [descrever_tarefa(c) for c in sorted(
+            concluidas_instante, key=lambda c: separar_chave_tarefa(c)[2:]
+        )]}), use_container_width=True, hide_index=True)
+    
+    st.markdown("#### 📜 Histórico do mês")
+    if eventos_mes:
+        st.dataframe(pd.DataFrame([
+            {
+                'Quando': datetime.fromisoformat(e['quando']).strftime("%d/%m/%Y %H:%M:%S"),
+                'Usuário': e['usuario'],
+                'Origem': e.get('origem', ''),
+                'Ação': "✅ Concluída" if e['concluida'] else "↩️ Desmarcada",
+                'Tarefa': descrever_tarefa(e['chave'])
+            }
+            for e in reversed(eventos_mes)
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.info("Nenhuma marcação registrada neste mês.")
+
+with tab10:
+    st.markdown("### 📚 Histórico de Pagamentos")
+    
+    pasta_historico = pasta_padrao()
+    # Meses encerrados ganham (ou atualizam) sua partição Parquet sempre que o
+    # log andou desde a última verificação desta sessão, ou o mês virou
+    versao_historico = (log_auditoria.seq, date.today())
+    if st.session_state.get('historico_fechado') != versao_historico:
+        fechar_pendentes(pasta_historico, TAREFAS_POR_DIA, log_auditoria)
+        st.session_state.historico_fechado = versao_historico
+    
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        conds_historico = st.multiselect("Condomínios (vazio = todos)", CONDOMINIOS, key="conds_historico")
+    with col2:
+        texto_historico = st.text_input("Descrição contém", placeholder="Light, Iguá, Salários, TX ADM...",
+                                        key="texto_historico")
+    with col3:
+        meses_historico = st.number_input("Meses", 3, 60, 18, key="meses_historico")
+    
+    fim_historico = (st.session_state.ano_atual, st.session_state.mes_atual)
+    historico_df = consultar(
+        pasta_historico, recuar_meses(*fim_historico, meses_historico - 1), fim_historico,
+        conds_historico or None, texto_historico or None,
+        colunas=["condominio", "descricao", "valor_previsto", "valor_pago"]
+    )
+    analise = variacoes(historico_df) if not historico_df.empty else historico_df
+    
+    if analise.empty:
+        st.info("Nenhum valor no histórico para o período e filtros escolhidos. "
+                "Os meses são fechados automaticamente quando viram; valores pagos vêm da conciliação.")
+    else:
+        analise = analise.assign(
+            periodo=[f"{ano}-{mes:02d}" for ano, mes in zip(analise['ano'], analise['mes'])],
+            serie=analise['condominio'] + " · " + analise['descricao']
+        )
+        series = analise.pivot_table(index='periodo', columns='serie', values='valor')
+        if len(series.columns) <= 10:
+            st.line_chart(series)
+        else:
+            st.caption(f"{len(series.columns)} séries: refine os filtros para ver o gráfico.")
+        
+        atipicos = int(analise['atipico'].sum())
+        st.metric("⚠️ Valores atípicos", atipicos,
+                  help="Longe da mediana dos 12 meses anteriores (z robusto > 3,5 e desvio > 10%)")
+        
+        analise = analise.sort_values(['atipico', 'ano', 'mes'], ascending=[False, True, True])
+        tabela_variacao = pd.DataFrame({
+            'Mês': [f"{mes:02d}/{ano}" for ano, mes in zip(analise['ano'], analise['mes'])],
+            'Condomínio': analise['condominio'],
+            'Descrição': analise['descricao'],
+            'Valor': [formatar_brl(v) for v in analise['valor']],
+            'Referência': [formatar_brl(v) if pd.notna(v) else "-" for v in analise['referencia']],
+            'Desvio': [f"{d:+.0%}" if pd.notna(d) else "-" for d in analise['desvio_pct']],
+            'Atípico': analise['atipico'],
+        })
+        st.dataframe(
+            tabela_variacao.style.apply(
+                lambda linha: ["background-color: #ffe0e0" if linha['Atípico'] else ""] * len(linha), axis=1
+            ),
+            use_container_width=True, hide_index=True
+        )
+    
+    if st.button(f"📦 Fechar {MESES[st.session_state.mes_atual - 1]}/{st.session_state.ano_atual} agora"):
+        fechar_mes(pasta_historico, TAREFAS_POR_DIA, st.session_state.ano_atual, st.session_state.mes_atual,
+                   log_auditoria.historico(mes=chave_mes))
+        st.success("✅ Mês gravado no histórico.")
+
+with tab11:
+    st.markdown("### ⚖️ Balanceamento da Carga Mensal")
+    st.caption("Carga = peso do tipo de tarefa, maior para valores altos. Só TX ADM e PIX a prestadores "
+               "podem ser antecipados, dentro da janela da regra e nunca depois do vencimento.")
+    
+    # Calculado uma vez por sessão: o catálogo não muda durante a sessão
+    if 'balanceamento' not in st.session_state:
+        st.session_state.balanceamento = balancear(TAREFAS_POR_DIA)
+    balanceamento = st.session_state.balanceamento
+    cargas = resumo_cargas(balanceamento)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Pico atual", f"{cargas['Antes'].max():.1f}", help=f"Dia {cargas['Antes'].idxmax()}")
+    col2.metric("Pico proposto", f"{cargas['Depois'].max():.1f}",
+                delta=f"{cargas['Depois'].max() - cargas['Antes'].max():.1f}", delta_color="inverse")
+    col3.metric("Antecipações", len(balanceamento.movimentos))
+    
+    def mapa_calor(quadro, altura):
+        dados = quadro.stack().rename("carga").reset_index()
+        dados.columns = ["linha", "dia", "carga"]
+        return alt.Chart(dados).mark_rect().encode(
+            x=alt.X("dia:O", title="Dia do mês"),
+            y=alt.Y("linha:N", title=None, sort=None),
+            color=alt.Color("carga:Q", scale=alt.Scale(scheme="orangered"), title="Carga"),
+            tooltip=["linha", "dia", alt.Tooltip("carga:Q", format=".1f")],
+        ).properties(height=altura)
+    
+    st.altair_chart(mapa_calor(cargas.T, 90), use_container_width=True)
+    
+    if balanceamento.movimentos:
+        # Por condomínio, só os que têm tarefas antecipadas (lado a lado: antes | depois)
+        afetados = sorted({m.condominio for m in balanceamento.movimentos})[:30]
+        por_condominio = pd.concat({
+            "Antes": balanceamento.antes.loc[afetados],
+            "Depois": balanceamento.depois.loc[afetados],
+        })
+        por_condominio.index = [f"{condominio} · {cenario}" for cenario, condominio in por_condominio.index]
+        por_condominio = por_condominio.sort_index()
+        st.altair_chart(mapa_calor(por_condominio, 22 * len(por_condominio)), use_container_width=True)
+        
+        st.dataframe(pd.DataFrame([
+            {'De': f"Dia {m.dia}", 'Para': f"Dia {m.novo_dia}", 'Condomínio': m.condominio,
+             'Descrição': m.descricao, 'Regra': m.regra, 'Peso': round(m.peso, 2)}
+            for m in balanceamento.movimentos
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.info("Nenhuma antecipação reduz a carga do mês.")
 
 # ============================================================================
 # RODAPÉ
@@ -848,3 +888,40 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+# ============================================================================
+# PERFIL DO RERUN (ADMIN)
+# ============================================================================
+
+if perfil is not None and admin_ativo(st.query_params):
+    with st.sidebar.expander("🩺 Perfil de Execução"):
+        duracoes, funcoes = resumo_perfis("calendario")
+        if duracoes:
+            st.caption(
+                f"Últimos {len(duracoes)} reruns: mediana {sorted(duracoes)[len(duracoes) // 2]:.0f} ms"
+                f" | máx {max(duracoes):.0f} ms"
+            )
+            st.dataframe(funcoes, use_container_width=True, hide_index=True)
+        else:
+            st.caption("Nenhum perfil gravado ainda.")
+
+finalizar_perfil(perfil, st.session_state)
+
+# ============================================================================
+# SINCRONIZAÇÃO ENTRE SESSÕES
+# ============================================================================
+
+# Sem fragmentos no Streamlit 1.31: o script fica consultando o feed (um
+# os.stat por volta) e reroda quando outra sessão grava algo. O caption a
+# cada volta é o ponto em que um clique do usuário interrompe a espera.
+INTERVALO_SINCRONIZACAO = 0.5
+LIMITE_SINCRONIZACAO = 10 * 60
+
+if sincronizar:
+    status_sincronizacao = st.sidebar.empty()
+    for _ in range(int(LIMITE_SINCRONIZACAO / INTERVALO_SINCRONIZACAO)):
+        if log_auditoria.mudancas_desde(st.session_state.versao_vista) != []:
+            st.rerun()
+        status_sincronizacao.caption(f"🔄 Sincronizado às {datetime.now():%H:%M:%S}")
+        time.sleep(INTERVALO_SINCRONIZACAO)
+    status_sincronizacao.caption("⏸️ Sincronização pausada; interaja com a página para retomar.")
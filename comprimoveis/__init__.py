@@ -0,0 +1,6 @@
+"""
+🏢 Pacote de apoio - Comprimóveis
+Consultoria & Administração - "A chave do seu sonho está aqui"
+
+Código compartilhado pelas interfaces Streamlit (agente e calendário BPO).
+"""
@@ -0,0 +1,370 @@
+"""
+📆 Agenda dos vencimentos em iCalendar (.ics), servida por HTTP local
+
+Um feed por condomínio e um consolidado, para assinar no calendário do
+celular em vez de abrir a página do Streamlit:
+
+    python -m comprimoveis.agenda --porta 8787
+    # webcal://<máquina>:8787/consolidado.ics
+    # webcal://<máquina>:8787/anchieta.ics
+
+Cada tarefa do catálogo vence todo mês no seu dia. Vencimentos que caem em
+fim de semana ou feriado bancário nacional são antecipados para o dia útil
+anterior. Sempre que a regra cabe numa RRULE ela é usada:
+
+- dias 3 a 28 e 31: ``FREQ=MONTHLY`` escolhendo o último dia útil (BYDAY
+  seg-sex + BYSETPOS=-1) entre o dia e os dois anteriores, o que já cobre
+  fins de semana; cada feriado que cai numa ocorrência vira uma instância
+  remarcada (mesmo UID + RECURRENCE-ID)
+- dias 1, 2, 29 e 30: o ajuste pode cair no mês anterior ou o dia não
+  existe em todo mês; as ocorrências da janela são expandidas uma a uma
+
+A janela vai do mês anterior a 12 meses à frente (as RRULEs terminam nela,
+assim nenhum feriado fora da janela fica sem ajuste). O texto gerado fica
+em cache com o seu ETag; pedidos com ``If-None-Match`` igual recebem 304, e
+o feed só é gerado de novo quando o catálogo muda ou a janela avança um mês.
+"""
+
+import argparse
+import hashlib
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import NamedTuple
+
+from comprimoveis.busca import slug
+from comprimoveis.catalogo import (
+    catalogo_padrao, condominios_do_catalogo, icone_tipo, meses_entre, vencimento_nominal,
+)
+from comprimoveis.formatacao import formatar_brl
+
+DOMINIO_UID = "calendario-bpo.comprimoveis.local"
+MESES_ANTES = 1
+MESES_DEPOIS = 12
+CONSOLIDADO = "consolidado"
+DIAS_UTEIS = "MO,TU,WE,TH,FR"
+ATUALIZACAO = "PT12H"  # sugestão de intervalo de atualização para os clientes
+
+
+class Feed(NamedTuple):
+    corpo: bytes
+    etag: str
+
+
+# ============================================================================
+# DIAS ÚTEIS
+# ============================================================================
+
+def pascoa(ano):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    mes = (h + l - 7 * m + 90) // 25
+    return date(ano, mes, (h + l - 7 * m + 33 * mes + 19) % 32)
+
+
+def feriados_bancarios(ano):
+    """Feriados nacionais sem expediente bancário no ano."""
+    domingo = pascoa(ano)
+    fixos = [(1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (12, 25)]
+    if ano >= 2024:
+        fixos.append((11, 20))  # Consciência Negra (Lei 14.759/2023)
+    moveis = [-48, -47, -2, 60]  # Carnaval (seg e ter), Sexta-feira Santa, Corpus Christi
+    return {date(ano, mes, dia) for mes, dia in fixos} | {domingo + timedelta(days=n) for n in moveis}
+
+
+def dia_util_anterior(data, feriados=()):
+    """`data` se for dia útil; senão o último dia útil antes dela."""
+    while data.weekday() >= 5 or data in feriados:
+        data -= timedelta(days=1)
+    return data
+
+
+# ============================================================================
+# OCORRÊNCIAS
+# ============================================================================
+
+def janela(hoje, meses_antes=MESES_ANTES, meses_depois=MESES_DEPOIS):
+    """(primeiro dia, último dia) dos meses cobertos pelos feeds."""
+    ano_inicio, mes_inicio = divmod(hoje.year * 12 + hoje.month - 1 - meses_antes, 12)
+    ano_fim, mes_fim = divmod(hoje.year * 12 + hoje.month - 1 + meses_depois, 12)
+    return date(ano_inicio, mes_inicio + 1, 1), vencimento_nominal(ano_fim, mes_fim + 1, 31)
+
+
+def cabe_em_rrule(dia, ajustar):
+    """A ocorrência mensal do dia pode ser descrita por uma RRULE?"""
+    if ajustar:
+        return 3 <= dia <= 28 or dia == 31
+    return dia <= 28 or dia == 31
+
+
+def rrule(dia, ajustar, ate):
+    dia_mes = -1 if dia == 31 else dia
+    if ajustar:
+        dias = "-3,-2,-1" if dia == 31 else f"{dia - 2},{dia - 1},{dia}"
+        regra = f"FREQ=MONTHLY;BYMONTHDAY={dias};BYDAY={DIAS_UTEIS};BYSETPOS=-1"
+    else:
+        regra = f"FREQ=MONTHLY;BYMONTHDAY={dia_mes}"
+    return f"{regra};UNTIL={ate:%Y%m%d}"
+
+
+def ocorrencias(dia, inicio, fim, ajustar=True, feriados=frozenset()):
+    """[(mês, gerada, real)] da tarefa do `dia` entre inicio e fim.
+
+    ``mês`` é o (ano, mes) a que o vencimento pertence, ``gerada`` é a data que a RRULE produz (só fins de semana ajustados) e
+    ``real`` a data com os feriados também ajustados; elas diferem só nas
+    instâncias remarcadas.
+    """
+    resultado = []
+    for ano, mes in meses_entre((inicio.year, inicio.month), (fim.year, fim.month)):
+        nominal = vencimento_nominal(ano, mes, dia)
+        gerada = dia_util_anterior(nominal) if ajustar else nominal
+        real = dia_util_anterior(nominal, feriados) if ajustar else nominal
+        if inicio <= gerada <= fim:
+            resultado.append(((ano, mes), gerada, real))
+    return resultado
+
+
+# ============================================================================
+# ICALENDAR
+# ============================================================================
+
+def _texto(valor):
+    """Escapa um valor TEXT (RFC 5545 §3.3.11)."""
+    return (valor.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _dobrar(linha):
+    """Quebra a linha em trechos de até 75 octetos sem partir caracteres UTF-8."""
+    dados = linha.encode("utf-8")
+    if len(dados) <= 75:
+        return linha
+    partes, atual, tamanho = [], [], 0
+    for caractere in linha:
+        largura = len(caractere.encode("utf-8"))
+        # A primeira linha tem 75 octetos; as seguintes, 74 + o espaço inicial
+        if tamanho + largura > (75 if not partes else 74):
+            partes.append("".join(atual))
+            atual, tamanho = [], 0
+        atual.append(caractere)
+        tamanho += largura
+    partes.append("".join(atual))
+    return "\r\n ".join(partes)
+
+
+def _evento(uid, inicio, tarefa, carimbo, extras=()):
+    descricao = [f"Tipo: {tarefa['tipo']}"]
+    if tarefa.get("destinatario"):
+        descricao.append(f"Destinatário: {tarefa['destinatario']}")
+    descricao.append(f"Valor: {formatar_brl(tarefa.get('valor'), vazio='valor a confirmar')}")
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{carimbo:%Y%m%d}T000000Z",
+        *extras,
+        f"DTSTART;VALUE=DATE:{inicio:%Y%m%d}",
+        f"SUMMARY:{_texto(icone_tipo(tarefa['tipo']) + ' ' + tarefa['condominio'] + ' - ' + tarefa['descricao'])}",
+        f"DESCRIPTION:{_texto(chr(10).join(descricao))}",
+        f"CATEGORIES:{_texto(tarefa['tipo'])}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    ]
+
+
+def gerar_ics(tarefas_por_dia, condominio=None, hoje=None, ajustar=True, feriados_extras=()):
+    """Texto .ics (bytes, CRLF) dos vencimentos de um condomínio ou de todos."""
+    hoje = hoje or date.today()
+    inicio, fim = janela(hoje)
+    feriados = set(feriados_extras)
+    for ano in range(inicio.year - 1, fim.year + 1):
+        feriados |= feriados_bancarios(ano)
+    feriados = frozenset(feriados)
+    # DTSTAMP fixo por janela: o texto só muda quando o conteúdo muda
+    carimbo = inicio
+
+    nome = condominio or "Consolidado"
+    linhas = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Comprimóveis//Calendário BPO//PT-BR",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_texto('BPO - ' + nome)}",
+        "X-WR-TIMEZONE:America/Sao_Paulo",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{ATUALIZACAO}",
+        f"X-PUBLISHED-TTL:{ATUALIZACAO}",
+    ]
+    for dia in sorted(tarefas_por_dia):
+        datas = ocorrencias(dia, inicio, fim, ajustar, feriados)
+        if not datas:
+            continue
+        for idx, tarefa in enumerate(tarefas_por_dia[dia]):
+            if condominio and tarefa["condominio"] != condominio:
+                continue
+            uid = f"bpo-{dia}-{idx}"
+            if cabe_em_rrule(dia, ajustar):
+                serie = f"{uid}@{DOMINIO_UID}"
+                linhas += _evento(serie, datas[0][1], tarefa, carimbo, [f"RRULE:{rrule(dia, ajustar, fim)}"])
+                for _, gerada, real in datas:
+                    if real != gerada:
+                        linhas += _evento(serie, real, tarefa, carimbo, [f"RECURRENCE-ID;VALUE=DATE:{gerada:%Y%m%d}"])
+            else:
+                for (ano, mes), _, real in datas:
+                    linhas += _evento(f"{uid}-{ano}{mes:02d}@{DOMINIO_UID}", real, tarefa, carimbo)
+    linhas.append("END:VCALENDAR")
+    return "".join(_dobrar(linha) + "\r\n" for linha in linhas).encode("utf-8")
+
+
+def feeds_disponiveis(tarefas_por_dia):
+    """{nome do arquivo sem .ics: condomínio (None = consolidado)}."""
+    feeds = {CONSOLIDADO: None}
+    for condominio in condominios_do_catalogo(tarefas_por_dia):
+        feeds[slug(condominio)] = condominio
+    return feeds
+
+
+# ============================================================================
+# CACHE E SERVIDOR
+# ============================================================================
+
+class CacheFeeds:
+    """Feeds gerados sob demanda e guardados até o catálogo mudar ou a janela avançar.
+
+    `obter_catalogo` é chamado a cada pedido; ``catalogo_padrao`` devolve o
+    mesmo objeto enquanto o arquivo do catálogo não muda, então comparar a
+    identidade basta para saber se o cache ainda vale.
+    """
+
+    def __init__(self, obter_catalogo, ajustar=True, feriados_extras=(), hoje=date.today):
+        self.obter_catalogo = obter_catalogo
+        self.ajustar = ajustar
+        self.feriados_extras = tuple(feriados_extras)
+        self.hoje = hoje
+        self.geracoes = 0
+        self._lock = threading.Lock()
+        self._catalogo = None
+        self._janela = None
+        self._feeds = {}
+        self._nomes = {}
+
+    def _validar(self):
+        catalogo = self.obter_catalogo()
+        janela_atual = janela(self.hoje())
+        if catalogo is not self._catalogo or janela_atual != self._janela:
+            self._catalogo, self._janela = catalogo, janela_atual
+            self._feeds = {}
+            self._nomes = feeds_disponiveis(catalogo)
+        return catalogo
+
+    def nomes(self):
+        with self._lock:
+            self._validar()
+            return list(self._nomes)
+
+    def feed(self, nome):
+        """Feed pelo nome (sem .ics), ou None se não existir."""
+        with self._lock:
+            catalogo = self._validar()
+            if nome not in self._nomes:
+                return None
+            if nome not in self._feeds:
+                corpo = gerar_ics(catalogo, self._nomes[nome], self.hoje(), self.ajustar, self.feriados_extras)
+                self._feeds[nome] = Feed(corpo, f'"{hashlib.sha1(corpo).hexdigest()}"')
+                self.geracoes += 1
+            return self._feeds[nome]
+
+
+def _etag_confere(cabecalho, etag):
+    """If-None-Match: lista de ETags (fortes ou fracos) ou "*"."""
+    if not cabecalho:
+        return False
+    candidatos = [parte.strip().removeprefix("W/") for parte in cabecalho.split(",")]
+    return "*" in candidatos or etag in candidatos
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    server_version = "AgendaBPO/1.0"
+
+    def do_HEAD(self):
+        self._responder(corpo=False)
+
+    def do_GET(self):
+        self._responder(corpo=True)
+
+    def _responder(self, corpo):
+        cache = self.server.cache
+        caminho = self.path.split("?", 1)[0].strip("/")
+        if caminho == "":
+            texto = "".join(f"/{nome}.ics\n" for nome in cache.nomes()).encode("utf-8")
+            self._enviar(200, {"Content-Type": "text/plain; charset=utf-8"}, texto if corpo else b"", len(texto))
+            return
+        feed = cache.feed(caminho.removesuffix(".ics")) if caminho.endswith(".ics") else None
+        if feed is None:
+            texto = b"feed inexistente\n"
+            self._enviar(404, {"Content-Type": "text/plain; charset=utf-8"}, texto if corpo else b"", len(texto))
+            return
+        cabecalhos = {"ETag": feed.etag, "Cache-Control": "no-cache"}
+        if _etag_confere(self.headers.get("If-None-Match"), feed.etag):
+            self._enviar(304, cabecalhos, b"", None)
+            return
+        cabecalhos["Content-Type"] = "text/calendar; charset=utf-8"
+        self._enviar(200, cabecalhos, feed.corpo if corpo else b"", len(feed.corpo))
+
+    def _enviar(self, status, cabecalhos, corpo, tamanho):
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        if tamanho is not None:
+            self.send_header("Content-Length", str(tamanho))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def criar_servidor(cache, host="127.0.0.1", porta=8787):
+    servidor = ThreadingHTTPServer((host, porta), _Manipulador)
+    servidor.cache = cache
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Feeds iCalendar dos vencimentos BPO.")
+    parser.add_argument("--catalogo", help="catálogo JSON ({dia: [tarefas]}); padrão: o da Comprimóveis")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8787)
+    parser.add_argument("--feriado", action="append", default=[], type=date.fromisoformat,
+                        help="feriado local AAAA-MM-DD (pode repetir)")
+    parser.add_argument("--sem-ajuste", action="store_true", help="não antecipar vencimentos em dias não úteis")
+    parser.add_argument("--saida", help="grava os .ics nesta pasta e sai, sem servidor")
+    args = parser.parse_args(argv)
+
+    cache = CacheFeeds(lambda: catalogo_padrao(args.catalogo), not args.sem_ajuste, args.feriado)
+    if args.saida:
+        pasta = Path(args.saida)
+        pasta.mkdir(parents=True, exist_ok=True)
+        for nome in cache.nomes():
+            (pasta / f"{nome}.ics").write_bytes(cache.feed(nome).corpo)
+            print(f"📆 {pasta / nome}.ics")
+        return
+
+    servidor = criar_servidor(cache, args.host, args.porta)
+    print(f"📆 Agenda em http://{args.host}:{args.porta}/ ({len(cache.nomes())} feeds)", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+🤖 Núcleo do Agente Comprimóveis (sem Streamlit)
+
+Contexto, montagem do prompt com a janela de histórico, chamada ao Gemini e
+tradução de erros. A interface web e qualquer outro canal (ex.: o gateway
+assíncrono em ``comprimoveis.gateway``) usam as mesmas funções.
+``google.generativeai`` só é importado na primeira resposta: o import custa
+~0,5 s e não precisa pesar na abertura da página.
+"""
+
+MODELO = "gemini-2.5-flash"
+JANELA_HISTORICO = 6  # mensagens = últimas 3 interações
+
+CONTEXTO = """Você é o assistente inteligente da Comprimóveis - Consultoria & Administração.
+CRECI: 37215
+Slogan: "A chave do seu sonho está aqui"
+
+Localização: Estrada dos Três Rios, 1200 Sala 620, Freguesia - RJ
+Telefones: (21) 3933-4137, (21) 2421-3375
+WhatsApp: (21) 99372-1324
+
+Você atua em: Freguesia (Jacarepaguá), Pechincha, Tanque, Tijuca e todo Rio de Janeiro.
+
+Serviços principais:
+- Compra e venda de imóveis
+- Locação de imóveis
+- Administração de condomínios (relatórios financeiros, RH, assessoria jurídica, contábil)
+- Gestão de facilities
+
+Equipe:
+- Ubirajara: Dono e especialista em compra e vendas
+- Vanessa: Dona, administradora e marketing
+- Erick: Corretor
+- Mais 2 corretores
+
+Diferenciais:
+- Transparência total (envio mensal de relatórios)
+- Assessoria completa (trabalhista, jurídica, contábil)
+- Sistema de gestão inovador
+- Acompanhamento em assembleias
+
+Seja profissional, prestativo e objetivo. Use emojis moderadamente para deixar a conversa agradável."""
+
+BOAS_VINDAS = """Olá! 👋 Bem-vindo à Comprimóveis!
+
+Sou o assistente virtual da empresa. Como posso ajudá-lo(a) hoje?
+
+💡 **Posso auxiliar com:**
+- Informações sobre imóveis para venda ou locação
+- Gestão de condomínios
+- Assessoria imobiliária
+- Dúvidas sobre nossos serviços
+
+Fique à vontade para perguntar! 😊"""
+
+
+def historico_texto(mensagens, janela=JANELA_HISTORICO):
+    """Últimas `janela` mensagens ({"role", "content"}) como texto corrido."""
+    return "\n\n".join(
+        f"{'Usuário' if msg['role'] == 'user' else 'Você'}: {msg['content']}"
+        for msg in mensagens[-janela:]
+    )
+
+
+def montar_prompt(mensagens, pergunta, contexto=CONTEXTO):
+    return f"""{contexto}
+
+Histórico recente da conversa:
+{historico_texto(mensagens)}
+
+Usuário pergunta agora: {pergunta}
+
+Responda de forma profissional, prestativa e objetiva:"""
+
+
+def gerar_resposta(api_key, prompt_completo, modelo=MODELO):
+    """Texto da resposta do Gemini; exceções da API sobem para quem chamou."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(modelo).generate_content(prompt_completo).text
+
+
+async def gerar_resposta_async(modelo, prompt_completo):
+    """Como gerar_resposta, mas sem prender uma thread enquanto o Gemini responde.
+
+    Recebe o ``GenerativeModel`` já criado: ele guarda o canal gRPC, que
+    assim é um só para todas as conversas (``genai.configure`` a cada
+    chamada descartaria o cliente e abriria outro canal).
+    """
+    resposta = await modelo.generate_content_async(prompt_completo)
+    return resposta.text
+
+
+def mensagem_erro(e):
+    """Mensagem amigável (markdown) para uma falha na geração da resposta."""
+    erro_msg = f"❌ **Erro:** {str(e)}\n\n"
+
+    if "API_KEY_INVALID" in str(e) or "not valid" in str(e):
+        erro_msg += "💡 Sua API Key parece estar incorreta. Verifique no menu lateral."
+    elif "quota" in str(e).lower() or "limit" in str(e).lower():
+        erro_msg += "⚠️ Limite de uso da API atingido. Aguarde alguns minutos ou tente amanhã."
+    else:
+        erro_msg += "💡 Tente reformular sua pergunta ou verifique sua conexão."
+    return erro_msg
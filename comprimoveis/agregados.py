@@ -0,0 +1,201 @@
+"""
+📈 Agregados do calendário BPO
+
+Totais por mês, condomínio e tipo calculados uma única vez a partir do
+catálogo de tarefas e atualizados incrementalmente a cada marcação, para
+que o painel anual e o resumo não percorram ``TAREFAS_POR_DIA`` a cada rerun.
+
+O catálogo é um modelo mensal (as mesmas tarefas todos os meses), então a
+parte "comprometida" (quantidade e valor) é fixa por mês e montada uma vez
+por processo (``totais_padrao``); cada sessão guarda só a parte "concluída",
+que varia por (ano, mês).
+"""
+
+import os
+from functools import lru_cache
+
+from comprimoveis.catalogo import VARIAVEL_CATALOGO, carregar_catalogo, catalogo_embutido
+
+MESES = [
+    "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+    "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"
+]
+
+
+def chave_mes(mes, ano):
+    """Chave usada em st.session_state.tarefas_concluidas ("3/2026")."""
+    return f"{mes}/{ano}"
+
+
+def chave_tarefa(mes, ano, dia, idx):
+    """Chave de uma tarefa concluída ("3/2026-15-4")."""
+    return f"{chave_mes(mes, ano)}-{dia}-{idx}"
+
+
+def separar_chave_tarefa(chave):
+    """Inverso de chave_tarefa: devolve (mes, ano, dia, idx)."""
+    mes_ano, dia, idx = chave.rsplit("-", 2)
+    mes, ano = mes_ano.split("/")
+    return int(mes), int(ano), int(dia), int(idx)
+
+
+class _Contador:
+    """Quantidade e valor somados de um grupo de tarefas."""
+
+    __slots__ = ("quantidade", "valor")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.valor = 0.0
+
+    def somar(self, valor, sinal=1):
+        self.quantidade += sinal
+        self.valor += sinal * (valor or 0.0)
+
+
+class _AgregadoMes:
+    __slots__ = ("total", "por_condominio", "por_tipo")
+
+    def __init__(self):
+        self.total = _Contador()
+        self.por_condominio = {}
+        self.por_tipo = {}
+
+    def somar(self, condominio, tipo, valor, sinal=1):
+        self.total.somar(valor, sinal)
+        self.por_condominio.setdefault(condominio, _Contador()).somar(valor, sinal)
+        self.por_tipo.setdefault(tipo, _Contador()).somar(valor, sinal)
+
+
+class TotaisCatalogo:
+    """Índice de tarefas + totais comprometidos do modelo mensal; compartilhado entre sessões."""
+
+    def __init__(self, tarefas_por_dia):
+        # (dia, idx) -> (condominio, tipo, valor)
+        self.tarefas = {}
+        self.comprometido = _AgregadoMes()
+        for dia, tarefas in tarefas_por_dia.items():
+            for idx, tarefa in enumerate(tarefas):
+                condominio, tipo, valor = tarefa["condominio"], tarefa["tipo"], tarefa.get("valor")
+                self.tarefas[(dia, idx)] = (condominio, tipo, valor)
+                self.comprometido.somar(condominio, tipo, valor)
+
+
+@lru_cache(maxsize=4)
+def _totais_arquivo(caminho, _mtime):
+    return TotaisCatalogo(carregar_catalogo(caminho))
+
+
+@lru_cache(maxsize=None)
+def _totais_embutidos():
+    return TotaisCatalogo(catalogo_embutido())
+
+
+def totais_padrao():
+    """Totais do catálogo de catalogo_padrao(), montados uma vez por processo (e por versão do JSON)."""
+    caminho = os.environ.get(VARIAVEL_CATALOGO)
+    if caminho:
+        return _totais_arquivo(caminho, os.path.getmtime(caminho))
+    return _totais_embutidos()
+
+
+class AgregadosBPO:
+    """Contadores de conclusão por (ano, mês) de uma sessão sobre os totais do catálogo."""
+
+    def __init__(self, totais):
+        self.totais = totais
+        self.comprometido = totais.comprometido
+        # (ano, mes) -> _AgregadoMes das concluídas
+        self._concluido = {}
+        # (ano, mes) -> set de (dia, idx) concluídos, para marcações idempotentes
+        self._marcadas = {}
+
+    @classmethod
+    def de_sessao(cls, totais, tarefas_concluidas):
+        """Reconstrói os contadores a partir de st.session_state.tarefas_concluidas."""
+        agregados = cls(totais)
+        for chaves in tarefas_concluidas.values():
+            for chave in chaves:
+                mes, ano, dia, idx = separar_chave_tarefa(chave)
+                agregados.marcar(ano, mes, dia, idx, True)
+        return agregados
+
+    # ------------------------------------------------------------------
+    # Atualização incremental
+    # ------------------------------------------------------------------
+
+    def marcar(self, ano, mes, dia, idx, concluida):
+        """Marca/desmarca uma tarefa; chamadas repetidas não alteram os totais."""
+        tarefa = self.totais.tarefas.get((dia, idx))
+        if tarefa is None:
+            return
+        marcadas = self._marcadas.setdefault((ano, mes), set())
+        if concluida == ((dia, idx) in marcadas):
+            return
+        if concluida:
+            marcadas.add((dia, idx))
+        else:
+            marcadas.discard((dia, idx))
+        agregado = self._concluido.setdefault((ano, mes), _AgregadoMes())
+        agregado.somar(*tarefa, sinal=1 if concluida else -1)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    @property
+    def condominios(self):
+        return list(self.comprometido.por_condominio)
+
+    @property
+    def tipos(self):
+        return list(self.comprometido.por_tipo)
+
+    def concluidas_mes(self, ano, mes):
+        agregado = self._concluido.get((ano, mes))
+        return agregado.total.quantidade if agregado else 0
+
+    def resumo_condominios(self):
+        """Linhas (condomínio, total de tarefas, valor comprometido) do modelo mensal."""
+        return [
+            (condominio, contador.quantidade, contador.valor)
+            for condominio, contador in self.comprometido.por_condominio.items()
+        ]
+
+    def resumo_ano_por_mes(self, ano):
+        """Uma linha por mês com totais comprometidos e concluídos."""
+        total = self.comprometido.total
+        linhas = []
+        for mes in range(1, 13):
+            agregado = self._concluido.get((ano, mes))
+            concluido = agregado.total if agregado else _Contador()
+            linhas.append({
+                "mes": mes,
+                "total": total.quantidade,
+                "concluidas": concluido.quantidade,
+                "valor_comprometido": total.valor,
+                "valor_concluido": concluido.valor,
+            })
+        return linhas
+
+    def resumo_ano_por_grupo(self, ano, grupo):
+        """Totais anuais por "condominio" ou "tipo", somando os 12 meses."""
+        comprometido = getattr(self.comprometido, f"por_{grupo}")
+        linhas = {
+            nome: {
+                "nome": nome,
+                "total": contador.quantidade * 12,
+                "concluidas": 0,
+                "valor_comprometido": contador.valor * 12,
+                "valor_concluido": 0.0,
+            }
+            for nome, contador in comprometido.items()
+        }
+        for mes in range(1, 13):
+            agregado = self._concluido.get((ano, mes))
+            if agregado is None:
+                continue
+            for nome, contador in getattr(agregado, f"por_{grupo}").items():
+                linhas[nome]["concluidas"] += contador.quantidade
+                linhas[nome]["valor_concluido"] += contador.valor
+        return list(linhas.values())
@@ -0,0 +1,164 @@
+"""
+🗄️ Catálogo de tarefas em colunas compactas
+
+``ArmazemTarefas`` guarda o catálogo ``{dia: [tarefa, ...]}`` coluna a
+coluna em vez de um dict por tarefa:
+
+- ``dia``, ``idx`` e ``valor`` em ``array`` (bytes crus, sem um objeto
+  Python por número; valor ausente = NaN)
+- condomínio, tipo e destinatário como códigos inteiros apontando para a
+  lista de valores distintos de cada coluna
+- descrição como lista de strings internadas (repetições como "FGTS + INSS"
+  ocupam uma vez só)
+
+Para o resto do código ele continua parecendo o dict original: é um
+``Mapping`` dia -> lista de tarefas, e cada tarefa é uma ``Tarefa`` com
+``__slots__`` (só a referência ao armazém e o número da linha) que responde
+a ``tarefa["campo"]`` e ``tarefa.get("campo")``. As visões são criadas sob
+demanda e descartadas; o armazém é o único dono dos dados.
+"""
+
+import math
+import sys
+from array import array
+from collections.abc import Mapping
+
+CAMPOS = ("condominio", "tipo", "descricao", "destinatario", "valor")
+
+
+class _Categorias:
+    """Valores distintos em ordem de aparição; cada linha guarda só o código."""
+
+    __slots__ = ("valores", "codigos", "_posicoes")
+
+    def __init__(self, tipo_codigo="H"):
+        self.valores = []
+        self.codigos = array(tipo_codigo)
+        self._posicoes = {}
+
+    def acrescentar(self, valor):
+        codigo = self._posicoes.get(valor)
+        if codigo is None:
+            codigo = self._posicoes[valor] = len(self.valores)
+            self.valores.append(valor)
+        self.codigos.append(codigo)
+
+    def __getitem__(self, linha):
+        return self.valores[self.codigos[linha]]
+
+
+class Tarefa:
+    """Visão de uma linha do armazém, com a interface de leitura de um dict."""
+
+    __slots__ = ("_armazem", "linha")
+
+    def __init__(self, armazem, linha):
+        self._armazem = armazem
+        self.linha = linha
+
+    def __getitem__(self, campo):
+        armazem, linha = self._armazem, self.linha
+        if campo == "condominio":
+            return armazem.condominios[linha]
+        if campo == "tipo":
+            return armazem.tipos[linha]
+        if campo == "descricao":
+            return armazem.descricoes[linha]
+        if campo == "valor":
+            valor = armazem.valores[linha]
+            return None if math.isnan(valor) else valor
+        if campo == "destinatario":
+            destinatario = armazem.destinatarios[linha]
+            if destinatario is not None:
+                return destinatario
+        raise KeyError(campo)
+
+    def get(self, campo, padrao=None):
+        try:
+            return self[campo]
+        except KeyError:
+            return padrao
+
+    def keys(self):
+        return [campo for campo in CAMPOS if campo in self]
+
+    def __contains__(self, campo):
+        return campo in CAMPOS and (campo != "destinatario" or self._armazem.destinatarios[self.linha] is not None)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    @property
+    def dia(self):
+        return self._armazem.dias[self.linha]
+
+    @property
+    def idx(self):
+        return self._armazem.indices[self.linha]
+
+    def __eq__(self, outra):
+        if isinstance(outra, Tarefa):
+            return outra._armazem is self._armazem and outra.linha == self.linha
+        if isinstance(outra, dict):
+            return dict(self) == outra
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._armazem), self.linha))
+
+    def __repr__(self):
+        return f"Tarefa({dict(self)!r})"
+
+
+class ArmazemTarefas(Mapping):
+    def __init__(self, tarefas_por_dia):
+        self.dias = array("B")
+        self.indices = array("H")
+        self.valores = array("d")
+        self.condominios = _Categorias()
+        self.tipos = _Categorias("B")
+        self.destinatarios = _Categorias()
+        self.descricoes = []
+        self._faixas = {}  # dia -> (primeira linha, última linha + 1)
+
+        for dia in sorted(tarefas_por_dia, key=int):
+            inicio = len(self.dias)
+            for idx, tarefa in enumerate(tarefas_por_dia[dia]):
+                valor = tarefa.get("valor")
+                self.dias.append(int(dia))
+                self.indices.append(idx)
+                self.valores.append(math.nan if valor is None else valor)
+                self.condominios.acrescentar(tarefa["condominio"])
+                self.tipos.acrescentar(tarefa["tipo"])
+                self.destinatarios.acrescentar(tarefa.get("destinatario"))
+                self.descricoes.append(sys.intern(tarefa["descricao"]))
+            self._faixas[int(dia)] = (inicio, len(self.dias))
+
+    # Interface de Mapping: dia -> [Tarefa]
+    def __getitem__(self, dia):
+        inicio, fim = self._faixas[dia]
+        return [Tarefa(self, linha) for linha in range(inicio, fim)]
+
+    def __iter__(self):
+        return iter(self._faixas)
+
+    def __len__(self):
+        return len(self._faixas)
+
+    @property
+    def total(self):
+        """Quantidade de tarefas (len() conta dias, como no dict original)."""
+        return len(self.dias)
+
+    def tarefa(self, dia, idx):
+        inicio, fim = self._faixas[dia]
+        if not 0 <= idx < fim - inicio:
+            raise IndexError(idx)
+        return Tarefa(self, inicio + idx)
+
+    def como_dicts(self):
+        """O catálogo de volta no formato original (para JSON)."""
+        return {dia: [dict(tarefa) for tarefa in self[dia]] for dia in self}
@@ -0,0 +1,315 @@
+"""
+🧾 Trilha de auditoria das conclusões de tarefas
+
+Cada marcação ou desmarcação vira um evento acrescentado a um log JSONL que
+nunca é reescrito: quem (e de qual sessão), quando, qual tarefa e de qual
+mês. O estado atual não é guardado à parte; ele é derivado do log.
+
+Para não reler anos de eventos a cada abertura, a cada ``intervalo_snapshot``
+eventos o estado completo é gravado num snapshot junto com a posição (em
+bytes) do log até onde ele vale. Carregar = último snapshot + cauda do log a
+partir daquela posição. Os snapshots antigos ficam: eles são os pontos de
+partida da "viagem no tempo" (estado de qualquer mês em qualquer instante).
+
+O mesmo log é o estado compartilhado entre sessões (e processos):
+
+- o ``seq`` do último evento é a versão global; a versão de uma tarefa é o
+  ``seq`` do último evento que a tocou
+- ``registrar(..., versao_base=v)`` é otimista: uma tarefa alterada depois
+  da versão ``v`` que a sessão viu não é sobrescrita, volta como conflito
+- ``mudancas_desde(v)`` devolve só os eventos posteriores a ``v``, então
+  cada sessão se atualiza sem recarregar o mês inteiro
+
+    .auditoria/
+        eventos.jsonl
+        snapshots/000000001000-20261019T103102.json
+"""
+
+import fcntl
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+VARIAVEL_PASTA = "COMPRIMOVEIS_AUDITORIA_DIR"
+PASTA_PADRAO = ".auditoria"
+INTERVALO_SNAPSHOT = 1000
+EVENTOS_RECENTES = 5000
+
+
+class Registro(NamedTuple):
+    eventos: list    # eventos gravados
+    conflitos: list  # último evento de cada tarefa alterada depois da versão base
+
+
+def _instante(quando):
+    return quando.isoformat(timespec="seconds")
+
+
+class LogAuditoria:
+    def __init__(self, pasta, intervalo_snapshot=INTERVALO_SNAPSHOT):
+        self.pasta = Path(pasta)
+        self.pasta_snapshots = self.pasta / "snapshots"
+        self.pasta_snapshots.mkdir(parents=True, exist_ok=True)
+        self.arquivo = self.pasta / "eventos.jsonl"
+        self.arquivo_trava = self.pasta / ".trava"
+        self.intervalo_snapshot = intervalo_snapshot
+        self._lock = threading.Lock()
+        # Janela dos últimos eventos, servida pelo feed de mudanças
+        self._recentes = deque(maxlen=EVENTOS_RECENTES)
+
+        self._estado, self._versoes, self.seq, self._posicao = self._partida(self._snapshots()[-1:])
+        self._desde_snapshot = 0
+        with self._travar_arquivo():
+            self._descartar_linha_parcial(self._acompanhar())
+        # Posições das linhas de cada mês no log e seq do último evento de
+        # cada mês, montados na primeira consulta
+        self._linhas_mes = {}
+        self._seq_mes = {}
+        self._indexado_ate = 0
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _snapshots(self):
+        """Snapshots em ordem de seq: [(seq, instante, caminho)]."""
+        snapshots = []
+        for caminho in sorted(self.pasta_snapshots.glob("*.json")):
+            seq, _, instante = caminho.stem.partition("-")
+            snapshots.append((int(seq), datetime.strptime(instante, "%Y%m%dT%H%M%S"), caminho))
+        return snapshots
+
+    def _partida(self, snapshots):
+        """(estado, versões, seq, posição no log) do snapshot dado, ou do log vazio."""
+        if not snapshots:
+            return {}, {}, 0, 0
+        with open(snapshots[-1][2], encoding="utf-8") as arquivo:
+            dados = json.load(arquivo)
+        estado = {mes: set(chaves) for mes, chaves in dados["estado"].items()}
+        return estado, dados.get("versoes", {}), dados["seq"], dados["posicao"]
+
+    def _eventos_desde(self, posicao):
+        """Gera (posição após a linha, evento) do log a partir de `posicao`.
+
+        Uma última linha sem "\\n" (gravação em andamento ou interrompida) é ignorada.
+        """
+        if not self.arquivo.exists():
+            return
+        with open(self.arquivo, "rb") as arquivo:
+            arquivo.seek(posicao)
+            for linha in arquivo:
+                if not linha.endswith(b"\n"):
+                    return
+                posicao += len(linha)
+                yield posicao, json.loads(linha)
+
+    @staticmethod
+    def _aplicar(estado, evento):
+        concluidas = estado.setdefault(evento["mes"], set())
+        if evento["concluida"]:
+            concluidas.add(evento["chave"])
+        else:
+            concluidas.discard(evento["chave"])
+
+    def _reaplicar(self, estado, posicao, ate=None):
+        """Aplica a cauda do log a `estado`; para no primeiro evento posterior a `ate`."""
+        for nova_posicao, evento in self._eventos_desde(posicao):
+            if ate is not None and evento["quando"] > ate:
+                break
+            self._aplicar(estado, evento)
+            posicao = nova_posicao
+        return posicao
+
+    def _incorporar(self, evento):
+        self._aplicar(self._estado, evento)
+        self._versoes[evento["chave"]] = evento["seq"]
+        self._recentes.append(evento)
+        self.seq = evento["seq"]
+
+    def _acompanhar(self):
+        """Incorpora eventos gravados por outros processos; devolve o tamanho do arquivo."""
+        try:
+            tamanho = os.stat(self.arquivo).st_size
+        except FileNotFoundError:
+            return 0
+        if tamanho > self._posicao:
+            for posicao, evento in self._eventos_desde(self._posicao):
+                self._incorporar(evento)
+                self._desde_snapshot += 1
+                self._posicao = posicao
+        return tamanho
+
+    def _descartar_linha_parcial(self, tamanho):
+        """Só com a trava de arquivo: sem ela a linha pode ser uma gravação em andamento."""
+        if tamanho > self._posicao:
+            with open(self.arquivo, "r+b") as arquivo:
+                arquivo.truncate(self._posicao)
+
+    def _travar_arquivo(self):
+        """Trava exclusiva entre processos (flock), liberada ao fechar o arquivo."""
+        trava = open(self.arquivo_trava, "a")
+        fcntl.flock(trava, fcntl.LOCK_EX)
+        return trava
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def registrar(self, usuario, chaves, concluida, mes, quando=None, versao_base=None, valores=None,
+                  origem=None):
+        """Acrescenta um evento por chave que muda de estado.
+
+        `valores` ({chave: valor}) guarda o valor efetivamente pago, quando
+        conhecido (ex.: vindo do extrato na conciliação); `origem`, de onde
+        veio a marcação (sessão, IP). Com `versao_base`, uma chave alterada
+        depois dessa versão e cujo estado atual difere do pedido não é
+        gravada: volta em ``conflitos``. Pedir o estado em que a tarefa já
+        está nunca é conflito.
+        """
+        with self._lock, self._travar_arquivo():
+            # Carimbado já com a trava: a ordem de "quando" no arquivo segue a de "seq"
+            instante = _instante(quando or datetime.now())
+            self._descartar_linha_parcial(self._acompanhar())
+            eventos, conflitos = [], []
+            for chave in chaves:
+                if (chave in self._estado.get(mes, ())) == concluida:
+                    continue
+                versao = self._versoes.get(chave, 0)
+                if versao_base is not None and versao > versao_base:
+                    conflitos.append(self._evento(versao))
+                    continue
+                evento = {"seq": self.seq + 1, "quando": instante, "usuario": usuario,
+                          "mes": mes, "chave": chave, "concluida": concluida}
+                if valores and chave in valores:
+                    evento["valor"] = valores[chave]
+                if origem:
+                    evento["origem"] = origem
+                self._incorporar(evento)
+                eventos.append(evento)
+            if not eventos:
+                return Registro(eventos, conflitos)
+
+            dados = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in eventos).encode("utf-8")
+            with open(self.arquivo, "ab") as arquivo:
+                arquivo.write(dados)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            self._posicao += len(dados)
+
+            self._desde_snapshot += len(eventos)
+            if self._desde_snapshot >= self.intervalo_snapshot:
+                self._gravar_snapshot(instante)
+            return Registro(eventos, conflitos)
+
+    def _gravar_snapshot(self, instante):
+        nome = f"{self.seq:012d}-{instante.replace('-', '').replace(':', '')}.json"
+        temporario = self.pasta_snapshots / f".{nome}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump({
+                "seq": self.seq,
+                "posicao": self._posicao,
+                "estado": {mes: sorted(chaves) for mes, chaves in self._estado.items() if chaves},
+                "versoes": self._versoes,
+            }, arquivo, ensure_ascii=False)
+        temporario.replace(self.pasta_snapshots / nome)
+        self._desde_snapshot = 0
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _evento(self, seq):
+        """Evento `seq` se ainda estiver na janela recente, senão None."""
+        if self._recentes and self._recentes[0]["seq"] <= seq <= self.seq:
+            return self._recentes[seq - self._recentes[0]["seq"]]
+        return None
+
+    def concluidas(self):
+        """Estado atual no formato da sessão: (versão, {"mes/ano": [chaves]})."""
+        with self._lock:
+            self._acompanhar()
+            return self.seq, {mes: sorted(chaves) for mes, chaves in self._estado.items() if chaves}
+
+    def versao_tarefa(self, chave):
+        return self._versoes.get(chave, 0)
+
+    def mudancas_desde(self, versao):
+        """Eventos posteriores a `versao`, em ordem; None se já saíram da janela recente.
+
+        Quando nada mudou custa um ``os.stat``: é o que as sessões abertas
+        consultam a cada poucos segundos.
+        """
+        with self._lock:
+            self._acompanhar()
+            if versao >= self.seq:
+                return []
+            if not self._recentes or self._recentes[0]["seq"] > versao + 1:
+                return None
+            inicio = versao + 1 - self._recentes[0]["seq"]
+            return [self._recentes[i] for i in range(inicio, len(self._recentes))]
+
+    def estado_em(self, quando, mes=None):
+        """Estado em `quando`: {"mes/ano": set(chaves)}, ou o set de um único mês.
+
+        Se nenhum evento é posterior a `quando` (o caso de "agora"), é o
+        estado em memória. Senão parte do último snapshot anterior a `quando`
+        e reaplica só o trecho do log entre ele e o instante pedido.
+        """
+        with self._lock:
+            self._acompanhar()
+            # O último evento incorporado é sempre o de seq == self.seq
+            if self.seq == 0 or (self._recentes and self._recentes[-1]["quando"] <= _instante(quando)):
+                estado = {m: set(chaves) for m, chaves in self._estado.items()}
+                return estado.get(mes, set()) if mes is not None else estado
+        anteriores = [s for s in self._snapshots() if s[1] <= quando]
+        estado, _, _, posicao = self._partida(anteriores[-1:])
+        self._reaplicar(estado, posicao, ate=_instante(quando))
+        return estado.get(mes, set()) if mes is not None else estado
+
+    def historico(self, mes=None, chave=None):
+        """Eventos em ordem, opcionalmente de um mês e/ou de uma tarefa."""
+        if mes is None:
+            eventos = (evento for _, evento in self._eventos_desde(0))
+        else:
+            eventos = self._eventos_mes(mes)
+        return [e for e in eventos if chave is None or e["chave"] == chave]
+
+    def versoes_meses(self):
+        """{"mes/ano": seq do último evento do mês}; diz se algo mudou num mês já fechado."""
+        with self._lock:
+            self._indexar()
+            return dict(self._seq_mes)
+
+    def _indexar(self):
+        """Só com self._lock: acrescenta ao índice as linhas novas do log."""
+        inicio = self._indexado_ate
+        for fim, evento in self._eventos_desde(inicio):
+            self._linhas_mes.setdefault(evento["mes"], []).append((inicio, fim - inicio))
+            self._seq_mes[evento["mes"]] = evento["seq"]
+            inicio = fim
+        self._indexado_ate = inicio
+
+    def _eventos_mes(self, mes):
+        """Lê só as linhas do mês, usando o índice de posições (varre apenas o trecho novo)."""
+        with self._lock:
+            self._indexar()
+            linhas = list(self._linhas_mes.get(mes, ()))
+        if not linhas:
+            return []
+        with open(self.arquivo, "rb") as arquivo:
+            eventos = []
+            for posicao, tamanho in linhas:
+                arquivo.seek(posicao)
+                eventos.append(json.loads(arquivo.read(tamanho)))
+            return eventos
+
+
+@lru_cache(maxsize=None)
+def log_padrao():
+    """Log compartilhado pelo processo (pasta em COMPRIMOVEIS_AUDITORIA_DIR)."""
+    return LogAuditoria(os.environ.get(VARIAVEL_PASTA, PASTA_PADRAO))
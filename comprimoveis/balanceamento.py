@@ -0,0 +1,170 @@
+"""
+⚖️ Balanceamento da carga de trabalho ao longo do mês
+
+O dia 15 concentra mais de 20 tarefas enquanto a maioria dos dias tem zero
+ou duas, e é no pico que os erros acontecem. Este módulo mede a carga de
+cada dia (peso por tipo de tarefa, corrigido pelo valor) e propõe antecipar
+tarefas flexíveis para achatar o pico:
+
+- só tarefas que ``REGRAS`` considera flexíveis mudam de dia (TX ADM da
+  Comprimóveis, PIX a prestadores); boletos, impostos e salários ficam
+- uma tarefa só é antecipada, dentro da janela da sua regra: nunca passa
+  do vencimento original
+- busca gulosa com heap: o dia flexível mais carregado cede a tarefa cujo
+  peso mais reduz a soma dos quadrados das cargas, para o dia menos
+  carregado da janela. Os pesos de cada (dia, janela) ficam ordenados, então
+  a melhor tarefa sai por bisect; cada tarefa se move no máximo uma vez
+
+    python -m comprimoveis.balanceamento
+"""
+
+import argparse
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import NamedTuple
+
+import pandas as pd
+
+from comprimoveis.busca import dobrar
+from comprimoveis.catalogo import catalogo_padrao
+
+DIAS = range(1, 32)
+
+PESOS_TIPO = {"Impostos": 1.5, "Pagamento": 1.3, "Boleto": 1.0, "PIX": 1.0, "Vale": 1.0, "Transferência": 0.8}
+VALOR_REFERENCIA = 1000.0
+FATOR_VALOR = 0.5
+
+# Pagamentos a funcionários ficam no dia (descrição já sem acentos, minúscula)
+SALARIOS = re.compile(r"salari|adiantamento|ferias|funcionari")
+
+
+class Regra(NamedTuple):
+    nome: str
+    aplica: object   # tarefa -> bool
+    antecipacao: int  # dias que a tarefa pode ser antecipada
+
+
+REGRAS = [
+    Regra("TX ADM", lambda t: t["tipo"] == "Transferência" and "TX ADM" in t["descricao"], 7),
+    Regra("PIX prestador", lambda t: t["tipo"] == "PIX" and not SALARIOS.search(dobrar(t["descricao"])), 5),
+]
+
+
+class Movimento(NamedTuple):
+    dia: int
+    idx: int
+    novo_dia: int
+    condominio: str
+    descricao: str
+    peso: float
+    regra: str
+
+
+class Balanceamento(NamedTuple):
+    movimentos: list
+    antes: pd.DataFrame   # condomínio x dia
+    depois: pd.DataFrame
+
+
+def peso_tarefa(tarefa):
+    """Peso do tipo, maior para valores altos (escala logarítmica); sem valor = só o tipo."""
+    peso = PESOS_TIPO.get(tarefa["tipo"], 1.0)
+    valor = tarefa.get("valor")
+    if valor:
+        peso *= 1 + FATOR_VALOR * math.log10(1 + valor / VALOR_REFERENCIA)
+    return peso
+
+
+def regra_flexivel(tarefa, regras=REGRAS):
+    return next((regra for regra in regras if regra.aplica(tarefa)), None)
+
+
+def balancear(tarefas_por_dia, regras=REGRAS):
+    """Propõe antecipações que achatam a carga diária; devolve um Balanceamento."""
+    carga = [0.0] * (max(DIAS) + 1)
+    linhas = []
+    # dia -> {regra: [(peso, idx)] ordenada}, só das tarefas flexíveis
+    flexiveis = {}
+    for dia in sorted(tarefas_por_dia):
+        for idx, tarefa in enumerate(tarefas_por_dia[dia]):
+            peso = peso_tarefa(tarefa)
+            carga[dia] += peso
+            linhas.append((dia, idx, tarefa["condominio"], peso))
+            regra = regra_flexivel(tarefa, regras)
+            if regra and dia > 1:
+                insort(flexiveis.setdefault(dia, {}).setdefault(regra, []), (peso, idx))
+
+    alcance = max((regra.antecipacao for regra in regras), default=0)
+    heap = [(-carga[dia], dia) for dia in flexiveis]
+    heapq.heapify(heap)
+    movimentos = []
+    while heap:
+        negativo, dia = heapq.heappop(heap)
+        if -negativo != carga[dia]:
+            continue  # entrada antiga: a carga do dia mudou depois dela
+        melhor = None
+        for regra, pesos in flexiveis[dia].items():
+            if not pesos:
+                continue
+            # Dia menos carregado da janela; no empate, o mais perto do vencimento
+            destino = min(range(max(1, dia - regra.antecipacao), dia), key=lambda d: (carga[d], dia - d))
+            folga = carga[dia] - carga[destino]
+            # Mover w reduz a soma dos quadrados em 2w(folga - w): melhor w perto de folga/2
+            posicao = bisect_left(pesos, (folga / 2,))
+            for i in (posicao - 1, posicao):
+                if 0 <= i < len(pesos) and pesos[i][0] < folga:
+                    ganho = pesos[i][0] * (folga - pesos[i][0])
+                    if melhor is None or ganho > melhor[0]:
+                        melhor = (ganho, regra, i, destino)
+        if melhor is None:
+            continue  # nada melhora este dia; volta ao heap quando sua janela mudar
+        _, regra, i, destino = melhor
+        peso, idx = flexiveis[dia][regra].pop(i)
+        carga[dia] -= peso
+        carga[destino] += peso
+        tarefa = tarefas_por_dia[dia][idx]
+        movimentos.append(Movimento(dia, idx, destino, tarefa["condominio"], tarefa["descricao"], peso, regra.nome))
+        # O dia e o destino mudaram de carga; os dias cuja janela alcança `dia`
+        # ganharam um destino mais leve e podem ter agora um movimento que melhora
+        for afetado in (dia, destino, *range(dia + 1, dia + alcance + 1)):
+            if afetado in flexiveis:
+                heapq.heappush(heap, (-carga[afetado], afetado))
+
+    novos_dias = {(m.dia, m.idx): m.novo_dia for m in movimentos}
+    tabela = pd.DataFrame(linhas, columns=["dia", "idx", "condominio", "peso"])
+    tabela["novo_dia"] = [novos_dias.get((dia, idx), dia) for dia, idx in zip(tabela["dia"], tabela["idx"])]
+
+    def quadro(coluna):
+        return tabela.pivot_table(index="condominio", columns=coluna, values="peso", aggfunc="sum",
+                                  fill_value=0.0).reindex(columns=list(DIAS), fill_value=0.0)
+
+    return Balanceamento(
+        sorted(movimentos, key=lambda m: (m.dia, m.idx)),
+        quadro("dia").rename_axis(columns="dia"),
+        quadro("novo_dia").rename_axis(columns="dia"),
+    )
+
+
+def resumo_cargas(balanceamento):
+    """Carga total por dia antes e depois (DataFrame indexado pelo dia)."""
+    return pd.DataFrame({"Antes": balanceamento.antes.sum(), "Depois": balanceamento.depois.sum()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Propõe antecipações que achatam a carga diária do BPO.")
+    parser.add_argument("--catalogo", help="catálogo JSON ({dia: [tarefas]}); padrão: o da Comprimóveis")
+    args = parser.parse_args(argv)
+
+    balanceamento = balancear(catalogo_padrao(args.catalogo))
+    cargas = resumo_cargas(balanceamento)
+    print(f"⚖️ Pico de carga: {cargas['Antes'].max():.1f} -> {cargas['Depois'].max():.1f}"
+          f" ({len(balanceamento.movimentos)} antecipações)")
+    for m in balanceamento.movimentos:
+        print(f"  dia {m.dia:2d} -> {m.novo_dia:2d}  {m.condominio} - {m.descricao}  [{m.regra}]")
+    print(cargas[(cargas["Antes"] > 0) | (cargas["Depois"] > 0)].round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+🔍 Busca textual nas tarefas, sem acentos
+
+Índice montado uma vez sobre ``descricao``, ``destinatario``, ``condominio``
+e ``tipo``. Texto e consulta passam pelo mesmo "dobramento" (minúsculas,
+sem acentos), então "agua" encontra "Águas do Rio". Cada termo da consulta
+casa com um termo do índice por igualdade, prefixo ("anch" -> "anchieta")
+ou trecho ("1606" -> "011606195"):
+
+- prefixos: bisect no vocabulário ordenado
+- trechos: índice de trigramas sobre o vocabulário (não sobre as linhas),
+  seguido de conferência com ``in``
+
+Todos os termos precisam casar (E lógico); o ranking soma o peso do tipo de
+casamento pelo peso do campo.
+"""
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+
+CAMPOS = {"condominio": 1.3, "descricao": 1.0, "destinatario": 0.8, "tipo": 0.7}
+PESO_EXATO, PESO_PREFIXO, PESO_TRECHO = 3.0, 2.0, 1.0
+
+PALAVRAS_VAZIAS = {"a", "o", "as", "os", "da", "de", "do", "das", "dos", "e", "em", "no", "na", "para"}
+
+
+def dobrar(texto):
+    """Minúsculas e sem acentos."""
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode().lower()
+
+
+def slug(texto):
+    """Texto dobrado só com letras, dígitos e hífens (nomes de arquivo, URLs)."""
+    return re.sub(r"[^a-z0-9-]+", "_", dobrar(texto)).strip("_")
+
+
+def termos(texto):
+    return re.findall(r"[a-z0-9]+", dobrar(texto))
+
+
+def _trigramas(termo):
+    return {termo[i:i + 3] for i in range(len(termo) - 2)}
+
+
+class IndiceBusca:
+    def __init__(self, tarefas_por_dia):
+        self.documentos = []   # [(dia, idx, tarefa)]
+        postings = {}          # termo -> {doc: peso do campo}
+        for dia in sorted(tarefas_por_dia):
+            for idx, tarefa in enumerate(tarefas_por_dia[dia]):
+                doc = len(self.documentos)
+                self.documentos.append((dia, idx, tarefa))
+                for campo, peso in CAMPOS.items():
+                    for termo in termos(tarefa.get(campo) or ""):
+                        atual = postings.setdefault(termo, {})
+                        atual[doc] = max(atual.get(doc, 0.0), peso)
+        self.postings = postings
+        self.vocabulario = sorted(postings)
+        self.trigramas = {}
+        for termo in self.vocabulario:
+            for trigrama in _trigramas(termo):
+                self.trigramas.setdefault(trigrama, set()).add(termo)
+
+    def _termos_casados(self, consulta):
+        """Termos do vocabulário que casam com um termo da consulta, com o peso do casamento."""
+        casados = {}
+        if consulta in self.postings:
+            casados[consulta] = PESO_EXATO
+
+        inicio = bisect_left(self.vocabulario, consulta)
+        for termo in self.vocabulario[inicio:]:
+            if not termo.startswith(consulta):
+                break
+            casados.setdefault(termo, PESO_PREFIXO)
+
+        if len(consulta) >= 3:
+            conjuntos = sorted((self.trigramas.get(t, set()) for t in _trigramas(consulta)), key=len)
+            candidatos = set.intersection(*conjuntos) if conjuntos else set()
+            for termo in candidatos:
+                if consulta in termo:
+                    casados.setdefault(termo, PESO_TRECHO)
+        return casados
+
+    def buscar(self, consulta, limite=20):
+        """Lista [(pontuacao, dia, idx, tarefa)] do mais para o menos relevante."""
+        termos_consulta = [t for t in termos(consulta) if t not in PALAVRAS_VAZIAS] or termos(consulta)
+        if not termos_consulta:
+            return []
+
+        # Termo mais seletivo primeiro; os seguintes só conferem os candidatos restantes
+        casamentos = [self._termos_casados(t) for t in termos_consulta]
+        casamentos.sort(key=lambda casados: sum(len(self.postings[t]) for t in casados))
+
+        pontuacoes = None
+        for casados in casamentos:
+            tamanho = sum(len(self.postings[t]) for t in casados)
+            por_doc = {}
+            if pontuacoes is not None and len(pontuacoes) * len(casados) < tamanho:
+                for doc in pontuacoes:
+                    for termo, peso_casamento in casados.items():
+                        peso_campo = self.postings[termo].get(doc)
+                        if peso_campo and peso_casamento * peso_campo > por_doc.get(doc, 0.0):
+                            por_doc[doc] = peso_casamento * peso_campo
+            else:
+                for termo, peso_casamento in casados.items():
+                    for doc, peso_campo in self.postings[termo].items():
+                        if peso_casamento * peso_campo > por_doc.get(doc, 0.0):
+                            por_doc[doc] = peso_casamento * peso_campo
+            if pontuacoes is None:
+                pontuacoes = por_doc
+            else:
+                pontuacoes = {doc: nota + por_doc[doc] for doc, nota in pontuacoes.items() if doc in por_doc}
+            if not pontuacoes:
+                return []
+
+        melhores = heapq.nsmallest(limite, pontuacoes.items(), key=lambda item: (-item[1], item[0]))
+        return [(nota, *self.documentos[doc]) for doc, nota in melhores]
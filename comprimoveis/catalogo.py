@@ -0,0 +1,246 @@
+"""
+📋 Catálogo de tarefas BPO
+
+O catálogo é um dicionário ``{dia: [tarefa, ...]}``: o modelo mensal de
+pagamentos de cada condomínio, repetido todos os meses. Este módulo guarda
+o catálogo da Comprimóveis, os filtros usados na interface e a leitura e
+gravação de catálogos em JSON, o que permite rodar o calendário e as
+ferramentas de linha de comando sobre um catálogo alternativo (por exemplo,
+um sintético para benchmarks) definindo
+``COMPRIMOVEIS_CATALOGO=/caminho/catalogo.json``.
+
+O que ``catalogo_padrao`` entrega ao resto do código não são os dicts, e sim
+um ``ArmazemTarefas`` (ver ``comprimoveis.armazem``): mesma interface de
+leitura, guardado em colunas compactas.
+"""
+
+import calendar
+import json
+import os
+from datetime import date
+from functools import lru_cache
+
+from comprimoveis.armazem import ArmazemTarefas
+
+VARIAVEL_CATALOGO = "COMPRIMOVEIS_CATALOGO"
+
+# ============================================================================
+# DADOS DO CALENDÁRIO BPO
+# ============================================================================
+
+# Estrutura de tarefas por dia
+TAREFAS_POR_DIA = {
+    1: [
+        {
+            "condominio": "Village Mananciais", 
+            "tipo": "Transferência", 
+            "descricao": "Transfer CX Presidente Fátima - Recarga Interfones",
+            "destinatario": "Fátima (Presidente)",
+            "valor": 100.00
+        },
+        {
+            "condominio": "Colina Verde", 
+            "tipo": "Boleto", 
+            "descricao": "Iguá - Débito em conta automático",
+            "destinatario": "Conta Santander Ag. 3894",
+            "valor": None
+        }
+    ],
+    5: [
+        {"condominio": "Village Tucanos", "tipo": "Pagamento", "descricao": "Salários dos Funcionários (Bruno e Gustavo)", "valor": 3850.00},
+        {"condominio": "Itaipu", "tipo": "Boleto", "descricao": "Bem mais gestora", "valor": None},
+        {"condominio": "Itaipu", "tipo": "PIX", "descricao": "Salários Funcionários (Antônio e José)", "valor": None},
+        {"condominio": "Samira", "tipo": "PIX", "descricao": "Allan Diego (Síndico Profissional)", "valor": None},
+        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Bem mais gestora", "valor": None},
+        {"condominio": "Nascente Rio Grande", "tipo": "Boleto", "descricao": "WN Tecnologia + Bem mais + Iguá", "valor": None},
+        {"condominio": "Nascente Rio Grande", "tipo": "PIX", "descricao": "Salários 6 Funcionários", "valor": None}
+    ],
+    8: [
+        {"condominio": "Anchieta", "tipo": "Boleto", "descricao": "Iguá - Matrícula 537256-9", "valor": None},
+        {"condominio": "Village Ipadu", "tipo": "Transferência", "descricao": "CX Presidente Washington", "valor": None}
+    ],
+    10: [
+        {"condominio": "Anchieta", "tipo": "Boleto", "descricao": "Light - Matrícula 011606195", "valor": None},
+        {"condominio": "Anchieta", "tipo": "Pagamento", "descricao": "Prestador Interfone (Marcos Vieira)", "valor": None},
+        {"condominio": "Anchieta", "tipo": "Boleto", "descricao": "Taquara Net", "valor": None},
+        {"condominio": "Sylvania", "tipo": "PIX", "descricao": "Funcionários/Prestadores (Jorge e Mário)", "valor": 1450.00},
+        {"condominio": "Village Pedras", "tipo": "PIX", "descricao": "Gota D'Água Piscinas + Suelena", "valor": 5360.00},
+        {"condominio": "Samira", "tipo": "Boleto", "descricao": "Light", "valor": None},
+        {"condominio": "Samira", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 985,98)", "valor": 985.98},
+        {"condominio": "Village Tucanos", "tipo": "PIX", "descricao": "Prestadores (Magno, Elias, José)", "valor": 2200.00},
+        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Alpha Manutenção", "valor": None}
+    ],
+    15: [
+        {"condominio": "Anchieta", "tipo": "PIX", "descricao": "Letícia (Faxineira) R$ 550", "valor": 550.00},
+        {"condominio": "Anchieta", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 563)", "valor": 563.00},
+        {"condominio": "Primavera", "tipo": "PIX", "descricao": "Cláudio de Oliveira R$ 150", "valor": 150.00},
+        {"condominio": "Primavera", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 642,80)", "valor": 642.80},
+        {"condominio": "Sylvania", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 582,50)", "valor": 582.50},
+        {"condominio": "Sylvania", "tipo": "Boleto", "descricao": "Águas do Rio", "valor": None},
+        {"condominio": "Village Ipadu", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 1.111,46)", "valor": 1111.46},
+        {"condominio": "Village Ipadu", "tipo": "Boleto", "descricao": "Olá Fibra Internet", "valor": None},
+        {"condominio": "Village Mananciais", "tipo": "Boleto", "descricao": "SISGU Segurança", "valor": 488.00},
+        {"condominio": "Village Mananciais", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 859,38)", "valor": 859.38},
+        {"condominio": "Village Pedras", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 1.250)", "valor": 1250.00},
+        {"condominio": "Village Pedras", "tipo": "PIX", "descricao": "Adiantamento Salários (8 funcionários)", "valor": None},
+        {"condominio": "Itaipu", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 1.746,33)", "valor": 1746.33},
+        {"condominio": "Samira", "tipo": "Boleto", "descricao": "Naturgy", "valor": None},
+        {"condominio": "Village Tucanos", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 902,42)", "valor": 902.42},
+        {"condominio": "Village Tucanos", "tipo": "PIX", "descricao": "Suzana (Ajuda custo) R$ 350", "valor": 350.00},
+        {"condominio": "Colina Verde", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 977)", "valor": 977.00},
+        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Claro + Naturgy", "valor": None},
+        {"condominio": "Colina Verde", "tipo": "PIX", "descricao": "Adiantamento Salários (2 funcionários)", "valor": None},
+        {"condominio": "Nascente Rio Grande", "tipo": "Transferência", "descricao": "TX ADM Comprimóveis (R$ 977)", "valor": 977.00},
+        {"condominio": "Nascente Rio Grande", "tipo": "Boleto", "descricao": "Semear Internet + Claro", "valor": None},
+        {"condominio": "Nascente Rio Grande", "tipo": "PIX", "descricao": "Adiantamento Salários (6 funcionários)", "valor": None}
+    ],
+    19: [
+        {"condominio": "Village Pedras", "tipo": "Impostos", "descricao": "FGTS + INSS", "valor": None},
+        {"condominio": "Village Pedras", "tipo": "Boleto", "descricao": "Iguá + Claro", "valor": None},
+        {"condominio": "Samira", "tipo": "Impostos", "descricao": "FGTS + INSS", "valor": None},
+        {"condominio": "Samira", "tipo": "Boleto", "descricao": "Iguá + Claro", "valor": None},
+        {"condominio": "Colina Verde", "tipo": "Impostos", "descricao": "FGTS + INSS", "valor": None},
+        {"condominio": "Nascente Rio Grande", "tipo": "Impostos", "descricao": "FGTS + INSS", "valor": None},
+        {"condominio": "Nascente Rio Grande", "tipo": "Boleto", "descricao": "Jurídico R$ 1.860,56", "valor": 1860.56}
+    ],
+    20: [
+        {"condominio": "Primavera", "tipo": "Boleto", "descricao": "Iguá + Light", "valor": None},
+        {"condominio": "Sylvania", "tipo": "Boleto", "descricao": "Light - Matrícula 0411681294", "valor": None},
+        {"condominio": "Village Mananciais", "tipo": "Boleto", "descricao": "NIO Fibra", "valor": None},
+        {"condominio": "Village Pedras", "tipo": "Boleto", "descricao": "Hidroluz + Light (3 endereços)", "valor": None},
+        {"condominio": "Itaipu", "tipo": "Boleto", "descricao": "Seguro Predial R$ 727,90", "valor": 727.90}
+    ],
+    25: [
+        {"condominio": "Primavera", "tipo": "Transferência", "descricao": "CX Síndico Agapito", "valor": None},
+        {"condominio": "Village Mananciais", "tipo": "Boleto", "descricao": "Light - Matrícula 430139742", "valor": None},
+        {"condominio": "Samira", "tipo": "Boleto", "descricao": "Elevadores Atlas", "valor": None}
+    ],
+    26: [
+        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Light - Débito em conta", "valor": None},
+        {"condominio": "Nascente Rio Grande", "tipo": "Boleto", "descricao": "Light - Débito + Sulamérica", "valor": None}
+    ],
+    28: [
+        {"condominio": "Village Pedras", "tipo": "Vale", "descricao": "VR Refeição + Vale Transporte", "valor": None},
+        {"condominio": "Village Pedras", "tipo": "Pagamento", "descricao": "Salários 8 Funcionários", "valor": None}
+    ],
+    30: [
+        {"condominio": "Colina Verde", "tipo": "PIX", "descricao": "Salários Funcionários (Almir e Severino)", "valor": None},
+        {"condominio": "Colina Verde", "tipo": "Boleto", "descricao": "Triangular Elevadores", "valor": None}
+    ]
+}
+
+# Lista de todos os condomínios
+CONDOMINIOS = [
+    "Village Mananciais", "Colina Verde", "Village Tucanos", "Itaipu",
+    "Samira", "Nascente Rio Grande", "Anchieta", "Village Ipadu",
+    "Sylvania", "Village Pedras", "Primavera"
+]
+
+
+TIPOS = ["Boleto", "PIX", "Transferência", "Pagamento", "Impostos", "Vale"]
+
+ICONES = {
+    "Boleto": "📄",
+    "PIX": "💸",
+    "Transferência": "💰",
+    "Pagamento": "💵",
+    "Impostos": "🏛️",
+    "Vale": "🎫"
+}
+
+
+def icone_tipo(tipo):
+    return ICONES.get(tipo, "📋")
+
+
+def filtrar_tarefas(tarefas, condominios=None, tipos=None):
+    """Tarefas de um dia como [(idx, tarefa)], mantendo o índice original.
+
+    ``None`` (ou uma lista com "Todos") em um filtro não restringe nada. O
+    índice original importa: a chave de conclusão não pode mudar quando um
+    filtro esconde outras tarefas do dia.
+    """
+    if condominios is not None and "Todos" in condominios:
+        condominios = None
+    if tipos is not None and "Todos" in tipos:
+        tipos = None
+    return [
+        (idx, tarefa) for idx, tarefa in enumerate(tarefas)
+        if (condominios is None or tarefa["condominio"] in condominios)
+        and (tipos is None or tarefa["tipo"] in tipos)
+    ]
+
+
+# ============================================================================
+# DATAS
+# ============================================================================
+
+def vencimento_nominal(ano, mes, dia):
+    """Dia do catálogo no mês; dias inexistentes (30/02) caem no último dia."""
+    return date(ano, mes, min(dia, calendar.monthrange(ano, mes)[1]))
+
+
+def meses_entre(inicio, fim):
+    """(ano, mes) de inicio a fim, inclusive."""
+    ano, mes = inicio
+    while (ano, mes) <= fim:
+        yield ano, mes
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+
+# ============================================================================
+# JSON
+# ============================================================================
+
+def salvar_catalogo(tarefas_por_dia, caminho):
+    if isinstance(tarefas_por_dia, ArmazemTarefas):
+        tarefas_por_dia = tarefas_por_dia.como_dicts()
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(tarefas_por_dia, arquivo, ensure_ascii=False)
+
+
+@lru_cache(maxsize=4)
+def _carregar(caminho, _mtime):
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    # JSON só tem chaves texto; os dias voltam a ser int
+    return ArmazemTarefas({int(dia): tarefas for dia, tarefas in dados.items()})
+
+
+@lru_cache(maxsize=None)
+def catalogo_embutido():
+    """O catálogo da Comprimóveis (TAREFAS_POR_DIA) já convertido em armazém."""
+    return ArmazemTarefas(TAREFAS_POR_DIA)
+
+
+def carregar_catalogo(caminho):
+    """Lê um catálogo JSON; o resultado fica em cache enquanto o arquivo não mudar."""
+    return _carregar(caminho, os.path.getmtime(caminho))
+
+
+def catalogo_do_ambiente():
+    """Catálogo apontado por COMPRIMOVEIS_CATALOGO, ou None se não definido."""
+    caminho = os.environ.get(VARIAVEL_CATALOGO)
+    return carregar_catalogo(caminho) if caminho else None
+
+
+def catalogo_padrao(caminho=None):
+    """Catálogo de `caminho`, do ambiente ou, na falta de ambos, o da Comprimóveis."""
+    if caminho:
+        return carregar_catalogo(caminho)
+    externo = catalogo_do_ambiente()
+    return catalogo_embutido() if externo is None else externo
+
+
+def condominios_do_catalogo(tarefas_por_dia):
+    """Condomínios na ordem em que aparecem no catálogo."""
+    if tarefas_por_dia is TAREFAS_POR_DIA:
+        return list(CONDOMINIOS)
+    if isinstance(tarefas_por_dia, ArmazemTarefas):
+        # O armazém já numera os condomínios na ordem de aparição
+        return list(tarefas_por_dia.condominios.valores)
+    vistos = {}
+    for dia in sorted(tarefas_por_dia):
+        for tarefa in tarefas_por_dia[dia]:
+            vistos.setdefault(tarefa["condominio"], None)
+    return list(vistos)
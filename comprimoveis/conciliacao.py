@@ -0,0 +1,310 @@
+"""
+🏦 Conciliação de extratos bancários com as tarefas BPO
+
+Lê extratos OFX ou CSV (Santander, Itaú, Bradesco...) e casa cada débito
+com as tarefas do mês em ``TAREFAS_POR_DIA`` por:
+
+- valor, com tolerância (índice ordenado por centavos + bisect)
+- janela de datas em torno do vencimento
+- conta do condomínio (quando o extrato informa a conta)
+- semelhança da descrição (tokens sem acento)
+
+Tarefas sem valor conhecido (boletos de consumo) só casam por conta, data e
+descrição, e por isso nunca são confirmadas automaticamente: vão para a
+fila de revisão. Cada lançamento e cada tarefa casam no máximo uma vez.
+"""
+
+import csv
+import io
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from comprimoveis.busca import dobrar
+from comprimoveis.catalogo import vencimento_nominal
+
+# Confirmação automática exige pontuação mínima e folga sobre o 2º candidato
+PONTUACAO_CONFIRMACAO = 0.75
+FOLGA_CONFIRMACAO = 0.15
+
+PALAVRAS_IGNORADAS = {
+    "de", "da", "do", "das", "dos", "e", "a", "o", "para", "pag", "pagto", "pagamento",
+    "pix", "ted", "doc", "transf", "transferencia", "boleto", "enviado", "debito",
+    "conta", "tit", "titulo", "cobranca", "r",
+}
+
+
+class Lancamento(NamedTuple):
+    data: date
+    valor: float
+    descricao: str
+    conta: str = ""
+    id: str = ""
+
+
+class Candidato(NamedTuple):
+    pontuacao: float
+    dia: int
+    idx: int
+    tarefa: dict
+
+
+class Conciliacao(NamedTuple):
+    confirmadas: list   # [(Lancamento, Candidato)]
+    revisar: list       # [(Lancamento, [Candidato, ...])]
+    sem_correspondencia: list  # [Lancamento]
+
+
+# ============================================================================
+# LEITURA DE EXTRATOS
+# ============================================================================
+
+# "1.234" / "-12.345.678": pontos só como separador de milhar
+MILHARES = re.compile(r"[-+]?\d{1,3}(\.\d{3})+")
+
+
+def _valor_br(texto):
+    """'-1.234,56' / '1.234' / '1234.56' / 'R$ 50,00' -> float."""
+    texto = texto.strip().replace("R$", "").replace(" ", "")
+    if "," in texto or MILHARES.fullmatch(texto):
+        texto = texto.replace(".", "").replace(",", ".")
+    return float(texto)
+
+
+def _valor_ofx(texto):
+    """TRNAMT do OFX: ponto ou vírgula decimal, nunca separador de milhar."""
+    return float(texto.strip().replace(",", "."))
+
+
+def _data(texto):
+    texto = texto.strip()
+    for formato in ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data não reconhecida: {texto!r}")
+
+
+def _tag_ofx(bloco, tag):
+    # OFX 1.x (SGML) não fecha as tags; o valor vai até o próximo '<'
+    achado = re.search(rf"<{tag}>([^<\r\n]*)", bloco, re.I)
+    return achado.group(1).strip() if achado else ""
+
+
+def ler_ofx(conteudo):
+    """Lançamentos de um extrato OFX (1.x SGML ou 2.x XML)."""
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode("latin-1")
+    conta = _tag_ofx(conteudo, "ACCTID")
+    lancamentos = []
+    for bloco in re.findall(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|</BANKTRANLIST>)", conteudo, re.S | re.I):
+        data = datetime.strptime(_tag_ofx(bloco, "DTPOSTED")[:8], "%Y%m%d").date()
+        descricao = " ".join(filter(None, (_tag_ofx(bloco, "NAME"), _tag_ofx(bloco, "MEMO"))))
+        lancamentos.append(Lancamento(
+            data=data,
+            valor=_valor_ofx(_tag_ofx(bloco, "TRNAMT")),
+            descricao=descricao,
+            conta=conta,
+            id=_tag_ofx(bloco, "FITID"),
+        ))
+    return lancamentos
+
+
+# Nomes de coluna usados pelos bancos -> campo
+COLUNAS_CSV = {
+    "data": ("data", "data lancamento", "data movimento", "dt. lancamento", "date"),
+    "descricao": ("descricao", "historico", "lancamento", "descricao/historico", "memo"),
+    "valor": ("valor", "valor (r$)", "valor r$", "amount"),
+    "documento": ("documento", "docto", "n documento", "id"),
+    "conta": ("conta", "conta corrente", "account"),
+}
+
+
+def ler_csv(conteudo, conta=""):
+    """Lançamentos de um extrato CSV; a conta pode vir da coluna ou do parâmetro."""
+    if isinstance(conteudo, bytes):
+        try:
+            conteudo = conteudo.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            conteudo = conteudo.decode("latin-1")
+    # Bancos brasileiros usam ; (vírgula é o separador decimal); vale o mais frequente
+    amostra = "\n".join(conteudo.splitlines()[:20])
+    delimitador = max(";\t,", key=amostra.count)
+
+    leitor = csv.reader(io.StringIO(conteudo), delimiter=delimitador)
+    # Alguns bancos colocam linhas de título antes do cabeçalho
+    for cabecalho in leitor:
+        normalizado = [normalizar(coluna) for coluna in cabecalho]
+        posicoes = {
+            campo: next((i for i, coluna in enumerate(normalizado) if coluna in nomes), None)
+            for campo, nomes in COLUNAS_CSV.items()
+        }
+        if None not in (posicoes["data"], posicoes["descricao"], posicoes["valor"]):
+            break
+    else:
+        raise ValueError("Cabeçalho do extrato não encontrado (esperado: data, descrição/histórico, valor).")
+
+    lancamentos = []
+    for linha in leitor:
+        if len(linha) <= max(p for p in posicoes.values() if p is not None):
+            continue
+        try:
+            data = _data(linha[posicoes["data"]])
+            valor = _valor_br(linha[posicoes["valor"]])
+        except ValueError:
+            # Linhas de saldo/rodapé
+            continue
+        lancamentos.append(Lancamento(
+            data=data,
+            valor=valor,
+            descricao=linha[posicoes["descricao"]].strip(),
+            conta=linha[posicoes["conta"]].strip() if posicoes["conta"] is not None else conta,
+            id=linha[posicoes["documento"]].strip() if posicoes["documento"] is not None else "",
+        ))
+    return lancamentos
+
+
+def ler_extrato(nome_arquivo, conteudo, conta=""):
+    if nome_arquivo.lower().endswith((".ofx", ".qfx")):
+        return ler_ofx(conteudo)
+    return ler_csv(conteudo, conta)
+
+
+# ============================================================================
+# SEMELHANÇA
+# ============================================================================
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e sem pontuação nas bordas."""
+    return re.sub(r"\s+", " ", dobrar(texto)).strip(" .:")
+
+
+def tokens(texto):
+    return {
+        token for token in re.findall(r"[a-z0-9]+", normalizar(texto))
+        if token not in PALAVRAS_IGNORADAS and (len(token) > 2 or token.isdigit())
+    }
+
+
+def semelhanca(tokens_a, tokens_b):
+    """Fração dos tokens da tarefa presentes no lançamento (prefixos contam)."""
+    if not tokens_a:
+        return 0.0
+    acertos = 0
+    for token in tokens_a:
+        if token in tokens_b or any(outro.startswith(token) or token.startswith(outro)
+                                    for outro in tokens_b if len(outro) >= 4 and len(token) >= 4):
+            acertos += 1
+    return acertos / len(tokens_a)
+
+
+# ============================================================================
+# CONCILIAÇÃO
+# ============================================================================
+
+class IndiceTarefas:
+    """Tarefas de um mês indexadas por valor (centavos) e por condomínio/data."""
+
+    def __init__(self, tarefas_por_dia, ano, mes, ja_concluidas=()):
+        ja_concluidas = set(ja_concluidas)
+        self.por_valor = []          # [(centavos, vencimento, dia, idx)] ordenado
+        self.sem_valor = {}          # condominio -> [(vencimento, dia, idx)] ordenado
+        self.tarefas = {}            # (dia, idx) -> (tarefa, vencimento, tokens)
+        for dia, tarefas in tarefas_por_dia.items():
+            vencimento = vencimento_nominal(ano, mes, dia)
+            for idx, tarefa in enumerate(tarefas):
+                if (dia, idx) in ja_concluidas:
+                    continue
+                texto = " ".join((tarefa["descricao"], tarefa.get("destinatario") or ""))
+                self.tarefas[(dia, idx)] = (tarefa, vencimento, tokens(texto))
+                if tarefa.get("valor"):
+                    self.por_valor.append((round(tarefa["valor"] * 100), vencimento, dia, idx))
+                else:
+                    self.sem_valor.setdefault(tarefa["condominio"], []).append((vencimento, dia, idx))
+        self.por_valor.sort()
+        for lista in self.sem_valor.values():
+            lista.sort()
+        self.centavos = [item[0] for item in self.por_valor]
+
+
+def conciliar(lancamentos, tarefas_por_dia, ano, mes, contas=None, ja_concluidas=(),
+              tolerancia=0.01, dias_antes=5, dias_depois=5):
+    """Casa os débitos do extrato com as tarefas do mês.
+
+    ``contas`` mapeia número da conta -> condomínio. ``ja_concluidas`` são os
+    (dia, idx) já marcados, que ficam fora da conciliação. ``tolerancia`` é
+    relativa (0,01 = 1%) com piso de R$ 1,00.
+    """
+    contas = {normalizar(conta): condominio for conta, condominio in (contas or {}).items()}
+    indice = IndiceTarefas(tarefas_por_dia, ano, mes, ja_concluidas)
+    janela = timedelta(days=max(dias_antes, dias_depois))
+
+    pares = []  # (pontuacao, n_lancamento, (dia, idx))
+    for n, lancamento in enumerate(lancamentos):
+        if lancamento.valor >= 0:
+            continue
+        valor = -lancamento.valor
+        condominio = contas.get(normalizar(lancamento.conta)) if lancamento.conta else None
+        tokens_lancamento = tokens(lancamento.descricao)
+
+        candidatos = []
+        # Tarefas com valor: faixa de centavos via bisect
+        folga = max(valor * tolerancia, 1.0)
+        inicio = bisect_left(indice.centavos, round((valor - folga) * 100))
+        fim = bisect_right(indice.centavos, round((valor + folga) * 100))
+        for centavos, vencimento, dia, idx in indice.por_valor[inicio:fim]:
+            candidatos.append((dia, idx, 1.0 - abs(centavos / 100 - valor) / folga * 0.5))
+
+        # Tarefas sem valor: só do condomínio da conta, dentro da janela de datas
+        if condominio is not None:
+            lista = indice.sem_valor.get(condominio, [])
+            inicio = bisect_left(lista, (lancamento.data - janela,))
+            fim = bisect_right(lista, (lancamento.data + janela, 99, 10**9))
+            for _, dia, idx in lista[inicio:fim]:
+                candidatos.append((dia, idx, 0.0))
+
+        for dia, idx, nota_valor in candidatos:
+            tarefa, vencimento, tokens_tarefa = indice.tarefas[(dia, idx)]
+            atraso = (lancamento.data - vencimento).days
+            if not -dias_antes <= atraso <= dias_depois:
+                continue
+            if condominio is not None and tarefa["condominio"] != condominio:
+                continue
+            nota_data = 1.0 - abs(atraso) / (max(dias_antes, dias_depois) + 1)
+            nota_descricao = semelhanca(tokens_tarefa, tokens_lancamento)
+            nota_conta = 1.0 if condominio is not None else 0.0
+            pontuacao = 0.45 * nota_valor + 0.2 * nota_data + 0.2 * nota_descricao + 0.15 * nota_conta
+            pares.append((pontuacao, n, (dia, idx)))
+
+    # Agrupa os candidatos por lançamento, do melhor para o pior
+    pares.sort(key=lambda par: par[0], reverse=True)
+    por_lancamento = {}
+    for pontuacao, n, chave in pares:
+        por_lancamento.setdefault(n, []).append((pontuacao, chave))
+
+    confirmadas, revisar = [], []
+    usadas = set()
+    # Lançamentos com o melhor candidato mais forte escolhem primeiro
+    for n in sorted(por_lancamento, key=lambda n: por_lancamento[n][0][0], reverse=True):
+        opcoes = [(p, chave) for p, chave in por_lancamento[n] if chave not in usadas]
+        if not opcoes:
+            continue
+        lancamento = lancamentos[n]
+        candidatos = [Candidato(p, chave[0], chave[1], indice.tarefas[chave][0]) for p, chave in opcoes[:5]]
+        melhor = candidatos[0]
+        segunda = candidatos[1].pontuacao if len(candidatos) > 1 else 0.0
+        tem_valor = bool(melhor.tarefa.get("valor"))
+        if tem_valor and melhor.pontuacao >= PONTUACAO_CONFIRMACAO and melhor.pontuacao - segunda >= FOLGA_CONFIRMACAO:
+            confirmadas.append((lancamento, melhor))
+            usadas.add((melhor.dia, melhor.idx))
+        else:
+            revisar.append((lancamento, candidatos))
+
+    casados = {id(lancamento) for lancamento, _ in confirmadas} | {id(lancamento) for lancamento, _ in revisar}
+    sem_correspondencia = [
+        lancamento for lancamento in lancamentos
+        if lancamento.valor < 0 and id(lancamento) not in casados
+    ]
+    return Conciliacao(confirmadas, revisar, sem_correspondencia)
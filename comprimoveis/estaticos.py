@@ -0,0 +1,113 @@
+"""
+🖼️ Recursos estáticos - logo, fontes e CSS servidos localmente
+
+Nada aqui depende de hosts externos: o logo vem do PNG versionado no
+repositório, as fontes de ``static/fonts`` (servidas pelo Streamlit com
+``enableStaticServing``) e o CSS de ``comprimoveis/css``. Tudo é montado
+uma única vez por processo e reaproveitado nos reruns seguintes.
+"""
+
+import base64
+import io
+import re
+from functools import lru_cache
+from pathlib import Path
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+PASTA_CSS = Path(__file__).resolve().parent / "css"
+PASTA_FONTES = RAIZ_REPO / "static" / "fonts"
+ARQUIVO_LOGO = RAIZ_REPO / "logo-comprimoveis-1.png"
+
+# URL pública da pasta static/ quando enableStaticServing está ativo
+URL_STATIC = "app/static"
+
+# Largura máxima do logo no CSS é 260px; 2x para telas de alta densidade
+LARGURA_LOGO = 520
+
+# Arquivos esperados em static/fonts -> (família, peso)
+FONTES = {
+    "Poppins-Light.woff2": ("Poppins", 300),
+    "Poppins-Regular.woff2": ("Poppins", 400),
+    "Poppins-Medium.woff2": ("Poppins", 500),
+    "Poppins-SemiBold.woff2": ("Poppins", 600),
+    "Poppins-Bold.woff2": ("Poppins", 700),
+    "Poppins-ExtraBold.woff2": ("Poppins", 800),
+    "SpaceMono-Regular.woff2": ("Space Mono", 400),
+    "SpaceMono-Bold.woff2": ("Space Mono", 700),
+}
+
+
+# ============================================================================
+# LOGO
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def logo_data_uri(largura=LARGURA_LOGO):
+    """Logo redimensionado e otimizado como data URI (PNG com paleta)."""
+    dados = ARQUIVO_LOGO.read_bytes()
+    try:
+        from PIL import Image
+    except ImportError:
+        # Sem Pillow: usa o arquivo original, ainda sem depender da rede
+        return "data:image/png;base64," + base64.b64encode(dados).decode("ascii")
+
+    with Image.open(io.BytesIO(dados)) as imagem:
+        imagem = imagem.convert("RGBA")
+        if imagem.width > largura:
+            altura = round(imagem.height * largura / imagem.width)
+            imagem = imagem.resize((largura, altura), Image.LANCZOS)
+        imagem = imagem.quantize(256, method=Image.Quantize.FASTOCTREE)
+        buffer = io.BytesIO()
+        imagem.save(buffer, "PNG", optimize=True)
+
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+# ============================================================================
+# FONTES
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def fontes_css():
+    """Regras @font-face para as fontes versionadas em static/fonts.
+
+    ``local()`` usa o nome completo e o PostScript de cada peso (ex.:
+    "Poppins SemiBold" / "Poppins-SemiBold"): só o nome da família faria
+    todos os pesos caírem na mesma face instalada. Um arquivo ausente é
+    omitido e o CSS recorre à pilha de fontes do sistema.
+    """
+    regras = []
+    for arquivo, (familia, peso) in FONTES.items():
+        if not (PASTA_FONTES / arquivo).is_file():
+            continue
+        postscript = Path(arquivo).stem
+        completo = f"{familia} {postscript.split('-', 1)[1]}"
+        regras.append(
+            "@font-face{"
+            f"font-family:'{familia}';font-style:normal;font-weight:{peso};"
+            "font-display:swap;"
+            f"src:local('{completo}'),local('{postscript}'),url('{URL_STATIC}/fonts/{arquivo}') format('woff2')"
+            "}"
+        )
+    return "".join(regras)
+
+
+# ============================================================================
+# CSS
+# ============================================================================
+
+def minificar_css(css):
+    """Remove comentários e espaços supérfluos de uma folha de estilo."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+@lru_cache(maxsize=None)
+def estilo_html(nome):
+    """Bloco <style> pronto para st.markdown, minificado uma vez por processo."""
+    css = (PASTA_CSS / f"{nome}.css").read_text(encoding="utf-8")
+    return f"<style>{fontes_css()}{minificar_css(css)}</style>"
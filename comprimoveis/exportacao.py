@@ -0,0 +1,348 @@
+"""
+📤 Exportação dos relatórios mensais BPO (CSV, XLSX, PDF)
+
+Os relatórios são gerados linha a linha a partir do catálogo: nenhuma etapa
+monta a tabela inteira em memória. CSV e PDF são escritos direto no arquivo
+de saída (o PDF por um gerador mínimo próprio, página a página) e o XLSX usa
+o modo ``write_only`` do openpyxl.
+
+    # um relatório consolidado do mês
+    python -m comprimoveis.exportacao --ano 2026 --mes 3 --formato pdf
+
+    # todos os condomínios do ano, em paralelo
+    python -m comprimoveis.exportacao --ano 2026 --lote --processos 4
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from comprimoveis.agregados import MESES, chave_mes, chave_tarefa
+from comprimoveis.busca import slug
+from comprimoveis.catalogo import catalogo_padrao, condominios_do_catalogo, vencimento_nominal
+from comprimoveis.formatacao import formatar_brl
+
+FORMATOS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+COLUNAS = ["Data", "Condomínio", "Tipo", "Descrição", "Destinatário", "Valor (R$)", "Status"]
+
+
+# ============================================================================
+# LINHAS DO RELATÓRIO
+# ============================================================================
+
+def linhas_relatorio(tarefas_por_dia, tarefas_concluidas, ano, meses, condominio=None):
+    """Gera uma tupla por tarefa, na ordem de COLUNAS.
+
+    Dias que não existem no mês (ex.: 30 em fevereiro) caem no último dia.
+    """
+    dias = sorted(tarefas_por_dia)
+    for mes in meses:
+        concluidas = set(tarefas_concluidas.get(chave_mes(mes, ano), ()))
+        for dia in dias:
+            data = vencimento_nominal(ano, mes, dia)
+            for idx, tarefa in enumerate(tarefas_por_dia[dia]):
+                if condominio is not None and tarefa["condominio"] != condominio:
+                    continue
+                status = "Concluída" if chave_tarefa(mes, ano, dia, idx) in concluidas else "Pendente"
+                yield (
+                    data,
+                    tarefa["condominio"],
+                    tarefa["tipo"],
+                    tarefa["descricao"],
+                    tarefa.get("destinatario") or "",
+                    tarefa.get("valor"),
+                    status,
+                )
+
+
+def titulo_relatorio(ano, meses, condominio=None):
+    periodo = f"{MESES[meses[0] - 1]} {ano}" if len(meses) == 1 else f"Ano {ano}"
+    return f"Relatório BPO - {condominio or 'Consolidado'} - {periodo}"
+
+
+class _Totais:
+    __slots__ = ("tarefas", "concluidas", "valor")
+
+    def __init__(self):
+        self.tarefas = 0
+        self.concluidas = 0
+        self.valor = 0.0
+
+    def somar(self, linha):
+        self.tarefas += 1
+        self.concluidas += linha[6] == "Concluída"
+        self.valor += linha[5] or 0.0
+        return linha
+
+    def linha(self):
+        return ("Total", f"{self.tarefas} tarefas", f"{self.concluidas} concluídas", "", "", self.valor, "")
+
+
+def _brl(valor):
+    return formatar_brl(valor, simbolo=False)
+
+
+# ============================================================================
+# ESCRITORES
+# ============================================================================
+
+def escrever_csv(linhas, saida, titulo=None):
+    """CSV com ; e vírgula decimal, como o Excel em pt-BR espera."""
+    escritor = csv.writer(saida, delimiter=";")
+    escritor.writerow(COLUNAS)
+    totais = _Totais()
+    for linha in map(totais.somar, linhas):
+        escritor.writerow(_formatar_csv(linha))
+    escritor.writerow(_formatar_csv(totais.linha()))
+
+
+def _formatar_csv(linha):
+    data, *meio, valor, status = linha
+    data = data.strftime("%d/%m/%Y") if isinstance(data, date) else data
+    valor = f"{valor:.2f}".replace(".", ",") if valor is not None else ""
+    return [data, *meio, valor, status]
+
+
+def escrever_xlsx(linhas, saida, titulo=None):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet("Relatório")
+    negrito = Font(bold=True)
+
+    def celulas_negrito(valores):
+        celulas = []
+        for valor in valores:
+            celula = WriteOnlyCell(planilha, value=valor)
+            celula.font = negrito
+            celulas.append(celula)
+        return celulas
+
+    if titulo:
+        planilha.append(celulas_negrito([titulo]))
+    planilha.append(celulas_negrito(COLUNAS))
+    totais = _Totais()
+    for linha in map(totais.somar, linhas):
+        planilha.append(linha)
+    planilha.append(celulas_negrito(totais.linha()))
+    livro.save(saida)
+
+
+def escrever_pdf(linhas, saida, titulo=None):
+    with _PDFStream(saida) as pdf:
+        larguras = (62, 120, 78, 230, 130, 72, 62)
+        pdf.cabecalho = (titulo or "Relatório BPO", COLUNAS, larguras)
+        totais = _Totais()
+        for linha in map(totais.somar, linhas):
+            data, condominio, tipo, descricao, destinatario, valor, status = linha
+            pdf.linha((data.strftime("%d/%m/%Y"), condominio, tipo, descricao, destinatario, _brl(valor), status))
+        pdf.linha(totais.linha()[:5] + (_brl(totais.valor), ""), negrito=True)
+
+
+ESCRITORES = {"csv": escrever_csv, "xlsx": escrever_xlsx, "pdf": escrever_pdf}
+
+
+class _PDFStream:
+    """Gerador mínimo de PDF (A4 paisagem, Helvetica) que grava página a página.
+
+    Só o conteúdo da página corrente e os offsets dos objetos ficam em
+    memória; xref e trailer são escritos no final.
+    """
+
+    LARGURA, ALTURA = 842, 595
+    MARGEM = 30
+    ALTURA_LINHA = 13
+    TAMANHO_FONTE = 8
+
+    def __init__(self, saida):
+        self.saida = saida
+        self.offsets = {}
+        self.paginas = []
+        self.posicao = 0
+        self.cabecalho = None
+        self.buffer = None
+        self.y = 0
+        # 1: catálogo, 2: árvore de páginas, 3/4: fontes; páginas a partir de 5
+        self.proximo_id = 5
+
+    def __enter__(self):
+        self._escrever(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        return self
+
+    def __exit__(self, tipo, *_):
+        if tipo is None:
+            self._fechar_pagina()
+            self._finalizar()
+
+    def _escrever(self, dados):
+        self.saida.write(dados)
+        self.posicao += len(dados)
+
+    def _objeto(self, numero, corpo):
+        self.offsets[numero] = self.posicao
+        self._escrever(f"{numero} 0 obj\n".encode() + corpo + b"\nendobj\n")
+
+    @staticmethod
+    def _texto(valor):
+        texto = str(valor).encode("cp1252", "replace")
+        return texto.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def _texto_em(self, x, y, valor, fonte="F1", tamanho=None, largura=None):
+        valor = str(valor)
+        if largura:
+            # Helvetica tem ~0,5em de largura média por caractere
+            maximo = int(largura / ((tamanho or self.TAMANHO_FONTE) * 0.5))
+            if len(valor) > maximo:
+                valor = valor[:max(maximo - 1, 1)] + "…"
+        self.buffer.write(
+            b"BT /%s %d Tf %d %d Td (%s) Tj ET\n"
+            % (fonte.encode(), tamanho or self.TAMANHO_FONTE, x, y, self._texto(valor))
+        )
+
+    def _nova_pagina(self):
+        self._fechar_pagina()
+        self.buffer = io.BytesIO()
+        self.y = self.ALTURA - self.MARGEM
+        titulo, colunas, larguras = self.cabecalho
+        self._texto_em(self.MARGEM, self.y, titulo, fonte="F2", tamanho=12)
+        self._texto_em(self.LARGURA - self.MARGEM - 40, self.y, f"p. {len(self.paginas) + 1}")
+        self.y -= 2 * self.ALTURA_LINHA
+        self._celulas(colunas, larguras, fonte="F2")
+
+    def _celulas(self, valores, larguras, fonte="F1"):
+        x = self.MARGEM
+        for valor, largura in zip(valores, larguras):
+            self._texto_em(x, self.y, valor if valor is not None else "", fonte=fonte, largura=largura - 4)
+            x += largura
+        self.y -= self.ALTURA_LINHA
+
+    def linha(self, valores, negrito=False):
+        if self.buffer is None or self.y < self.MARGEM:
+            self._nova_pagina()
+        self._celulas(valores, self.cabecalho[2], fonte="F2" if negrito else "F1")
+
+    def _fechar_pagina(self):
+        if self.buffer is None:
+            return
+        conteudo = self.buffer.getvalue()
+        self.buffer = None
+        id_conteudo, id_pagina = self.proximo_id, self.proximo_id + 1
+        self.proximo_id += 2
+        self._objeto(id_conteudo, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(conteudo), conteudo))
+        self._objeto(id_pagina, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.LARGURA} {self.ALTURA}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {id_conteudo} 0 R >>"
+        ).encode())
+        self.paginas.append(id_pagina)
+
+    def _finalizar(self):
+        fonte = "<< /Type /Font /Subtype /Type1 /BaseFont /{} /Encoding /WinAnsiEncoding >>"
+        self._objeto(3, fonte.format("Helvetica").encode())
+        self._objeto(4, fonte.format("Helvetica-Bold").encode())
+        kids = " ".join(f"{pagina} 0 R" for pagina in self.paginas)
+        self._objeto(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.paginas)} >>".encode())
+        self._objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        inicio_xref = self.posicao
+        total = self.proximo_id
+        self._escrever(f"xref\n0 {total}\n0000000000 65535 f \n".encode())
+        for numero in range(1, total):
+            self._escrever(f"{self.offsets[numero]:010d} 00000 n \n".encode())
+        self._escrever(f"trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode())
+
+
+# ============================================================================
+# API
+# ============================================================================
+
+def nome_arquivo(ano, meses, formato, condominio=None):
+    periodo = f"{ano}-{meses[0]:02d}" if len(meses) == 1 else str(ano)
+    return f"relatorio_bpo_{slug(condominio or 'consolidado')}_{periodo}.{formato}"
+
+
+def exportar(tarefas_por_dia, tarefas_concluidas, ano, meses, formato, saida, condominio=None):
+    """Escreve um relatório em ``saida`` (arquivo binário aberto)."""
+    linhas = linhas_relatorio(tarefas_por_dia, tarefas_concluidas, ano, meses, condominio)
+    titulo = titulo_relatorio(ano, meses, condominio)
+    if formato == "csv":
+        texto = io.TextIOWrapper(saida, encoding="utf-8-sig", newline="")
+        escrever_csv(linhas, texto, titulo)
+        texto.detach()
+    else:
+        ESCRITORES[formato](linhas, saida, titulo)
+
+
+def exportar_bytes(tarefas_por_dia, tarefas_concluidas, ano, meses, formato, condominio=None):
+    """Relatório em memória, para st.download_button."""
+    saida = io.BytesIO()
+    exportar(tarefas_por_dia, tarefas_concluidas, ano, meses, formato, saida, condominio)
+    return saida.getvalue()
+
+
+def _exportar_arquivo(args):
+    tarefas_por_dia, tarefas_concluidas, ano, meses, formato, pasta, condominio = args
+    caminho = os.path.join(pasta, nome_arquivo(ano, meses, formato, condominio))
+    with open(caminho, "wb") as saida:
+        exportar(tarefas_por_dia, tarefas_concluidas, ano, meses, formato, saida, condominio)
+    return caminho
+
+
+def exportar_lote(tarefas_por_dia, tarefas_concluidas, ano, meses, formato, pasta, processos=None):
+    """Um relatório por condomínio + o consolidado, gerados em paralelo.
+
+    Devolve a lista de caminhos gravados.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    alvos = [None] + condominios_do_catalogo(tarefas_por_dia)
+    tarefas = [
+        (tarefas_por_dia, tarefas_concluidas, ano, list(meses), formato, pasta, condominio)
+        for condominio in alvos
+    ]
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(_exportar_arquivo, tarefas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta relatórios BPO em CSV, XLSX ou PDF.")
+    parser.add_argument("--catalogo", help="catálogo JSON ({dia: [tarefas]}); padrão: o da Comprimóveis")
+    parser.add_argument("--concluidas", help="JSON {\"mes/ano\": [chaves de tarefa]}")
+    parser.add_argument("--ano", type=int, required=True)
+    parser.add_argument("--mes", type=int, help="omitido: ano inteiro")
+    parser.add_argument("--condominio", help="omitido: consolidado")
+    parser.add_argument("--formato", choices=FORMATOS, default="xlsx")
+    parser.add_argument("--saida", default="relatorios")
+    parser.add_argument("--lote", action="store_true", help="um arquivo por condomínio + consolidado")
+    parser.add_argument("--processos", type=int)
+    args = parser.parse_args(argv)
+
+    tarefas_por_dia = catalogo_padrao(args.catalogo)
+    tarefas_concluidas = {}
+    if args.concluidas:
+        with open(args.concluidas, encoding="utf-8") as arquivo:
+            tarefas_concluidas = json.load(arquivo)
+    meses = [args.mes] if args.mes else list(range(1, 13))
+
+    if args.lote:
+        caminhos = exportar_lote(tarefas_por_dia, tarefas_concluidas, args.ano, meses,
+                                 args.formato, args.saida, args.processos)
+    else:
+        os.makedirs(args.saida, exist_ok=True)
+        caminhos = [_exportar_arquivo((tarefas_por_dia, tarefas_concluidas, args.ano, meses,
+                                       args.formato, args.saida, args.condominio))]
+    for caminho in caminhos:
+        print(f"📄 {caminho}")
+
+
+if __name__ == "__main__":
+    main()
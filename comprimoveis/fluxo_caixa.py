@@ -0,0 +1,131 @@
+"""
+💸 Projeção de fluxo de caixa por condomínio
+
+Transforma o catálogo numa tabela colunar (uma linha por tarefa do modelo
+mensal) e projeta as saídas diárias e acumuladas de cada condomínio em
+qualquer horizonte. Tudo é vetorizado: as datas de vencimento de todos os
+meses × todas as tarefas saem de um broadcast NumPy e a soma por
+(dia, condomínio) de um único ``np.bincount``, então anos de horizonte com
+centenas de condomínios continuam instantâneos.
+
+Tarefas sem valor conhecido não entram nas somas; são contadas à parte
+para que o gráfico deixe claro onde a projeção está incompleta.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from comprimoveis.armazem import ArmazemTarefas
+
+
+def _categorias(coluna):
+    # Mesmas categorias (em ordem alfabética) que o astype("category") daria
+    categorico = pd.Categorical.from_codes(np.frombuffer(coluna.codigos, coluna.codigos.typecode), coluna.valores)
+    return categorico.reorder_categories(sorted(coluna.valores))
+
+
+def tabela_tarefas(tarefas_por_dia):
+    """Catálogo -> DataFrame colunar (dia, condominio, tipo, descricao, valor)."""
+    if isinstance(tarefas_por_dia, ArmazemTarefas):
+        # O armazém já é colunar: as colunas saem direto dos arrays
+        armazem = tarefas_por_dia
+        return pd.DataFrame({
+            "dia": np.frombuffer(armazem.dias, np.uint8).astype(np.int16),
+            "condominio": _categorias(armazem.condominios),
+            "tipo": _categorias(armazem.tipos),
+            "descricao": armazem.descricoes,
+            "valor": np.frombuffer(armazem.valores, np.float64).copy(),
+        })
+    linhas = [
+        (dia, tarefa["condominio"], tarefa["tipo"], tarefa["descricao"], tarefa.get("valor"))
+        for dia in sorted(tarefas_por_dia)
+        for tarefa in tarefas_por_dia[dia]
+    ]
+    tabela = pd.DataFrame(linhas, columns=["dia", "condominio", "tipo", "descricao", "valor"])
+    return tabela.astype({
+        "dia": "int16",
+        "condominio": "category",
+        "tipo": "category",
+        "valor": "float64",
+    })
+
+
+def vencimentos(tabela, inicio, fim):
+    """Datas de vencimento (M meses × T tarefas) entre inicio e fim, inclusive.
+
+    Devolve (datas, linhas): datas em datetime64[D] e o índice da tarefa de
+    cada ocorrência. Dias inexistentes no mês (30/02) caem no último dia.
+    """
+    primeiro_mes = np.datetime64(f"{inicio:%Y-%m}", "M")
+    ultimo_mes = np.datetime64(f"{fim:%Y-%m}", "M")
+    meses = np.arange(primeiro_mes, ultimo_mes + 1)
+    inicio_mes = meses.astype("datetime64[D]")
+    tamanho_mes = ((meses + 1).astype("datetime64[D]") - inicio_mes).astype(np.int64)
+
+    dias = tabela["dia"].to_numpy(np.int64)
+    deslocamento = np.minimum(dias[None, :], tamanho_mes[:, None]) - 1
+    datas = inicio_mes[:, None] + deslocamento.astype("timedelta64[D]")
+
+    dentro = (datas >= np.datetime64(inicio, "D")) & (datas <= np.datetime64(fim, "D"))
+    _, linhas = np.nonzero(dentro)
+    return datas[dentro], linhas
+
+
+def projetar(tabela, inicio, fim, condominios=None):
+    """Saídas projetadas entre inicio e fim.
+
+    Devolve um dict de DataFrames indexados por dia (todos os dias do
+    horizonte) com uma coluna por condomínio:
+
+    - ``diario``: soma dos valores conhecidos que vencem no dia
+    - ``acumulado``: soma acumulada de ``diario``
+    - ``sem_valor``: quantidade de tarefas sem valor conhecido no dia
+    """
+    if condominios:
+        tabela = tabela[tabela["condominio"].isin(condominios)]
+        tabela = tabela.assign(condominio=tabela["condominio"].cat.remove_unused_categories())
+
+    datas, linhas = vencimentos(tabela, inicio, fim)
+    dias_horizonte = pd.date_range(inicio, fim, freq="D")
+    nomes = list(tabela["condominio"].cat.categories)
+    n_dias, n_cond = len(dias_horizonte), len(nomes)
+
+    posicao_dia = (datas - np.datetime64(inicio, "D")).astype(np.int64)
+    codigo_cond = tabela["condominio"].cat.codes.to_numpy(np.int64)[linhas]
+    celula = posicao_dia * n_cond + codigo_cond
+
+    valores = tabela["valor"].to_numpy()[linhas]
+    sem_valor = np.isnan(valores)
+    tamanho = n_dias * n_cond
+    diario = np.bincount(celula, weights=np.where(sem_valor, 0.0, valores), minlength=tamanho)
+    faltantes = np.bincount(celula, weights=sem_valor, minlength=tamanho)
+
+    def quadro(matriz):
+        return pd.DataFrame(matriz.reshape(n_dias, n_cond), index=dias_horizonte, columns=nomes)
+
+    diario = quadro(diario)
+    return {
+        "diario": diario,
+        "acumulado": diario.cumsum(),
+        "sem_valor": quadro(faltantes.astype(np.int64)),
+    }
+
+
+def tarefas_sem_valor(tabela, inicio, fim, condominios=None):
+    """Ocorrências sem valor conhecido no horizonte (data, condomínio, tipo, descrição)."""
+    if condominios:
+        tabela = tabela[tabela["condominio"].isin(condominios)]
+    datas, linhas = vencimentos(tabela, inicio, fim)
+    ocorrencias = tabela.iloc[linhas][["condominio", "tipo", "descricao", "valor"]].assign(data=datas)
+    ocorrencias = ocorrencias[ocorrencias["valor"].isna()].drop(columns="valor")
+    return ocorrencias.sort_values("data")[["data", "condominio", "tipo", "descricao"]]
+
+
+def horizonte(ano, mes, periodo):
+    """(inicio, fim) para "Mês", "Trimestre" ou "Ano" a partir do mês selecionado."""
+    inicio = date(ano, mes, 1)
+    meses = {"Mês": 1, "Trimestre": 3, "Ano": 12}[periodo]
+    ultimo = pd.Timestamp(inicio) + pd.DateOffset(months=meses) - pd.Timedelta(days=1)
+    return inicio, ultimo.date()
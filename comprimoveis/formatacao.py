@@ -0,0 +1,11 @@
+"""
+💲 Formatação de valores no padrão brasileiro
+"""
+
+
+def formatar_brl(valor, vazio="-", simbolo=True):
+    """1234.5 -> "R$ 1.234,50"; valores nulos ou zero viram `vazio`."""
+    if not valor:
+        return vazio
+    texto = f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"R$ {texto}" if simbolo else texto
@@ -0,0 +1,380 @@
+"""
+🔌 Gateway HTTP assíncrono do agente (site, WhatsApp)
+
+O script Streamlit prende uma thread por visitante durante toda a chamada ao
+Gemini. Este gateway atende os canais externos num único loop asyncio
+(Tornado, que já vem com o Streamlit): enquanto o modelo responde, a conexão
+só espera, e centenas de conversas ficam em andamento no mesmo processo.
+
+Usa o mesmo núcleo do chat (``comprimoveis.agente``): ``CONTEXTO``,
+``montar_prompt`` com a janela de histórico e a chamada ao modelo, agora
+assíncrona.
+
+- estado por conversa, indexado pelo remetente (id do widget, telefone do
+  WhatsApp): só as últimas ``JANELA_HISTORICO`` mensagens, que é o que
+  entra no prompt. Mensagens do mesmo remetente são atendidas em ordem;
+  conversas ociosas há mais de ``ttl`` saem da memória
+- ``tempo_limite`` por pedido (fila do remetente + vaga + modelo): estourou,
+  o visitante recebe um aviso (HTTP 504) em vez de esperar indefinidamente.
+  Uma falha do modelo vira um aviso fixo (HTTP 502); o erro em si só vai
+  para o log do servidor
+- ``max_em_andamento`` chamadas simultâneas ao modelo; as demais esperam
+  vaga dentro do próprio tempo limite
+
+Rotas:
+
+    POST /mensagens            {"remetente": "...", "texto": "..."} -> {"resposta": "..."}
+    GET  /webhook/whatsapp     verificação do webhook (hub.challenge)
+    POST /webhook/whatsapp     mensagens da WhatsApp Cloud API (resposta enviada depois);
+                               exige a assinatura X-Hub-Signature-256 (--whatsapp-segredo)
+    GET  /saude                métricas do processo
+
+    python -m comprimoveis.gateway --porta 8788               # Gemini (COMPRIMOVEIS_GEMINI_API_KEY)
+    python -m comprimoveis.gateway --porta 8788 --simulado    # modelo simulado, para testes de carga
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import math
+import os
+import random
+import time
+from collections import OrderedDict, deque
+
+import tornado.web
+from tornado.httpclient import AsyncHTTPClient
+
+from comprimoveis.agente import JANELA_HISTORICO, MODELO, gerar_resposta_async, montar_prompt
+
+VARIAVEL_CHAVE = "COMPRIMOVEIS_GEMINI_API_KEY"
+TEMPO_LIMITE = 30.0
+MAX_EM_ANDAMENTO = 1000
+MAX_CONVERSAS = 10000
+TTL = 30 * 60
+MAX_TEXTO = 4000
+AMOSTRAS_LATENCIA = 10000
+BACKLOG = 2048
+
+log = logging.getLogger(__name__)
+
+AVISO_TEMPO = ("⏳ Nossa resposta demorou mais que o esperado. Tente de novo em instantes ou fale "
+               "com a equipe pelo WhatsApp (21) 99372-1324.")
+AVISO_ERRO = ("😕 Não consegui responder agora. Tente de novo em instantes ou fale com a equipe "
+              "pelo WhatsApp (21) 99372-1324.")
+
+# ============================================================================
+# BACKENDS DO MODELO
+# ============================================================================
+
+class BackendGemini:
+    """Um único cliente Gemini para o processo: configurado uma vez, um só canal gRPC."""
+
+    def __init__(self, api_key, modelo=MODELO):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.modelo = genai.GenerativeModel(modelo)
+
+    async def __call__(self, prompt):
+        return await gerar_resposta_async(self.modelo, prompt)
+
+
+class BackendSimulado:
+    """Modelo falso para testes de carga offline: latência log-normal, erros opcionais."""
+
+    def __init__(self, latencia=0.8, dispersao=0.4, taxa_erro=0.0, semente=None):
+        self.latencia = latencia
+        self.dispersao = dispersao
+        self.taxa_erro = taxa_erro
+        self._aleatorio = random.Random(semente)
+
+    async def __call__(self, prompt):
+        await asyncio.sleep(self._aleatorio.lognormvariate(math.log(self.latencia), self.dispersao))
+        if self._aleatorio.random() < self.taxa_erro:
+            raise RuntimeError("erro simulado do modelo")
+        return f"Resposta simulada ({len(prompt)} caracteres de prompt)."
+
+
+# ============================================================================
+# CONVERSAS
+# ============================================================================
+
+class Conversa:
+    __slots__ = ("mensagens", "trava", "ultimo_uso")
+
+    def __init__(self, agora):
+        self.mensagens = deque(maxlen=JANELA_HISTORICO)
+        self.trava = asyncio.Lock()
+        self.ultimo_uso = agora
+
+
+def _percentil(valores, fracao):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+
+class Gateway:
+    def __init__(self, backend, tempo_limite=TEMPO_LIMITE, max_em_andamento=MAX_EM_ANDAMENTO,
+                 max_conversas=MAX_CONVERSAS, ttl=TTL):
+        self.backend = backend
+        self.tempo_limite = tempo_limite
+        self.max_conversas = max_conversas
+        self.ttl = ttl
+        self._vagas = asyncio.Semaphore(max_em_andamento)
+        self.max_em_andamento = max_em_andamento
+        # Em ordem de último uso, para despejar as ociosas pela frente
+        self._conversas = OrderedDict()
+        self._latencias = deque(maxlen=AMOSTRAS_LATENCIA)
+        self._metricas = dict.fromkeys(
+            ("atendidas", "tempo_esgotado", "erros", "em_andamento", "pico_em_andamento", "despejadas"), 0)
+
+    def _conversa(self, remetente):
+        agora = time.monotonic()
+        conversa = self._conversas.get(remetente)
+        if conversa is None:
+            conversa = self._conversas[remetente] = Conversa(agora)
+        conversa.ultimo_uso = agora
+        self._conversas.move_to_end(remetente)
+        while self._conversas:
+            antiga = next(iter(self._conversas.values()))
+            if len(self._conversas) <= self.max_conversas and agora - antiga.ultimo_uso <= self.ttl:
+                break
+            if antiga.trava.locked():
+                break  # ainda atendendo: fica até terminar
+            self._conversas.popitem(last=False)
+            self._metricas["despejadas"] += 1
+        return conversa
+
+    async def _atender(self, conversa, texto):
+        """Espera a vez do remetente e uma vaga, e gera; todo este trecho é cronometrado."""
+        async with conversa.trava:
+            conversa.mensagens.append({"role": "user", "content": texto})
+            prompt = montar_prompt(list(conversa.mensagens), texto)
+            try:
+                async with self._vagas:
+                    resposta = await self.backend(prompt)
+            except asyncio.CancelledError:
+                conversa.mensagens.append({"role": "assistant", "content": AVISO_TEMPO})
+                raise
+            except Exception:
+                conversa.mensagens.append({"role": "assistant", "content": AVISO_ERRO})
+                raise
+            conversa.mensagens.append({"role": "assistant", "content": resposta})
+            return resposta
+
+    async def responder(self, remetente, texto):
+        """(status HTTP, texto da resposta) para a mensagem do remetente."""
+        conversa = self._conversa(remetente)
+        inicio = time.perf_counter()
+        self._metricas["em_andamento"] += 1
+        self._metricas["pico_em_andamento"] = max(self._metricas["pico_em_andamento"],
+                                                  self._metricas["em_andamento"])
+        try:
+            resposta, status = await asyncio.wait_for(self._atender(conversa, texto), self.tempo_limite), 200
+            self._metricas["atendidas"] += 1
+        except asyncio.TimeoutError:
+            resposta, status = AVISO_TEMPO, 504
+            self._metricas["tempo_esgotado"] += 1
+        except Exception as e:
+            log.warning("⚠️ Falha do modelo para %s: %r", remetente, e)
+            resposta, status = AVISO_ERRO, 502
+            self._metricas["erros"] += 1
+        finally:
+            self._metricas["em_andamento"] -= 1
+        self._latencias.append(time.perf_counter() - inicio)
+        return status, resposta
+
+    def estatisticas(self):
+        latencias = list(self._latencias)
+        return {
+            **self._metricas,
+            "conversas": len(self._conversas),
+            "max_em_andamento": self.max_em_andamento,
+            "latencia_p50_ms": 1000 * _percentil(latencias, 0.50),
+            "latencia_p95_ms": 1000 * _percentil(latencias, 0.95),
+        }
+
+
+# ============================================================================
+# WHATSAPP
+# ============================================================================
+
+class EntregaWhatsApp:
+    """Envia a resposta pela WhatsApp Cloud API; sem token, só registra no log."""
+
+    URL = "https://graph.facebook.com/v19.0/{numero}/messages"
+
+    def __init__(self, token=None, id_numero=None):
+        self.token = token
+        self.id_numero = id_numero
+
+    async def __call__(self, destino, texto):
+        if not self.token:
+            log.info("📤 WhatsApp %s: %s", destino, texto[:80])
+            return
+        await AsyncHTTPClient().fetch(
+            self.URL.format(numero=self.id_numero),
+            method="POST",
+            headers={"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"},
+            body=json.dumps({"messaging_product": "whatsapp", "to": destino, "type": "text",
+                             "text": {"body": texto}}),
+            request_timeout=15,
+        )
+
+
+def mensagens_whatsapp(carga):
+    """[(remetente, texto)] das mensagens de texto de um POST do webhook."""
+    mensagens = []
+    for entrada in carga.get("entry", []):
+        for mudanca in entrada.get("changes", []):
+            for mensagem in mudanca.get("value", {}).get("messages", []):
+                if mensagem.get("type") == "text":
+                    mensagens.append((mensagem["from"], mensagem["text"]["body"]))
+    return mensagens
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+class _Base(tornado.web.RequestHandler):
+    def initialize(self, gateway, **opcoes):
+        self.gateway = gateway
+        self.opcoes = opcoes
+
+    def responder_json(self, status, dados):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.finish(json.dumps(dados, ensure_ascii=False))
+
+
+class _Mensagens(_Base):
+    async def post(self):
+        try:
+            dados = json.loads(self.request.body)
+            remetente, texto = str(dados["remetente"]), str(dados["texto"]).strip()
+        except (ValueError, KeyError, TypeError):
+            return self.responder_json(400, {"erro": 'esperado {"remetente": ..., "texto": ...}'})
+        if not texto:
+            return self.responder_json(400, {"erro": "texto vazio"})
+        if len(texto) > MAX_TEXTO:
+            return self.responder_json(413, {"erro": f"texto com mais de {MAX_TEXTO} caracteres"})
+        status, resposta = await self.gateway.responder(remetente, texto)
+        self.responder_json(status, {"resposta": resposta})
+
+
+class _WhatsApp(_Base):
+    # Tarefas em andamento: referência forte até terminarem
+    _tarefas = set()
+
+    def get(self):
+        token = self.opcoes.get("token_verificacao")
+        if (self.get_argument("hub.mode", "") == "subscribe" and token
+                and hmac.compare_digest(self.get_argument("hub.verify_token", "").encode(), token.encode())):
+            return self.finish(self.get_argument("hub.challenge", ""))
+        self.set_status(403)
+        self.finish()
+
+    def _assinatura_valida(self):
+        """X-Hub-Signature-256 = HMAC-SHA256 do corpo com o segredo do app; sem segredo, nada passa."""
+        segredo = self.opcoes.get("segredo")
+        if not segredo:
+            return False
+        esperada = "sha256=" + hmac.new(segredo.encode(), self.request.body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(esperada, self.request.headers.get("X-Hub-Signature-256", ""))
+
+    def post(self):
+        if not self._assinatura_valida():
+            return self.responder_json(403, {"erro": "assinatura inválida"})
+        try:
+            mensagens = mensagens_whatsapp(json.loads(self.request.body))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return self.responder_json(400, {"erro": "payload inválido"})
+        # A Cloud API espera um 200 rápido; a resposta segue por outra chamada
+        for remetente, texto in mensagens:
+            tarefa = asyncio.ensure_future(self._atender(remetente, texto[:MAX_TEXTO]))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+        self.responder_json(200, {"recebidas": len(mensagens)})
+
+    async def _atender(self, remetente, texto):
+        _, resposta = await self.gateway.responder(f"whatsapp:{remetente}", texto)
+        try:
+            await self.opcoes["entrega"](remetente, resposta)
+        except Exception as e:
+            log.warning("⚠️ Falha ao entregar no WhatsApp para %s: %s", remetente, e)
+
+
+class _Saude(_Base):
+    def get(self):
+        self.responder_json(200, self.gateway.estatisticas())
+
+
+def criar_app(gateway, token_verificacao=None, segredo=None, entrega=None):
+    opcoes = {"gateway": gateway}
+    return tornado.web.Application([
+        (r"/mensagens", _Mensagens, opcoes),
+        (r"/webhook/whatsapp", _WhatsApp,
+         {**opcoes, "token_verificacao": token_verificacao, "segredo": segredo,
+          "entrega": entrega or EntregaWhatsApp()}),
+        (r"/saude", _Saude, opcoes),
+    ])
+
+
+def escutar(gateway, porta, host="127.0.0.1", **opcoes):
+    """Servidor HTTP do gateway no loop atual (fila de conexões grande para picos)."""
+    return criar_app(gateway, **opcoes).listen(porta, address=host, backlog=BACKLOG, max_body_size=64 * 1024)
+
+
+async def servir(gateway, porta, host="127.0.0.1", **opcoes):
+    servidor = escutar(gateway, porta, host, **opcoes)
+    log.info("🔌 Gateway em http://%s:%s/ (modelo: %s)", host, porta, type(gateway.backend).__name__)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        servidor.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gateway HTTP assíncrono do Agente Comprimóveis.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8788)
+    parser.add_argument("--simulado", action="store_true", help="modelo simulado (sem rede), para testes de carga")
+    parser.add_argument("--latencia", type=float, default=0.8, help="latência média do modelo simulado (s)")
+    parser.add_argument("--tempo-limite", type=float, default=TEMPO_LIMITE)
+    parser.add_argument("--max-em-andamento", type=int, default=MAX_EM_ANDAMENTO)
+    parser.add_argument("--whatsapp-verificacao", help="token de verificação do webhook do WhatsApp")
+    parser.add_argument("--whatsapp-segredo", help="segredo do app (assinatura X-Hub-Signature-256 dos POSTs)")
+    parser.add_argument("--whatsapp-token", help="token da WhatsApp Cloud API para enviar as respostas")
+    parser.add_argument("--whatsapp-numero", help="id do número remetente na Cloud API")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.simulado:
+        backend = BackendSimulado(args.latencia)
+    else:
+        api_key = os.environ.get(VARIAVEL_CHAVE)
+        if not api_key:
+            parser.error(f"defina {VARIAVEL_CHAVE} ou use --simulado")
+        backend = BackendGemini(api_key)
+
+    async def iniciar():
+        gateway = Gateway(backend, args.tempo_limite, args.max_em_andamento)
+        await servir(gateway, args.porta, args.host, token_verificacao=args.whatsapp_verificacao,
+                     segredo=args.whatsapp_segredo,
+                     entrega=EntregaWhatsApp(args.whatsapp_token, args.whatsapp_numero))
+
+    try:
+        asyncio.run(iniciar())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+📚 Histórico de pagamentos em Parquet, particionado por ano/mês
+
+Cada mês fechado vira um arquivo Parquet com uma linha por tarefa do
+catálogo: vencimento, valor previsto, valor efetivamente pago (quando veio
+do extrato na conciliação), se foi concluída, por quem e quando. O estado
+sai da trilha de auditoria, então fechar de novo um mês apenas o regrava.
+A partição guarda (nos metadados) o seq do último evento do mês que ela
+incorpora: marcações feitas depois do fechamento fazem o mês ser regravado.
+
+    .historico/
+        ano=2026/mes=3/tarefas.parquet
+
+As consultas por período abrem só os arquivos dos meses pedidos e leem só
+as colunas necessárias; condomínio e trecho da descrição (sem acentos) viram
+filtros do próprio leitor Parquet.
+
+    python -m comprimoveis.historico                        # fecha os meses pendentes
+    python -m comprimoveis.historico --condominio Anchieta --texto light --meses 18
+"""
+
+import argparse
+import os
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from comprimoveis.agregados import chave_mes
+from comprimoveis.busca import dobrar
+from comprimoveis.catalogo import catalogo_padrao, meses_entre, vencimento_nominal
+
+VARIAVEL_PASTA = "COMPRIMOVEIS_HISTORICO_DIR"
+PASTA_PADRAO = ".historico"
+ARQUIVO = "tarefas.parquet"
+METADADO_SEQ = b"seq_auditoria"
+
+ESQUEMA = pa.schema([
+    ("vencimento", pa.date32()),
+    ("dia", pa.int8()),
+    ("idx", pa.uint16()),  # como em ArmazemTarefas ('H')
+    ("condominio", pa.dictionary(pa.int16(), pa.string())),
+    ("tipo", pa.dictionary(pa.int8(), pa.string())),
+    ("descricao", pa.string()),
+    ("descricao_busca", pa.string()),
+    ("destinatario", pa.string()),
+    ("valor_previsto", pa.float64()),
+    ("valor_pago", pa.float64()),
+    ("concluida", pa.bool_()),
+    ("concluida_em", pa.timestamp("s")),
+    ("usuario", pa.string()),
+])
+PARTICOES = ds.partitioning(pa.schema([("ano", pa.int16()), ("mes", pa.int8())]), flavor="hive")
+
+# Janela de meses anteriores usada como referência na análise de variação
+JANELA_VARIACAO = 12
+MINIMO_MESES = 3
+LIMIAR_Z = 3.5
+LIMIAR_PCT = 0.25
+VARIACAO_MINIMA = 0.10
+
+
+def pasta_padrao():
+    return Path(os.environ.get(VARIAVEL_PASTA, PASTA_PADRAO))
+
+
+def _arquivo_mes(pasta, ano, mes):
+    return Path(pasta) / f"ano={ano}" / f"mes={mes}" / ARQUIVO
+
+
+def recuar_meses(ano, mes, n):
+    """(ano, mes) n meses antes."""
+    total = ano * 12 + (mes - 1) - n
+    return total // 12, total % 12 + 1
+
+
+# ============================================================================
+# FECHAMENTO
+# ============================================================================
+
+def tabela_mes(tarefas_por_dia, ano, mes, eventos):
+    """Tabela Arrow do mês a partir do catálogo e dos eventos de auditoria do mês."""
+    finais = {}
+    for evento in eventos:
+        finais[evento["chave"]] = evento
+
+    colunas = {campo.name: [] for campo in ESQUEMA}
+    for dia in sorted(tarefas_por_dia):
+        for idx, tarefa in enumerate(tarefas_por_dia[dia]):
+            evento = finais.get(f"{mes}/{ano}-{dia}-{idx}")
+            concluida = bool(evento and evento["concluida"])
+            colunas["vencimento"].append(vencimento_nominal(ano, mes, dia))
+            colunas["dia"].append(dia)
+            colunas["idx"].append(idx)
+            colunas["condominio"].append(tarefa["condominio"])
+            colunas["tipo"].append(tarefa["tipo"])
+            colunas["descricao"].append(tarefa["descricao"])
+            colunas["descricao_busca"].append(dobrar(tarefa["descricao"]))
+            colunas["destinatario"].append(tarefa.get("destinatario"))
+            colunas["valor_previsto"].append(tarefa.get("valor"))
+            colunas["valor_pago"].append(evento.get("valor") if concluida else None)
+            colunas["concluida"].append(concluida)
+            colunas["concluida_em"].append(datetime.fromisoformat(evento["quando"]) if concluida else None)
+            colunas["usuario"].append(evento["usuario"] if concluida else None)
+    return pa.Table.from_pydict(colunas, schema=ESQUEMA)
+
+
+def fechar_mes(pasta, tarefas_por_dia, ano, mes, eventos):
+    """Grava (ou regrava) a partição do mês; devolve o caminho do arquivo."""
+    destino = _arquivo_mes(pasta, ano, mes)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    # Nome único: várias sessões (ou processos) podem fechar o mesmo mês ao mesmo tempo
+    temporario = destino.with_name(f".{ARQUIVO}.{os.getpid()}-{uuid.uuid4().hex}.tmp")
+    tabela = tabela_mes(tarefas_por_dia, ano, mes, eventos)
+    seq = max((evento["seq"] for evento in eventos), default=0)
+    tabela = tabela.replace_schema_metadata({METADADO_SEQ: str(seq).encode()})
+    pq.write_table(tabela, temporario, compression="zstd")
+    temporario.replace(destino)
+    return destino
+
+
+def meses_fechados(pasta):
+    """[(ano, mes)] com partição gravada, em ordem."""
+    return sorted(
+        (int(arquivo.parent.parent.name[4:]), int(arquivo.parent.name[4:]))
+        for arquivo in Path(pasta).glob(f"ano=*/mes=*/{ARQUIVO}")
+    )
+
+
+def seq_fechado(pasta, ano, mes):
+    """seq do último evento incorporado na partição do mês; None se o mês não foi fechado.
+
+    Lê só o rodapé do arquivo. Partições sem o metadado valem -1 (regravar).
+    """
+    arquivo = _arquivo_mes(pasta, ano, mes)
+    if not arquivo.exists():
+        return None
+    return int((pq.read_schema(arquivo).metadata or {}).get(METADADO_SEQ, -1))
+
+
+def fechar_pendentes(pasta, tarefas_por_dia, log, hoje=None):
+    """(Re)fecha os meses anteriores ao atual que estão sem partição ou atrás do log.
+
+    Vai do primeiro mês com evento ou partição até o mês passado, então um
+    mês sem nenhuma marcação também é fechado (tudo pendente). Um mês já
+    fechado só é regravado se o log tem eventos dele posteriores à partição.
+    """
+    hoje = hoje or date.today()
+    versoes = {}
+    for mes_chave, seq in log.versoes_meses().items():
+        mes, ano = map(int, mes_chave.split("/"))
+        versoes[(ano, mes)] = seq
+    inicio = min([*versoes, *meses_fechados(pasta)], default=None)
+    if inicio is None:
+        return []
+    fechados = []
+    for ano, mes in meses_entre(inicio, recuar_meses(hoje.year, hoje.month, 1)):
+        seq = seq_fechado(pasta, ano, mes)
+        if seq is None or seq < versoes.get((ano, mes), 0):
+            eventos = log.historico(mes=chave_mes(mes, ano)) if (ano, mes) in versoes else []
+            fechar_mes(pasta, tarefas_por_dia, ano, mes, eventos)
+            fechados.append((ano, mes))
+    return fechados
+
+
+# ============================================================================
+# CONSULTAS
+# ============================================================================
+
+def consultar(pasta, inicio, fim, condominios=None, texto=None, colunas=None):
+    """Linhas entre os meses inicio e fim ((ano, mes), inclusive) como DataFrame.
+
+    Só as partições do período são abertas; `colunas` limita o que é lido
+    (ano e mes sempre vêm junto).
+    """
+    arquivos = [str(arquivo) for ano, mes in meses_entre(inicio, fim)
+                if (arquivo := _arquivo_mes(pasta, ano, mes)).exists()]
+    if not arquivos:
+        return pd.DataFrame(columns=["ano", "mes"] + (colunas or [c.name for c in ESQUEMA]))
+
+    conjunto = ds.dataset(arquivos, schema=ESQUEMA.append(pa.field("ano", pa.int16())).append(
+        pa.field("mes", pa.int8())), format="parquet", partitioning=PARTICOES, partition_base_dir=str(pasta))
+    filtro = None
+    if condominios:
+        filtro = pc.field("condominio").isin(list(condominios))
+    if texto:
+        por_texto = pc.match_substring(pc.field("descricao_busca"), dobrar(texto))
+        filtro = por_texto if filtro is None else filtro & por_texto
+    tabela = conjunto.to_table(columns=None if colunas is None else ["ano", "mes"] + list(colunas), filter=filtro)
+    return tabela.to_pandas()
+
+
+def variacoes(historico, janela=JANELA_VARIACAO, limiar=LIMIAR_Z):
+    """Valor de cada (condomínio, descrição) mês a mês contra os meses anteriores.
+
+    Referência = mediana dos até `janela` meses anteriores (mínimo
+    MINIMO_MESES). Atípico = z robusto (mediana/MAD) acima de `limiar`; com
+    MAD zero (valor sempre igual), desvio acima de LIMIAR_PCT. Desvios abaixo
+    de VARIACAO_MINIMA nunca são atípicos, por mais estável que seja a série.
+    """
+    dados = historico.assign(valor=historico["valor_pago"].fillna(historico["valor_previsto"]))
+    dados = dados.dropna(subset=["valor"]).sort_values(["condominio", "descricao", "ano", "mes"])
+    dados = dados[["ano", "mes", "condominio", "descricao", "valor"]].astype({"condominio": str})
+
+    def mad(janela_valores):
+        # A janela inclui o NaN do shift no início de cada série
+        return np.nanmedian(np.abs(janela_valores - np.nanmedian(janela_valores)))
+
+    anteriores = dados.groupby(["condominio", "descricao"])["valor"].shift(1)
+    grupos = anteriores.groupby([dados["condominio"], dados["descricao"]])
+    rolagem = grupos.rolling(janela, min_periods=MINIMO_MESES)
+    dados["referencia"] = rolagem.median().reset_index(level=[0, 1], drop=True)
+    dados["mad"] = rolagem.apply(mad, raw=True).reset_index(level=[0, 1], drop=True)
+
+    dados["desvio_pct"] = (dados["valor"] - dados["referencia"]) / dados["referencia"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dados["z"] = 0.6745 * (dados["valor"] - dados["referencia"]) / dados["mad"]
+    dados["atipico"] = np.where(
+        dados["mad"] > 0, dados["z"].abs() > limiar, dados["desvio_pct"].abs() > LIMIAR_PCT
+    ) & (dados["desvio_pct"].abs() > VARIACAO_MINIMA)
+    return dados.drop(columns="mad").reset_index(drop=True)
+
+
+def main(argv=None):
+    from comprimoveis.auditoria import log_padrao
+
+    parser = argparse.ArgumentParser(description="Histórico mensal de pagamentos (Parquet).")
+    parser.add_argument("--catalogo", help="catálogo JSON ({dia: [tarefas]}); padrão: o da Comprimóveis")
+    parser.add_argument("--pasta", default=None, help=f"pasta do histórico (padrão: ${VARIAVEL_PASTA} ou {PASTA_PADRAO})")
+    parser.add_argument("--ano", type=int, help="fecha (regrava) só este mês; exige --mes")
+    parser.add_argument("--mes", type=int)
+    parser.add_argument("--condominio", action="append", help="consulta: condomínio (pode repetir)")
+    parser.add_argument("--texto", help="consulta: trecho da descrição, sem diferenciar acentos")
+    parser.add_argument("--meses", type=int, default=18, help="consulta: meses até o mês passado")
+    args = parser.parse_args(argv)
+    pasta = Path(args.pasta) if args.pasta else pasta_padrao()
+
+    if args.condominio or args.texto:
+        fim = recuar_meses(date.today().year, date.today().month, 1)
+        historico = consultar(pasta, recuar_meses(*fim, args.meses - 1), fim, args.condominio, args.texto)
+        print(variacoes(historico).to_string(index=False))
+        return
+
+    tarefas_por_dia = catalogo_padrao(args.catalogo)
+    log = log_padrao()
+    if args.ano and args.mes:
+        fechar_mes(pasta, tarefas_por_dia, args.ano, args.mes, log.historico(mes=chave_mes(args.mes, args.ano)))
+        print(f"📦 {args.mes:02d}/{args.ano} fechado em {pasta}")
+    else:
+        for ano, mes in fechar_pendentes(pasta, tarefas_por_dia, log):
+            print(f"📦 {mes:02d}/{ano} fechado em {pasta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+🎯 Captura de leads das conversas do chat, fora do caminho da resposta
+
+Toda conversa em que o visitante menciona orçamento, bairro, telefone,
+e-mail ou "quero alugar/comprar" é um lead. Depois de cada resposta do
+assistente, o chat só entrega a conversa a ``CapturaLeads.enviar``, que
+não bloqueia: a extração roda numa thread de fundo.
+
+- fila limitada (``capacidade``) de ids de conversa; uma conversa que já
+  está esperando na fila só tem o texto atualizado (não ocupa outra vaga).
+  Com a fila cheia a conversa é descartada e contada: o chat nunca espera
+- extração por expressões regulares compiladas (telefone, e-mail, valor em
+  reais, bairro, intenção), só nas mensagens do visitante — as respostas
+  do assistente citam os telefones e bairros da própria Comprimóveis
+- passada opcional por LLM em lote: as conversas drenadas juntas da fila
+  vão num único prompt que devolve intenção e resumo de cada uma
+- um registro por conversa em SQLite (``COMPRIMOVEIS_LEADS_DIR/leads.sqlite3``,
+  padrão ``.leads/``): reextrações somam os campos novos ao que já existe
+  e só gravam se algo mudou
+
+``estatisticas()`` expõe as métricas da fila (profundidade, máxima,
+descartes, coalescências, tempo de processamento).
+
+    python -m comprimoveis.leads                  # lista os leads
+    python -m comprimoveis.leads --jsonl leads.jsonl
+"""
+
+import argparse
+import atexit
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from comprimoveis.agente import MODELO
+from comprimoveis.busca import dobrar
+
+VARIAVEL_PASTA = "COMPRIMOVEIS_LEADS_DIR"
+VARIAVEL_CHAVE_LLM = "COMPRIMOVEIS_LEADS_API_KEY"
+PASTA_PADRAO = ".leads"
+CAPACIDADE = 256
+TAMANHO_LOTE = 16
+CAMPOS = ("telefones", "emails", "valores", "bairros", "intencoes")
+
+# ============================================================================
+# EXTRAÇÃO
+# ============================================================================
+
+TELEFONE = re.compile(
+    r"(?<!\d)(?:\+?55[\s.-]?)?\(?(?P<ddd>[1-9]\d)\)?[\s.-]?(?P<numero>9?\d{4})[\s.-]?(?P<final>\d{4})(?!\d)"
+)
+EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+VALOR = re.compile(
+    r"(?:r\$\s*(?P<reais>\d{1,3}(?:\.\d{3})+|\d+)(?:,(?P<centavos>\d{2}))?(?:\s*(?P<escala_reais>mil|milhao|milhoes))?)"
+    r"|(?:\b(?P<numero>\d+(?:[.,]\d+)?)\s*(?P<escala>mil|milhao|milhoes|k)\b)"
+)
+ESCALAS = {"mil": 1e3, "k": 1e3, "milhao": 1e6, "milhoes": 1e6}
+
+BAIRROS = [
+    "Freguesia", "Jacarepaguá", "Pechincha", "Tanque", "Tijuca", "Taquara", "Anil", "Gardênia Azul",
+    "Cidade de Deus", "Curicica", "Praça Seca", "Vila Valqueire", "Barra da Tijuca", "Recreio",
+    "Camorim", "Vargem Grande", "Vargem Pequena", "Itanhangá", "Grajaú", "Vila Isabel", "Méier",
+    "Botafogo", "Copacabana", "Ipanema", "Leblon", "Flamengo", "Laranjeiras", "Centro",
+]
+_BAIRROS_DOBRADOS = {dobrar(bairro): bairro for bairro in BAIRROS}
+BAIRRO = re.compile(r"\b(" + "|".join(
+    re.escape(nome) for nome in sorted(_BAIRROS_DOBRADOS, key=len, reverse=True)
+) + r")\b")
+
+INTENCOES = {
+    "alugar": re.compile(r"\b(alugar|aluguel|locacao|locar|alugo)\b"),
+    "comprar": re.compile(r"\b(comprar|compra|adquirir|financiar|financiamento)\b"),
+    "vender": re.compile(r"\b(vender|venda|vendo|anunciar)\b"),
+    "administracao": re.compile(r"\b(administracao|administrar|sindico|condominio)\b"),
+}
+
+
+def _valor(casamento):
+    if casamento["reais"]:
+        valor = float(casamento["reais"].replace(".", "")) + int(casamento["centavos"] or 0) / 100
+        return valor * ESCALAS.get(casamento["escala_reais"], 1)
+    return float(casamento["numero"].replace(",", ".")) * ESCALAS[casamento["escala"]]
+
+
+def extrair(texto):
+    """Campos de lead encontrados no texto: {campo: [valores]} (só campos não vazios)."""
+    dobrado = dobrar(texto)
+    encontrados = {
+        "telefones": {f"+55{c['ddd']}{c['numero']}{c['final']}" for c in TELEFONE.finditer(texto)},
+        "emails": {email.lower() for email in EMAIL.findall(texto)},
+        "valores": {_valor(c) for c in VALOR.finditer(dobrado)},
+        "bairros": {_BAIRROS_DOBRADOS[nome] for nome in BAIRRO.findall(dobrado)},
+        "intencoes": {nome for nome, padrao in INTENCOES.items() if padrao.search(dobrado)},
+    }
+    return {campo: sorted(valores) for campo, valores in encontrados.items() if valores}
+
+
+def texto_visitante(mensagens):
+    return "\n".join(m["content"] for m in mensagens if m["role"] == "user")
+
+
+# ============================================================================
+# PASSADA POR LLM (OPCIONAL)
+# ============================================================================
+
+def prompt_lote(textos):
+    conversas = "\n\n".join(f"### {i}\n{texto}" for i, texto in enumerate(textos))
+    return f"""Abaixo estão falas de visitantes do site de uma imobiliária, numeradas.
+Para cada uma, responda uma linha JSON {{"n": número, "intencao": "alugar|comprar|vender|administracao|outro", "resumo": "até 15 palavras"}}.
+Responda só as linhas JSON, na ordem.
+
+{conversas}"""
+
+
+def classificador_gemini(api_key, modelo=MODELO):
+    """Classificador em lote: [texto] -> [{"intencao", "resumo"}] numa única chamada.
+
+    Usa um cliente próprio, com a chave nas ``client_options``: o
+    ``genai.configure`` é global ao processo e o chat o refaz a cada turno
+    com a chave do visitante; reconfigurar daqui, na thread de fundo, faria
+    uma chamada sair (e ser cobrada) na chave da outra.
+    """
+    import google.ai.generativelanguage as glm
+
+    cliente = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+
+    def gerar(prompt):
+        resposta = cliente.generate_content(glm.GenerateContentRequest(
+            model=f"models/{modelo}", contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])]))
+        return "".join(parte.text for candidato in resposta.candidates[:1] for parte in candidato.content.parts)
+
+    def classificar(textos):
+        resultado = [{} for _ in textos]
+        for linha in gerar(prompt_lote(textos)).splitlines():
+            try:
+                dados = json.loads(linha.strip().strip("`"))
+                resultado[int(dados["n"])] = {"intencao": dados.get("intencao"), "resumo": dados.get("resumo")}
+            except (ValueError, KeyError, IndexError, TypeError):
+                continue
+        return resultado
+
+    return classificar
+
+
+# ============================================================================
+# ARMAZENAMENTO
+# ============================================================================
+
+class ArquivoLeads:
+    """Leads em SQLite, um registro por conversa. Uma conexão por thread."""
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS leads (
+                    conversa TEXT PRIMARY KEY,
+                    dados TEXT NOT NULL,
+                    resumo TEXT,
+                    criado_em TEXT NOT NULL,
+                    atualizado_em TEXT NOT NULL
+                )""")
+
+    def _conectar(self):
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    def gravar(self, conversa, campos, resumo=None, conexao=None):
+        """Soma `campos` ao lead da conversa; devolve True se algo mudou."""
+        if conexao is None:
+            with closing(self._conectar()) as conexao:
+                return self.gravar(conversa, campos, resumo, conexao)
+        with conexao:
+            linha = conexao.execute("SELECT dados, resumo FROM leads WHERE conversa = ?", (conversa,)).fetchone()
+            atuais = json.loads(linha[0]) if linha else {}
+            novos = {
+                campo: sorted(set(atuais.get(campo, [])) | set(campos.get(campo, [])))
+                for campo in CAMPOS if atuais.get(campo) or campos.get(campo)
+            }
+            resumo = resumo or (linha[1] if linha else None)
+            if linha and novos == atuais and resumo == linha[1]:
+                return False
+            agora = datetime.now().isoformat(timespec="seconds")
+            conexao.execute(
+                "INSERT INTO leads (conversa, dados, resumo, criado_em, atualizado_em) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (conversa) DO UPDATE SET dados = excluded.dados, resumo = excluded.resumo,"
+                " atualizado_em = excluded.atualizado_em",
+                (conversa, json.dumps(novos, ensure_ascii=False), resumo, agora, agora),
+            )
+            return True
+
+    def leads(self):
+        with closing(self._conectar()) as conexao:
+            linhas = conexao.execute(
+                "SELECT conversa, dados, resumo, criado_em, atualizado_em FROM leads ORDER BY atualizado_em DESC"
+            ).fetchall()
+        return [
+            {"conversa": conversa, **json.loads(dados), "resumo": resumo,
+             "criado_em": criado_em, "atualizado_em": atualizado_em}
+            for conversa, dados, resumo, criado_em, atualizado_em in linhas
+        ]
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+class CapturaLeads:
+    def __init__(self, arquivo, capacidade=CAPACIDADE, classificador=None, tamanho_lote=TAMANHO_LOTE):
+        self.arquivo = arquivo
+        self.classificador = classificador
+        self.tamanho_lote = tamanho_lote
+        self._fila = queue.Queue(maxsize=capacidade)
+        self._pendentes = {}  # conversa -> texto mais recente ainda não processado
+        self._lock = threading.Lock()
+        self._metricas = dict.fromkeys(
+            ("enfileiradas", "coalescidas", "descartadas", "processadas", "leads_gravados",
+             "erros", "profundidade_max"), 0)
+        self._tempo_total = 0.0
+        self._thread = threading.Thread(target=self._trabalhar, name="captura-leads", daemon=True)
+        self._thread.start()
+
+    def enviar(self, conversa, mensagens):
+        """Agenda a extração da conversa; nunca bloqueia. Devolve False se descartada."""
+        texto = texto_visitante(mensagens)
+        if not texto:
+            return True
+        with self._lock:
+            if conversa in self._pendentes:
+                self._pendentes[conversa] = texto
+                self._metricas["coalescidas"] += 1
+                return True
+            try:
+                self._fila.put_nowait(conversa)
+            except queue.Full:
+                self._metricas["descartadas"] += 1
+                return False
+            self._pendentes[conversa] = texto
+            self._metricas["enfileiradas"] += 1
+            self._metricas["profundidade_max"] = max(self._metricas["profundidade_max"], self._fila.qsize())
+            return True
+
+    def _lote(self):
+        """Bloqueia pela primeira conversa e leva junto as que já estiverem na fila."""
+        lote = [self._fila.get()]
+        while lote[-1] is not None and len(lote) < self.tamanho_lote:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _trabalhar(self):
+        conexao = self.arquivo._conectar()
+        while True:
+            lote = self._lote()
+            parar = lote[-1] is None
+            conversas = [conversa for conversa in lote if conversa is not None]
+            try:
+                with self._lock:
+                    textos = [self._pendentes.pop(conversa) for conversa in conversas]
+                if conversas:
+                    self._processar(conversas, textos, conexao)
+            except Exception:
+                # Última rede: a thread não pode morrer (captura_padrao não a recria)
+                with self._lock:
+                    self._metricas["erros"] += 1
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+            if parar:
+                conexao.close()
+                return
+
+    def _processar(self, conversas, textos, conexao):
+        """Extrai, classifica e grava o lote; uma conversa com erro não derruba as outras."""
+        inicio = time.perf_counter()
+        extraidos = [extrair(texto) for texto in textos]
+        # Só as conversas com algum sinal vão ao LLM (e ao banco)
+        com_sinal = [i for i, campos in enumerate(extraidos) if campos]
+        classificacoes = {}
+        if self.classificador and com_sinal:
+            try:
+                respostas = self.classificador([textos[i] for i in com_sinal])
+                classificacoes = dict(zip(com_sinal, respostas))
+            except Exception:
+                with self._lock:
+                    self._metricas["erros"] += 1
+        gravados = 0
+        for i in com_sinal:
+            campos, classificacao = extraidos[i], classificacoes.get(i, {})
+            if classificacao.get("intencao") in INTENCOES:
+                campos["intencoes"] = sorted(set(campos.get("intencoes", [])) | {classificacao["intencao"]})
+            try:
+                gravados += self.arquivo.gravar(conversas[i], campos, classificacao.get("resumo"), conexao)
+            except Exception:
+                # Ex.: banco travado, registro antigo corrompido
+                with self._lock:
+                    self._metricas["erros"] += 1
+        with self._lock:
+            self._metricas["processadas"] += len(conversas)
+            self._metricas["leads_gravados"] += gravados
+            self._tempo_total += time.perf_counter() - inicio
+
+    def aguardar(self):
+        """Espera a fila esvaziar (útil em testes e no encerramento)."""
+        self._fila.join()
+
+    def parar(self):
+        if self._thread.is_alive():
+            self._fila.put(None)
+            self._thread.join(timeout=10)
+
+    def estatisticas(self):
+        with self._lock:
+            processadas = self._metricas["processadas"]
+            return {
+                **self._metricas,
+                "profundidade": self._fila.qsize(),
+                "capacidade": self._fila.maxsize,
+                "tempo_medio_ms": 1000 * self._tempo_total / processadas if processadas else 0.0,
+            }
+
+
+@lru_cache(maxsize=None)
+def captura_padrao():
+    """Pipeline do processo (pasta em COMPRIMOVEIS_LEADS_DIR; LLM se COMPRIMOVEIS_LEADS_API_KEY)."""
+    pasta = Path(os.environ.get(VARIAVEL_PASTA, PASTA_PADRAO))
+    chave = os.environ.get(VARIAVEL_CHAVE_LLM)
+    captura = CapturaLeads(ArquivoLeads(pasta / "leads.sqlite3"),
+                           classificador=classificador_gemini(chave) if chave else None)
+    # Termina o que estiver na fila antes de o processo sair
+    atexit.register(captura.parar)
+    return captura
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Leads capturados nas conversas do chat.")
+    parser.add_argument("--pasta", default=None, help=f"pasta dos leads (padrão: ${VARIAVEL_PASTA} ou {PASTA_PADRAO})")
+    parser.add_argument("--jsonl", help="exporta os leads neste arquivo JSONL")
+    args = parser.parse_args(argv)
+
+    pasta = Path(args.pasta or os.environ.get(VARIAVEL_PASTA, PASTA_PADRAO))
+    leads = ArquivoLeads(pasta / "leads.sqlite3").leads()
+    if args.jsonl:
+        with open(args.jsonl, "w", encoding="utf-8") as arquivo:
+            for lead in leads:
+                arquivo.write(json.dumps(lead, ensure_ascii=False) + "\n")
+        print(f"🎯 {len(leads)} leads exportados para {args.jsonl}")
+        return
+    for lead in leads:
+        contatos = ", ".join(lead.get("telefones", []) + lead.get("emails", [])) or "sem contato"
+        print(f"🎯 {lead['atualizado_em']}  {contatos}  {lead.get('intencoes', [])}  {lead.get('bairros', [])}"
+              f"  {lead.get('valores', [])}  {lead['resumo'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
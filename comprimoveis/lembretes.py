@@ -0,0 +1,270 @@
+"""
+🔔 Agendador de lembretes de vencimento (processo independente)
+
+Mantém os próximos avisos numa min-heap ordenada pelo horário de disparo e
+dorme até o primeiro deles vencer (``Event.wait`` com timeout): sem
+polling, o processo fica parado enquanto não há nada a enviar.
+
+Para cada tarefa do catálogo são agendados três avisos, se ela ainda não
+estiver concluída no momento do disparo:
+
+- ``aviso``: ``--dias-aviso`` dias antes do vencimento
+- ``vencimento``: no dia do vencimento
+- ``atraso``: no dia seguinte ao vencimento
+
+A heap só guarda uma janela móvel de dias; um evento diário de
+reabastecimento acrescenta o próximo dia. O estado de conclusão vem da
+trilha de auditoria (``comprimoveis.auditoria``), a mesma do calendário:
+a cada disparo só os eventos novos do log são aplicados.
+
+Avisos de ``aviso`` e ``vencimento`` só saem no próprio dia do disparo (um
+processo parado não manda "vence hoje" de ontem). Uma falha de envio
+(SMTP recusado, tempo esgotado) não derruba o processo: o aviso volta para
+a heap e é tentado de novo ``REENVIO`` depois.
+
+    python -m comprimoveis.lembretes --saida caixa_saida \\
+        --para vanessa@comprimoveis.com.br
+"""
+
+import argparse
+import heapq
+import itertools
+import signal
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from pathlib import Path
+
+from comprimoveis.agregados import chave_tarefa
+from comprimoveis.auditoria import LogAuditoria, log_padrao
+from comprimoveis.catalogo import catalogo_padrao, vencimento_nominal
+from comprimoveis.formatacao import formatar_brl
+
+REMETENTE = "calendario-bpo@comprimoveis.local"
+REENVIO = timedelta(minutes=15)
+
+
+class EstadoConclusao:
+    """Tarefas concluídas segundo a trilha de auditoria.
+
+    Acompanha o log pela versão: cada consulta aplica só os eventos
+    posteriores à última vista (um ``os.stat`` quando nada mudou).
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self._versao = None
+        self._concluidas = set()
+
+    def concluida(self, chave):
+        mudancas = None if self._versao is None else self.log.mudancas_desde(self._versao)
+        if mudancas is None:
+            # Primeira consulta, ou eventos que já saíram da janela recente
+            self._versao, estado = self.log.concluidas()
+            self._concluidas = {c for chaves in estado.values() for c in chaves}
+        for evento in mudancas or ():
+            if evento["concluida"]:
+                self._concluidas.add(evento["chave"])
+            else:
+                self._concluidas.discard(evento["chave"])
+            self._versao = evento["seq"]
+        return chave in self._concluidas
+
+
+# ============================================================================
+# CAIXAS DE SAÍDA
+# ============================================================================
+
+class CaixaArquivos:
+    """Grava cada lembrete como .eml; o nome do arquivo evita reenvios."""
+
+    def __init__(self, pasta):
+        self.pasta = Path(pasta)
+        self.pasta.mkdir(parents=True, exist_ok=True)
+
+    def ja_enviado(self, identificador):
+        return (self.pasta / f"{identificador}.eml").exists()
+
+    def enviar(self, identificador, mensagem):
+        temporario = self.pasta / f".{identificador}.tmp"
+        temporario.write_bytes(bytes(mensagem))
+        temporario.replace(self.pasta / f"{identificador}.eml")
+
+
+class CaixaSMTP(CaixaArquivos):
+    """Envia para um SMTP local (ex.: ``python -m aiosmtpd -n``) e guarda cópia em arquivo."""
+
+    def __init__(self, pasta, servidor):
+        super().__init__(pasta)
+        host, _, porta = servidor.partition(":")
+        self.host, self.porta = host, int(porta or 25)
+
+    def enviar(self, identificador, mensagem):
+        with smtplib.SMTP(self.host, self.porta, timeout=10) as smtp:
+            smtp.send_message(mensagem)
+        super().enviar(identificador, mensagem)
+
+
+# ============================================================================
+# AGENDADOR
+# ============================================================================
+
+class Agendador:
+    def __init__(self, tarefas_por_dia, estado, caixa, destinatarios, dias_aviso=2,
+                 hora=8, agora=datetime.now):
+        self.tarefas_por_dia = tarefas_por_dia
+        self.estado = estado
+        self.caixa = caixa
+        self.destinatarios = destinatarios
+        self.dias_aviso = dias_aviso
+        self.hora = hora
+        self.agora = agora
+        self.heap = []
+        self._sequencia = itertools.count()
+        self._parar = threading.Event()
+        # Dias do catálogo em ordem, para os vencimentos que caem no fim do mês
+        self._dias = sorted(tarefas_por_dia)
+        self._deslocamentos = {"aviso": -dias_aviso, "vencimento": 0, "atraso": 1}
+        self.proximo_dia = None
+
+    def _agendar(self, quando, item):
+        heapq.heappush(self.heap, (quando, next(self._sequencia), item))
+
+    def _disparo(self, data):
+        return datetime.combine(data, datetime.min.time()).replace(hour=self.hora)
+
+    def _agendar_vencimentos(self, data_venc):
+        """Agenda os três avisos de todas as tarefas que vencem em data_venc.
+
+        Dias do catálogo que não existem no mês (30 em fevereiro) vencem no último dia.
+        """
+        for dia in self._dias:
+            if vencimento_nominal(data_venc.year, data_venc.month, dia) != data_venc:
+                continue
+            for idx in range(len(self.tarefas_por_dia[dia])):
+                for tipo in self._deslocamentos:
+                    self._agendar(self._disparo_aviso(tipo, data_venc), (tipo, data_venc, dia, idx))
+
+    def _disparo_aviso(self, tipo, data_venc):
+        return self._disparo(data_venc + timedelta(days=self._deslocamentos[tipo]))
+
+    def _reabastecer(self, ate):
+        """Acrescenta à heap os vencimentos até `ate` (inclusive)."""
+        while self.proximo_dia <= ate:
+            self._agendar_vencimentos(self.proximo_dia)
+            self.proximo_dia += timedelta(days=1)
+
+    def iniciar(self):
+        hoje = self.agora().date()
+        # Avisos de atraso de ontem ainda podem estar pendentes
+        self.proximo_dia = hoje - timedelta(days=1)
+        self._reabastecer(hoje + timedelta(days=self.dias_aviso))
+        self._agendar(datetime.combine(hoje + timedelta(days=1), datetime.min.time()), ("reabastecer",))
+
+    def _processar(self, item, quando):
+        if item[0] == "reabastecer":
+            dia = quando.date()
+            self._reabastecer(dia + timedelta(days=self.dias_aviso))
+            self._agendar(datetime.combine(dia + timedelta(days=1), datetime.min.time()), ("reabastecer",))
+            return None
+
+        tipo, data_venc, dia, idx = item
+        # `quando` é o da tentativa; um reenvio guarda o disparo original
+        disparo = self._disparo_aviso(tipo, data_venc)
+        agora = self.agora()
+        if tipo != "atraso" and disparo.date() < agora.date():
+            # Processo ficou parado: "vence hoje" de ontem já não é verdade
+            return None
+        if agora - disparo > timedelta(days=1):
+            # Atraso antigo demais para ainda ser útil
+            return None
+        chave = chave_tarefa(data_venc.month, data_venc.year, dia, idx)
+        identificador = f"{disparo:%Y%m%d}-{tipo}-{data_venc:%Y%m%d}-{dia}-{idx}"
+        if self.estado.concluida(chave) or self.caixa.ja_enviado(identificador):
+            return None
+        tarefa = self.tarefas_por_dia[dia][idx]
+        try:
+            self.caixa.enviar(identificador, self._mensagem(tipo, data_venc, tarefa))
+        except (smtplib.SMTPException, OSError) as e:
+            print(f"⚠️ Falha ao enviar {identificador}: {e}; nova tentativa em {REENVIO}", flush=True)
+            self._agendar(agora + REENVIO, item)
+            return None
+        return identificador
+
+    def _mensagem(self, tipo, data_venc, tarefa):
+        faltam = (data_venc - self.agora().date()).days
+        assuntos = {
+            "aviso": f"⏰ Vence em {faltam} dia(s)",
+            "vencimento": "🔔 Vence HOJE",
+            "atraso": "⚠️ Em atraso",
+        }
+        valor_str = formatar_brl(tarefa.get("valor"), vazio="valor a confirmar")
+        mensagem = EmailMessage()
+        mensagem["From"] = REMETENTE
+        mensagem["To"] = ", ".join(self.destinatarios)
+        mensagem["Subject"] = f"{assuntos[tipo]}: {tarefa['condominio']} - {tarefa['descricao']}"
+        mensagem.set_content(
+            f"Condomínio: {tarefa['condominio']}\n"
+            f"Tipo: {tarefa['tipo']}\n"
+            f"Descrição: {tarefa['descricao']}\n"
+            + (f"Destinatário: {tarefa['destinatario']}\n" if tarefa.get("destinatario") else "")
+            + f"Valor: {valor_str}\n"
+            f"Vencimento: {data_venc:%d/%m/%Y}\n\n"
+            "Calendário BPO - Comprimóveis"
+        )
+        return mensagem
+
+    def executar_pendentes(self):
+        """Dispara tudo que já venceu; devolve os identificadores enviados."""
+        enviados = []
+        agora = self.agora()
+        while self.heap and self.heap[0][0] <= agora:
+            quando, _, item = heapq.heappop(self.heap)
+            identificador = self._processar(item, quando)
+            if identificador:
+                enviados.append(identificador)
+        return enviados
+
+    def rodar(self):
+        self.iniciar()
+        while not self._parar.is_set():
+            for identificador in self.executar_pendentes():
+                print(f"📨 {identificador}", flush=True)
+            espera = (self.heap[0][0] - self.agora()).total_seconds()
+            # Event.wait devolve assim que parar() é chamado
+            self._parar.wait(max(espera, 0))
+
+    def parar(self, *_):
+        self._parar.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lembretes de vencimento do Calendário BPO.")
+    parser.add_argument("--catalogo", help="catálogo JSON ({dia: [tarefas]}); padrão: o da Comprimóveis")
+    parser.add_argument("--auditoria", help="pasta da trilha de auditoria; padrão: a do calendário")
+    parser.add_argument("--saida", default="caixa_saida", help="pasta da caixa de saída (.eml)")
+    parser.add_argument("--smtp", help="host:porta de um SMTP local; sem ele, só grava arquivos")
+    parser.add_argument("--para", action="append", default=[], help="destinatário (pode repetir)")
+    parser.add_argument("--dias-aviso", type=int, default=2)
+    parser.add_argument("--hora", type=int, default=8, help="hora do dia em que os avisos disparam")
+    args = parser.parse_args(argv)
+
+    caixa = CaixaSMTP(args.saida, args.smtp) if args.smtp else CaixaArquivos(args.saida)
+    agendador = Agendador(
+        catalogo_padrao(args.catalogo),
+        EstadoConclusao(LogAuditoria(args.auditoria) if args.auditoria else log_padrao()),
+        caixa,
+        args.para or ["vanessa@comprimoveis.local"],
+        dias_aviso=args.dias_aviso,
+        hora=args.hora,
+    )
+    signal.signal(signal.SIGTERM, agendador.parar)
+    signal.signal(signal.SIGINT, agendador.parar)
+    print(f"🔔 Agendador iniciado em {time.strftime('%d/%m/%Y %H:%M')} (saída: {args.saida})", flush=True)
+    agendador.rodar()
+
+
+if __name__ == "__main__":
+    main()
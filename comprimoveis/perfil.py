@@ -0,0 +1,127 @@
+"""
+🩺 Perfil opcional de cada rerun (cProfile)
+
+Desligado por padrão; o custo nesse caso é uma leitura de variável de
+ambiente por rerun. Controle por ``COMPRIMOVEIS_PERFIL``:
+
+- não definida: nunca perfila (o query param é ignorado)
+- ``1``: perfila todos os reruns de todas as sessões
+- ``query``: perfila só as sessões abertas com ``?perfil=1`` na URL
+
+Cada rerun vira um arquivo ``.prof`` (formato pstats) em
+``COMPRIMOVEIS_PERFIL_DIR/<app>/`` (padrão ``.perfis/``), mantendo apenas os
+``COMPRIMOVEIS_PERFIL_MAX`` mais recentes (padrão 50). Os arquivos abrem em
+``python -m pstats`` ou snakeviz.
+
+O painel com o resumo dos perfis (e outros números do processo) só aparece
+para administradores: quem abre a página com ``?admin=<token>``, sendo o
+token o valor de ``COMPRIMOVEIS_ADMIN``. Sem a variável, ninguém o vê.
+"""
+
+import cProfile
+import hmac
+import os
+import pstats
+import time
+from pathlib import Path
+
+VARIAVEL_MODO = "COMPRIMOVEIS_PERFIL"
+VARIAVEL_PASTA = "COMPRIMOVEIS_PERFIL_DIR"
+VARIAVEL_MAX = "COMPRIMOVEIS_PERFIL_MAX"
+VARIAVEL_ADMIN = "COMPRIMOVEIS_ADMIN"
+
+# Perfil ainda aberto na sessão (rerun interrompido por st.stop/st.rerun)
+CHAVE_SESSAO = "_perfil_rerun"
+
+
+def _pasta(app):
+    return Path(os.environ.get(VARIAVEL_PASTA, ".perfis")) / app
+
+
+def perfil_ativo(query_params):
+    modo = os.environ.get(VARIAVEL_MODO)
+    if not modo:
+        return False
+    if modo == "query":
+        return query_params.get("perfil") == "1"
+    return modo not in ("0", "false")
+
+
+def admin_ativo(query_params):
+    """True se a sessão abriu com ``?admin=`` igual ao token de COMPRIMOVEIS_ADMIN."""
+    token = os.environ.get(VARIAVEL_ADMIN)
+    if not token:
+        return False
+    return hmac.compare_digest(query_params.get("admin", "").encode(), token.encode())
+
+
+class PerfilRerun:
+    """cProfile de uma única execução do script."""
+
+    def __init__(self, app):
+        self.app = app
+        self.inicio = time.perf_counter()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def finalizar(self):
+        self.profiler.disable()
+        duracao_ms = (time.perf_counter() - self.inicio) * 1000
+        pasta = _pasta(self.app)
+        pasta.mkdir(parents=True, exist_ok=True)
+        nome = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{duracao_ms:.0f}ms.prof"
+        self.profiler.dump_stats(pasta / nome)
+        _rotacionar(pasta, int(os.environ.get(VARIAVEL_MAX, "50")))
+
+
+def _rotacionar(pasta, maximo):
+    arquivos = sorted(pasta.glob("*.prof"))
+    for antigo in arquivos[:-maximo]:
+        antigo.unlink(missing_ok=True)
+
+
+def iniciar_perfil(app, query_params, session_state):
+    """Chamar no início do script; devolve o perfil do rerun ou None."""
+    pendente = session_state.get(CHAVE_SESSAO)
+    if pendente is not None:
+        # O rerun anterior não chegou ao fim do script
+        session_state[CHAVE_SESSAO] = None
+        pendente.finalizar()
+
+    if not perfil_ativo(query_params):
+        return None
+    perfil = PerfilRerun(app)
+    session_state[CHAVE_SESSAO] = perfil
+    return perfil
+
+
+def finalizar_perfil(perfil, session_state):
+    """Chamar no fim do script com o retorno de iniciar_perfil."""
+    if perfil is None:
+        return
+    session_state[CHAVE_SESSAO] = None
+    perfil.finalizar()
+
+
+def resumo_perfis(app, ultimos=20, limite=15):
+    """Funções mais custosas somando os últimos perfis gravados.
+
+    Devolve (duracoes_ms, linhas), com linhas ordenadas por tempo próprio.
+    """
+    arquivos = sorted(_pasta(app).glob("*.prof"))[-ultimos:]
+    if not arquivos:
+        return [], []
+
+    duracoes = [float(arquivo.stem.rsplit("-", 1)[-1].removesuffix("ms")) for arquivo in arquivos]
+    stats = pstats.Stats(*(str(arquivo) for arquivo in arquivos))
+
+    linhas = []
+    for (arquivo, linha, funcao), (_, chamadas, proprio, acumulado, _) in stats.stats.items():
+        linhas.append({
+            "funcao": f"{funcao} ({Path(arquivo).name}:{linha})",
+            "chamadas": chamadas,
+            "tempo_proprio_ms": proprio * 1000 / len(arquivos),
+            "tempo_acumulado_ms": acumulado * 1000 / len(arquivos),
+        })
+    linhas.sort(key=lambda l: l["tempo_proprio_ms"], reverse=True)
+    return duracoes, linhas[:limite]
@@ -0,0 +1,219 @@
+"""
+🧠 Memória das sessões do chat, com orçamento por sessão e despejo por ociosidade
+
+O histórico de cada conversa deixa de morar em ``st.session_state`` (que
+vive enquanto o servidor viver) e passa para um gerenciador do processo:
+
+- cada mensagem é gravada na hora no arquivo da sessão
+  (``COMPRIMOVEIS_SESSOES_DIR/<id>.jsonl``, padrão ``.sessoes/``)
+- em memória fica só a cauda da conversa, limitada por ``max_mensagens`` e
+  ``max_bytes``; o que sai da cauda continua no arquivo e pode ser relido
+  sob demanda. Uma mensagem isolada (ex.: um erro enorme da API) é cortada
+  em ``LIMITE_MENSAGEM`` na memória, inteira no arquivo
+- sessões sem uso há mais de ``ttl`` segundos são despejadas da memória;
+  se o visitante voltar, a cauda é recarregada do arquivo. Acima de
+  ``max_sessoes`` vivas, a menos usada recentemente sai primeiro
+- arquivos sem uso há mais de ``RETENCAO`` são apagados
+
+Assim a memória retida fica limitada a ``max_sessoes × max_bytes`` por
+mais tráfego que o processo receba. ``estatisticas()`` expõe os contadores
+do processo (sessões vivas, bytes retidos, despejos).
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from functools import lru_cache
+from pathlib import Path
+
+VARIAVEL_PASTA = "COMPRIMOVEIS_SESSOES_DIR"
+PASTA_PADRAO = ".sessoes"
+MAX_MENSAGENS = 40           # 20 interações
+MAX_BYTES = 64 * 1024
+LIMITE_MENSAGEM = 16 * 1024
+TTL = 30 * 60                # segundos sem uso até o despejo
+MAX_SESSOES = 500
+RETENCAO = 7 * 24 * 3600     # segundos sem uso até apagar o arquivo
+INTERVALO_LIMPEZA = 3600
+
+AVISO_CORTE = "\n\n_(mensagem longa cortada)_"
+
+
+def _tamanho(mensagem):
+    return len(mensagem["content"].encode("utf-8"))
+
+
+def _cortar(mensagem):
+    """Versão da mensagem que fica em memória (conteúdo até LIMITE_MENSAGEM bytes)."""
+    dados = mensagem["content"].encode("utf-8")
+    if len(dados) <= LIMITE_MENSAGEM:
+        return mensagem
+    conteudo = dados[:LIMITE_MENSAGEM].decode("utf-8", errors="ignore") + AVISO_CORTE
+    return {**mensagem, "content": conteudo}
+
+
+class SessaoChat:
+    __slots__ = ("id", "arquivo", "mensagens", "bytes", "arquivadas", "ultimo_uso")
+
+    def __init__(self, id_sessao, arquivo, agora):
+        self.id = id_sessao
+        self.arquivo = arquivo
+        self.mensagens = deque()
+        self.bytes = 0
+        self.arquivadas = 0  # mensagens só no arquivo, antes da cauda em memória
+        self.ultimo_uso = agora
+
+
+class GerenciadorSessoes:
+    def __init__(self, pasta, max_mensagens=MAX_MENSAGENS, max_bytes=MAX_BYTES, ttl=TTL,
+                 max_sessoes=MAX_SESSOES, relogio=time.monotonic):
+        self.pasta = Path(pasta)
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self.max_mensagens = max_mensagens
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_sessoes = max_sessoes
+        self.relogio = relogio
+        self._lock = threading.Lock()
+        # Em ordem de último uso: as primeiras são as candidatas a despejo
+        self._sessoes = OrderedDict()
+        self._bytes = 0
+        self._despejadas = 0
+        self._restauradas = 0
+        self._proxima_limpeza = 0.0
+
+    # ------------------------------------------------------------------
+    # Memória
+    # ------------------------------------------------------------------
+
+    def _reter(self, sessao, mensagem):
+        mensagem = _cortar(mensagem)
+        sessao.mensagens.append(mensagem)
+        tamanho = _tamanho(mensagem)
+        sessao.bytes += tamanho
+        self._bytes += tamanho
+        # Sempre sobra ao menos a última mensagem
+        while len(sessao.mensagens) > 1 and (
+            len(sessao.mensagens) > self.max_mensagens or sessao.bytes > self.max_bytes
+        ):
+            tamanho = _tamanho(sessao.mensagens.popleft())
+            sessao.bytes -= tamanho
+            self._bytes -= tamanho
+            sessao.arquivadas += 1
+
+    def _remover(self, id_sessao):
+        sessao = self._sessoes.pop(id_sessao)
+        self._bytes -= sessao.bytes
+
+    def _despejar(self, agora):
+        """Tira da memória as sessões ociosas e as excedentes (LRU)."""
+        while self._sessoes:
+            sessao = next(iter(self._sessoes.values()))
+            if agora - sessao.ultimo_uso <= self.ttl and len(self._sessoes) <= self.max_sessoes:
+                break
+            self._remover(sessao.id)
+            self._despejadas += 1
+
+    def _carregar(self, id_sessao, agora):
+        sessao = SessaoChat(id_sessao, self.pasta / f"{id_sessao}.jsonl", agora)
+        if sessao.arquivo.exists():
+            with open(sessao.arquivo, encoding="utf-8") as arquivo:
+                for linha in arquivo:
+                    if linha.endswith("\n"):
+                        self._reter(sessao, json.loads(linha))
+            self._restauradas += 1
+        return sessao
+
+    def _sessao(self, id_sessao):
+        agora = self.relogio()
+        sessao = self._sessoes.get(id_sessao)
+        if sessao is None:
+            sessao = self._sessoes[id_sessao] = self._carregar(id_sessao, agora)
+        sessao.ultimo_uso = agora
+        self._sessoes.move_to_end(id_sessao)
+        self._despejar(agora)
+        if agora >= self._proxima_limpeza:
+            self._proxima_limpeza = agora + INTERVALO_LIMPEZA
+            self._limpar_arquivos()
+        return sessao
+
+    def _limpar_arquivos(self):
+        limite = time.time() - RETENCAO
+        for arquivo in self.pasta.glob("*.jsonl"):
+            try:
+                if arquivo.stat().st_mtime < limite and arquivo.stem not in self._sessoes:
+                    arquivo.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def nova(self, *mensagens):
+        """Cria uma sessão (opcionalmente já com mensagens) e devolve o id."""
+        id_sessao = uuid.uuid4().hex
+        for mensagem in mensagens:
+            self.acrescentar(id_sessao, mensagem)
+        return id_sessao
+
+    def acrescentar(self, id_sessao, mensagem):
+        """Grava a mensagem ({"role", "content"}) no arquivo e na cauda em memória."""
+        linha = json.dumps(mensagem, ensure_ascii=False) + "\n"
+        with self._lock:
+            sessao = self._sessao(id_sessao)
+            with open(sessao.arquivo, "a", encoding="utf-8") as arquivo:
+                arquivo.write(linha)
+            self._reter(sessao, mensagem)
+
+    def mensagens(self, id_sessao):
+        """Cauda em memória (cópia), no formato esperado por ``montar_prompt``."""
+        with self._lock:
+            return list(self._sessao(id_sessao).mensagens)
+
+    def arquivadas(self, id_sessao):
+        with self._lock:
+            return self._sessao(id_sessao).arquivadas
+
+    def anteriores(self, id_sessao):
+        """Mensagens que já saíram da memória, lidas do arquivo (não ficam retidas)."""
+        with self._lock:
+            sessao = self._sessao(id_sessao)
+            quantidade, caminho = sessao.arquivadas, sessao.arquivo
+        anteriores = []
+        if quantidade:
+            with open(caminho, encoding="utf-8") as arquivo:
+                for _, linha in zip(range(quantidade), arquivo):
+                    anteriores.append(json.loads(linha))
+        return anteriores
+
+    def descartar(self, id_sessao):
+        """Apaga a conversa (memória e arquivo)."""
+        with self._lock:
+            if id_sessao in self._sessoes:
+                self._remover(id_sessao)
+            (self.pasta / f"{id_sessao}.jsonl").unlink(missing_ok=True)
+
+    def despejar_ociosas(self):
+        with self._lock:
+            self._despejar(self.relogio())
+
+    def estatisticas(self):
+        """Contadores do processo."""
+        with self._lock:
+            return {
+                "sessoes_vivas": len(self._sessoes),
+                "bytes_retidos": self._bytes,
+                "mensagens_retidas": sum(len(s.mensagens) for s in self._sessoes.values()),
+                "sessoes_despejadas": self._despejadas,
+                "sessoes_restauradas": self._restauradas,
+            }
+
+
+@lru_cache(maxsize=None)
+def gerenciador_padrao():
+    """Gerenciador compartilhado pelas sessões do processo (pasta em COMPRIMOVEIS_SESSOES_DIR)."""
+    return GerenciadorSessoes(os.environ.get(VARIAVEL_PASTA, PASTA_PADRAO))
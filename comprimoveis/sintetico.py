@@ -0,0 +1,127 @@
+"""
+🧪 Gerador de catálogos sintéticos
+
+Produz catálogos determinísticos com N condomínios × M tarefas por mês cada,
+no formato de ``TAREFAS_POR_DIA``. As distribuições de dia, tipo e valor
+imitam o catálogo real: vencimentos concentrados nos dias 5, 10, 15 e 20,
+maioria de boletos sem valor fixo e transferências de TX ADM com valor.
+
+    python -m comprimoveis.sintetico 200 6 --semente 42 --saida catalogo.json
+"""
+
+import argparse
+import random
+
+from comprimoveis.catalogo import salvar_catalogo
+
+# Peso relativo de cada dia de vencimento no catálogo real
+PESOS_DIAS = {
+    1: 2, 5: 7, 8: 2, 10: 9, 15: 22, 19: 7, 20: 5, 25: 3, 26: 2, 28: 2, 30: 2,
+    3: 1, 7: 1, 12: 1, 17: 1, 22: 1, 27: 1,
+}
+
+# tipo -> (peso, probabilidade de ter valor, faixa de valor)
+TIPOS = {
+    "Boleto": (26, 0.15, (80.0, 2500.0)),
+    "PIX": (14, 0.45, (150.0, 6000.0)),
+    "Transferência": (14, 0.85, (100.0, 1800.0)),
+    "Pagamento": (3, 0.35, (1500.0, 9000.0)),
+    "Impostos": (4, 0.10, (300.0, 4000.0)),
+    "Vale": (1, 0.10, (400.0, 2500.0)),
+}
+
+DESCRICOES = {
+    "Boleto": [
+        "Light - Matrícula {num}", "Iguá - Matrícula {num}", "Águas do Rio",
+        "Naturgy", "Claro + Naturgy", "Seguro Predial", "Elevadores Atlas",
+        "Bem mais gestora", "NIO Fibra", "Alpha Manutenção", "Jurídico",
+    ],
+    "PIX": [
+        "Salários Funcionários ({nome} e {nome2})", "Adiantamento Salários ({n} funcionários)",
+        "{nome} (Faxineira)", "Prestadores ({nome}, {nome2})", "{nome} (Síndico Profissional)",
+    ],
+    "Transferência": [
+        "TX ADM Comprimóveis", "CX Presidente {nome}", "CX Síndico {nome}",
+    ],
+    "Pagamento": ["Salários {n} Funcionários", "Prestador Interfone ({nome})"],
+    "Impostos": ["FGTS + INSS", "IPTU", "ISS Prestadores"],
+    "Vale": ["VR Refeição + Vale Transporte"],
+}
+
+NOMES = [
+    "Ana", "Bruno", "Carlos", "Daniela", "Elias", "Fátima", "Gustavo", "Helena",
+    "Jorge", "Letícia", "Magno", "Mário", "Rita", "Severino", "Suzana", "Washington",
+]
+
+PREFIXOS = ["Village", "Residencial", "Condomínio", "Edifício", "Solar", "Parque"]
+NOMES_CONDOMINIO = [
+    "Mananciais", "Colina Verde", "Tucanos", "Itaipu", "Samira", "Nascente",
+    "Anchieta", "Ipadu", "Sylvania", "Pedras", "Primavera", "Jequitibá",
+    "Ipês", "Araucárias", "Bromélias", "Quaresmeiras", "Palmeiras", "Jacarandá",
+]
+
+
+def nomes_condominios(n, rng):
+    nomes = []
+    vistos = set()
+    while len(nomes) < n:
+        nome = f"{rng.choice(PREFIXOS)} {rng.choice(NOMES_CONDOMINIO)}"
+        if nome in vistos:
+            nome = f"{nome} {len(nomes) + 1}"
+        vistos.add(nome)
+        nomes.append(nome)
+    return nomes
+
+
+def _descricao(tipo, rng):
+    return rng.choice(DESCRICOES[tipo]).format(
+        num=rng.randrange(10_000_000, 999_999_999),
+        nome=rng.choice(NOMES),
+        nome2=rng.choice(NOMES),
+        n=rng.randint(2, 10),
+    )
+
+
+def gerar_catalogo(n_condominios, tarefas_por_condominio, semente=0):
+    """Catálogo {dia: [tarefa, ...]} determinístico para a semente dada."""
+    rng = random.Random(semente)
+    dias, pesos_dias = zip(*PESOS_DIAS.items())
+    tipos, specs = zip(*TIPOS.items())
+    pesos_tipos = [spec[0] for spec in specs]
+
+    catalogo = {}
+    for condominio in nomes_condominios(n_condominios, rng):
+        for _ in range(tarefas_por_condominio):
+            tipo = rng.choices(tipos, weights=pesos_tipos)[0]
+            _, prob_valor, (minimo, maximo) = TIPOS[tipo]
+            valor = round(rng.uniform(minimo, maximo), 2) if rng.random() < prob_valor else None
+            tarefa = {
+                "condominio": condominio,
+                "tipo": tipo,
+                "descricao": _descricao(tipo, rng),
+                "valor": valor,
+            }
+            if tipo == "Transferência" and rng.random() < 0.3:
+                tarefa["destinatario"] = f"{rng.choice(NOMES)} (Presidente)"
+            dia = rng.choices(dias, weights=pesos_dias)[0]
+            catalogo.setdefault(dia, []).append(tarefa)
+
+    return dict(sorted(catalogo.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um catálogo BPO sintético em JSON.")
+    parser.add_argument("condominios", type=int)
+    parser.add_argument("tarefas", type=int, help="tarefas por condomínio por mês")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default="catalogo_sintetico.json")
+    args = parser.parse_args(argv)
+
+    catalogo = gerar_catalogo(args.condominios, args.tarefas, args.semente)
+    salvar_catalogo(catalogo, args.saida)
+    total = sum(len(tarefas) for tarefas in catalogo.values())
+    print(f"✅ {total} tarefas de {args.condominios} condomínios gravadas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
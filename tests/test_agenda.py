@@ -0,0 +1,84 @@
+import threading
+import urllib.error
+import urllib.request
+from datetime import date
+
+import pytest
+
+from comprimoveis.agenda import CONSOLIDADO, CacheFeeds, criar_servidor
+
+TAREFAS = {
+    10: [{"condominio": "Águas Claras", "tipo": "Boleto", "descricao": "Light", "valor": 100.0}],
+    15: [{"condominio": "Anchieta", "tipo": "PIX", "descricao": "Limpeza", "valor": None}],
+}
+
+
+class Relogio:
+    def __init__(self, hoje):
+        self.hoje = hoje
+
+    def __call__(self):
+        return self.hoje
+
+
+@pytest.fixture
+def servidor():
+    cache = CacheFeeds(lambda: TAREFAS, hoje=Relogio(date(2026, 3, 10)))
+    servidor = criar_servidor(cache, porta=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _get(servidor, caminho, **cabecalhos):
+    url = f"http://127.0.0.1:{servidor.server_address[1]}{caminho}"
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=cabecalhos)) as resposta:
+            return resposta.status, resposta.headers, resposta.read()
+    except urllib.error.HTTPError as erro:
+        return erro.code, erro.headers, erro.read()
+
+
+def test_cache_gera_uma_vez_e_invalida_com_catalogo_ou_janela():
+    catalogo = {"atual": TAREFAS}
+    relogio = Relogio(date(2026, 3, 10))
+    cache = CacheFeeds(lambda: catalogo["atual"], hoje=relogio)
+
+    assert cache.nomes() == [CONSOLIDADO, "aguas_claras", "anchieta"]
+    primeiro = cache.feed(CONSOLIDADO)
+    assert cache.feed(CONSOLIDADO) is primeiro
+    assert cache.feed("inexistente") is None
+    assert cache.geracoes == 1
+
+    relogio.hoje = date(2026, 3, 31)   # mesma janela
+    assert cache.feed(CONSOLIDADO) is primeiro
+    relogio.hoje = date(2026, 4, 1)    # a janela avança um mês
+    assert cache.feed(CONSOLIDADO).etag != primeiro.etag
+    assert cache.geracoes == 2
+
+    catalogo["atual"] = {10: TAREFAS[10]}
+    assert cache.nomes() == [CONSOLIDADO, "aguas_claras"]
+    cache.feed(CONSOLIDADO)
+    assert cache.geracoes == 3
+
+
+def test_etag_e_304(servidor):
+    status, cabecalhos, corpo = _get(servidor, "/aguas_claras.ics")
+    assert status == 200
+    assert cabecalhos["Content-Type"] == "text/calendar; charset=utf-8"
+    assert corpo.startswith(b"BEGIN:VCALENDAR")
+    etag = cabecalhos["ETag"]
+
+    for if_none_match in (etag, f'W/{etag}', f'"outro", {etag}', "*"):
+        status, cabecalhos, corpo = _get(servidor, "/aguas_claras.ics", **{"If-None-Match": if_none_match})
+        assert (status, corpo, cabecalhos["ETag"]) == (304, b"", etag)
+
+    status, _, corpo = _get(servidor, "/aguas_claras.ics", **{"If-None-Match": '"outro"'})
+    assert status == 200 and corpo.startswith(b"BEGIN:VCALENDAR")
+    assert servidor.cache.geracoes == 1
+
+
+def test_indice_e_feed_inexistente(servidor):
+    assert _get(servidor, "/")[2] == b"/consolidado.ics\n/aguas_claras.ics\n/anchieta.ics\n"
+    assert _get(servidor, "/outro.ics")[0] == 404
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from comprimoveis import auditoria
+from comprimoveis.auditoria import LogAuditoria
+
+MES = "3/2026"
+
+
+def _chave(dia, idx=0):
+    return f"{MES}-{dia}-{idx}"
+
+
+def test_alteracao_depois_da_versao_base_volta_como_conflito(tmp_path):
+    log = LogAuditoria(tmp_path)
+    versao_base, _ = log.concluidas()
+    log.registrar("Vanessa", [_chave(10)], True, MES)
+
+    # Outra sessão, ainda na versão anterior, tenta desmarcar
+    registro = log.registrar("Ana", [_chave(10), _chave(11)], False, MES, versao_base=versao_base)
+    assert registro.eventos == []
+    assert [evento["seq"] for evento in registro.conflitos] == [1]
+    assert log.concluidas() == (1, {MES: [_chave(10)]})
+
+    # Tarefa não tocada desde a versão base passa; pedir o estado atual não é conflito
+    registro = log.registrar("Ana", [_chave(10), _chave(12)], True, MES, versao_base=versao_base)
+    assert [evento["chave"] for evento in registro.eventos] == [_chave(12)]
+    assert registro.conflitos == []
+
+
+def test_conflito_entre_processos(tmp_path):
+    log, outro = LogAuditoria(tmp_path), LogAuditoria(tmp_path)
+    versao_base, _ = outro.concluidas()
+    log.registrar("Vanessa", [_chave(10)], True, MES)
+
+    registro = outro.registrar("Ana", [_chave(10)], False, MES, versao_base=versao_base)
+    assert registro.eventos == [] and len(registro.conflitos) == 1
+    assert outro.mudancas_desde(versao_base)[0]["usuario"] == "Vanessa"
+
+
+def test_mudancas_desde_e_janela_recente(tmp_path, monkeypatch):
+    monkeypatch.setattr(auditoria, "EVENTOS_RECENTES", 3)
+    log = LogAuditoria(tmp_path)
+    for dia in range(1, 6):
+        log.registrar("Vanessa", [_chave(dia)], True, MES)
+
+    assert log.mudancas_desde(5) == []
+    assert [evento["seq"] for evento in log.mudancas_desde(2)] == [3, 4, 5]
+    # O evento 2 já saiu da janela: a sessão precisa recarregar o estado inteiro
+    assert log.mudancas_desde(1) is None
+    assert log.mudancas_desde(0) is None
+
+
+def test_estado_em_instante_passado(tmp_path):
+    log = LogAuditoria(tmp_path, intervalo_snapshot=2)
+    log.registrar("Vanessa", [_chave(10)], True, MES, quando=datetime(2026, 3, 10, 9))
+    log.registrar("Vanessa", [_chave(11)], True, MES, quando=datetime(2026, 3, 11, 9))
+    log.registrar("Vanessa", [_chave(10)], False, MES, quando=datetime(2026, 3, 12, 9))
+
+    assert log.estado_em(datetime(2026, 3, 9), MES) == set()
+    assert log.estado_em(datetime(2026, 3, 11, 12), MES) == {_chave(10), _chave(11)}
+    assert log.estado_em(datetime(2026, 3, 12, 12), MES) == {_chave(11)}
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from comprimoveis.conciliacao import Lancamento, _valor_br, conciliar, ler_csv, ler_ofx
+
+TAREFAS = {
+    10: [
+        {"condominio": "Anchieta", "tipo": "Boleto", "descricao": "Light energia", "valor": 1234.0},
+        {"condominio": "Anchieta", "tipo": "PIX", "descricao": "Elevadores Atlas", "valor": None},
+    ],
+    12: [{"condominio": "Samira", "tipo": "Boleto", "descricao": "Águas do Rio", "valor": 1240.0}],
+}
+CONTAS = {"1210-3": "Anchieta"}
+
+
+def _conciliar(*lancamentos, **opcoes):
+    return conciliar(list(lancamentos), TAREFAS, 2026, 3, **opcoes)
+
+
+@pytest.mark.parametrize("texto, valor", [
+    ("1.234", 1234.0),
+    ("-1.234,56", -1234.56),
+    ("12.345.678", 12345678.0),
+    ("1234.56", 1234.56),
+    ("-614.09", -614.09),
+    ("R$ 50,00", 50.0),
+])
+def test_valor_br(texto, valor):
+    assert _valor_br(texto) == valor
+
+
+def test_csv_com_milhar_sem_centavos():
+    extrato = "Data;Histórico;Valor\n10/03/2026;PAGTO LIGHT;-1.234\n11/03/2026;SALDO DO DIA;\n"
+    assert ler_csv(extrato) == [Lancamento(date(2026, 3, 10), -1234.0, "PAGTO LIGHT")]
+
+
+def test_ofx_usa_ponto_decimal():
+    extrato = ("<OFX><ACCTID>1210-3<BANKTRANLIST><STMTTRN><DTPOSTED>20260310"
+               "<TRNAMT>-1.500<NAME>PAGTO LIGHT</BANKTRANLIST></OFX>")
+    assert [lancamento.valor for lancamento in ler_ofx(extrato)] == [-1.5]
+
+
+def test_valor_data_descricao_e_conta_confirmam():
+    lancamento = Lancamento(date(2026, 3, 10), -1234.0, "PAGTO LIGHT ENERGIA", "1210-3")
+    resultado = _conciliar(lancamento, contas=CONTAS)
+
+    [(confirmado, candidato)] = resultado.confirmadas
+    assert confirmado is lancamento
+    assert (candidato.dia, candidato.idx) == (10, 0)
+    assert candidato.pontuacao == pytest.approx(1.0)
+    assert resultado.revisar == [] and resultado.sem_correspondencia == []
+
+
+def test_dois_candidatos_parecidos_vao_para_revisao():
+    lancamento = Lancamento(date(2026, 3, 11), -1237.0, "PAGAMENTO BOLETO")
+    resultado = _conciliar(lancamento)
+
+    assert resultado.confirmadas == []
+    [(_, candidatos)] = resultado.revisar
+    assert {(c.dia, c.idx) for c in candidatos} == {(10, 0), (12, 0)}
+    assert candidatos[0].pontuacao - candidatos[1].pontuacao < 0.15
+
+
+def test_tarefa_sem_valor_nunca_confirma_sozinha():
+    lancamento = Lancamento(date(2026, 3, 10), -300.0, "PIX ELEVADORES ATLAS", "1210-3")
+    resultado = _conciliar(lancamento, contas=CONTAS)
+
+    assert resultado.confirmadas == []
+    [(_, [candidato])] = resultado.revisar
+    assert candidato.tarefa["descricao"] == "Elevadores Atlas"
+    assert candidato.pontuacao == pytest.approx(0.55)
+
+
+def test_fora_da_janela_creditos_e_ja_concluidas():
+    atrasado = Lancamento(date(2026, 3, 25), -1234.0, "PAGTO LIGHT ENERGIA")
+    credito = Lancamento(date(2026, 3, 10), 1234.0, "ESTORNO LIGHT")
+    ja_pago = Lancamento(date(2026, 3, 12), -1240.0, "PAGTO AGUAS DO RIO")
+    resultado = _conciliar(atrasado, credito, ja_pago, ja_concluidas=[(10, 0), (12, 0)])
+
+    assert resultado.confirmadas == [] and resultado.revisar == []
+    assert resultado.sem_correspondencia == [atrasado, ja_pago]
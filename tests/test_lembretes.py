@@ -0,0 +1,95 @@
+import smtplib
+from datetime import datetime
+
+from comprimoveis.auditoria import LogAuditoria
+from comprimoveis.lembretes import REENVIO, Agendador, EstadoConclusao
+
+
+def _tarefa(descricao):
+    return {"condominio": "Anchieta", "tipo": "Boleto", "descricao": descricao, "valor": 100.0}
+
+
+class Relogio:
+    def __init__(self, agora):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+class Caixa:
+    def __init__(self, falhas=0):
+        self.falhas = falhas
+        self.enviadas = {}
+
+    def ja_enviado(self, identificador):
+        return identificador in self.enviadas
+
+    def enviar(self, identificador, mensagem):
+        if self.falhas:
+            self.falhas -= 1
+            raise smtplib.SMTPServerDisconnected("conexão recusada")
+        self.enviadas[identificador] = mensagem["Subject"]
+
+
+def _agendador(tarefas, agora, tmp_path, caixa=None):
+    relogio = Relogio(agora)
+    log = LogAuditoria(tmp_path / "auditoria")
+    agendador = Agendador(tarefas, EstadoConclusao(log), caixa or Caixa(), ["teste@local"], agora=relogio)
+    agendador.iniciar()
+    return agendador, relogio, log
+
+
+def test_avisos_vencidos_enquanto_parado_nao_saem(tmp_path):
+    tarefas = {dia: [_tarefa(f"Conta {dia}")] for dia in (10, 11, 12, 13)}
+    agendador, relogio, _ = _agendador(tarefas, datetime(2026, 3, 11, 7), tmp_path)
+    relogio.agora = datetime(2026, 3, 11, 8)
+    agendador.executar_pendentes()
+
+    assert agendador.caixa.enviadas == {
+        "20260311-atraso-20260310-10-0": "⚠️ Em atraso: Anchieta - Conta 10",
+        "20260311-vencimento-20260311-11-0": "🔔 Vence HOJE: Anchieta - Conta 11",
+        "20260311-aviso-20260313-13-0": "⏰ Vence em 2 dia(s): Anchieta - Conta 13",
+    }
+
+
+def test_assunto_do_aviso_conta_os_dias_reais(tmp_path):
+    tarefas = {12: [_tarefa("Conta 12")]}
+    agendador, relogio, _ = _agendador(tarefas, datetime(2026, 3, 10, 7), tmp_path)
+    relogio.agora = datetime(2026, 3, 10, 23, 59)
+    agendador.executar_pendentes()
+
+    assert agendador.caixa.enviadas == {"20260310-aviso-20260312-12-0": "⏰ Vence em 2 dia(s): Anchieta - Conta 12"}
+
+
+def test_dias_alem_do_fim_do_mes_vencem_no_ultimo_dia(tmp_path):
+    tarefas = {28: [_tarefa("Conta 28")], 30: [_tarefa("Conta 30")], 31: [_tarefa("Conta 31")]}
+    agendador, relogio, _ = _agendador(tarefas, datetime(2026, 2, 28, 7), tmp_path)
+    relogio.agora = datetime(2026, 2, 28, 8)
+    agendador.executar_pendentes()
+
+    assert sorted(agendador.caixa.enviadas) == [
+        "20260228-vencimento-20260228-28-0",
+        "20260228-vencimento-20260228-30-0",
+        "20260228-vencimento-20260228-31-0",
+    ]
+
+
+def test_concluidas_na_auditoria_nao_recebem_aviso(tmp_path):
+    tarefas = {11: [_tarefa("Paga"), _tarefa("Pendente")]}
+    agendador, relogio, log = _agendador(tarefas, datetime(2026, 3, 11, 7), tmp_path)
+    log.registrar("Vanessa", ["3/2026-11-0"], True, "3/2026")
+    relogio.agora = datetime(2026, 3, 11, 8)
+    agendador.executar_pendentes()
+
+    assert list(agendador.caixa.enviadas) == ["20260311-vencimento-20260311-11-1"]
+
+
+def test_falha_de_envio_tenta_de_novo_depois(tmp_path):
+    tarefas = {11: [_tarefa("Conta 11")]}
+    agendador, relogio, _ = _agendador(tarefas, datetime(2026, 3, 11, 7), tmp_path, Caixa(falhas=1))
+    relogio.agora = datetime(2026, 3, 11, 8)
+    assert agendador.executar_pendentes() == []
+
+    relogio.agora += REENVIO
+    assert agendador.executar_pendentes() == ["20260311-vencimento-20260311-11-0"]